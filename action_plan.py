@@ -0,0 +1,238 @@
+"""Declarative GUI step plans and the engine that runs them.
+
+Each GUI action (Spotify search, WhatsApp send, Brave navigation, YouTube play)
+is written as a list of steps and executed by `run_plan`, which:
+
+* runs with `pyautogui.PAUSE = 0`, so the only waits are the explicit `sleep`,
+  `focus` and `wait_title_change` steps the plan asks for;
+* sends runs of consecutive key presses/hotkeys to the input backend in one
+  batch (`keyboard.send("ctrl+a, delete")` where available);
+* enters `write` text by clipboard paste (see text_input), typing per key only
+  as a fallback;
+* returns (and optionally prints) per-step timings.
+
+Set FRIDAY_PLAN_TIMING=1 to print the timing breakdown of every plan.
+"""
+import os
+import sys
+import time
+
+import waits
+import tracing
+import text_input
+import window_backend
+
+PRINT_TIMINGS = os.getenv("FRIDAY_PLAN_TIMING") == "1"
+
+# pyautogui key names -> `keyboard` library names
+KEYBOARD_KEY_NAMES = {"win": "windows", "escape": "esc", "command": "command", "pageup": "page up", "pagedown": "page down"}
+
+
+class StepFailed(Exception):
+    """A step's window never appeared (or lost the focus); the plan stopped there."""
+
+
+class Step:
+    def __init__(self, kind: str, *args, **kwargs):
+        self.kind = kind
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        args = ", ".join([repr(a) for a in self.args] + [f"{k}={v!r}" for k, v in self.kwargs.items()])
+        return f"{self.kind}({args})"
+
+
+# ------------------ Step constructors ------------------
+def press(key: str):
+    return Step("keys", (key,))
+
+def hotkey(*keys: str):
+    return Step("keys", tuple(keys))
+
+def write(text: str, interval: float = 0.0):
+    return Step("write", text, interval=interval)
+
+def click(x: int, y: int, clicks: int = 1):
+    return Step("click", x, y, clicks=clicks)
+
+def move_to(x: int, y: int, duration: float = 0.0):
+    return Step("move", x, y, duration=duration)
+
+def sleep(seconds: float):
+    """An explicit wait for in-app UI that has no observable window signal."""
+    return Step("sleep", seconds)
+
+def focus(app_name: str, timeout: float = 3.0, required: bool = False):
+    """Brings the app's window to the front and waits until it has focus.
+
+    With `required`, the plan stops with StepFailed if the app has no window.
+    """
+    return Step("focus", app_name, timeout=timeout, required=required)
+
+def wait_focus(app_name: str, timeout: float = 3.0, fallback: float = 0.0):
+    """Waits until the app's window has focus; the plan stops with StepFailed if it doesn't get it back."""
+    return Step("wait_focus", app_name, timeout=timeout, fallback=fallback)
+
+def mark_title():
+    """Remembers the foreground window title for a following wait_title_change step."""
+    return Step("mark_title")
+
+def wait_title_change(timeout: float = 3.0, fallback: float = 1.0):
+    return Step("wait_title_change", timeout=timeout, fallback=fallback)
+
+def call(fn, *args, **kwargs):
+    return Step("call", fn, *args, **kwargs)
+
+
+# ------------------ Input backends ------------------
+class PyAutoGUIInput:
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def send_keys(self, combos):
+        for combo in combos:
+            if len(combo) == 1:
+                self.pyautogui.press(combo[0])
+            else:
+                self.pyautogui.hotkey(*combo)
+
+    def write(self, text, interval):
+        text_input.type_text(text, interval, self)
+
+    def type_chars(self, text, interval):
+        self.pyautogui.write(text, interval=interval)
+
+    def click(self, x, y, clicks):
+        self.pyautogui.click(x, y, clicks=clicks)
+
+    def move(self, x, y, duration):
+        self.pyautogui.moveTo(x, y, duration=duration)
+
+
+class KeyboardInput(PyAutoGUIInput):
+    """Sends a whole run of key events with one `keyboard.send` call (Windows; needs root elsewhere)."""
+    name = "keyboard"
+
+    def __init__(self):
+        super().__init__()
+        import keyboard
+        self.keyboard = keyboard
+
+    def send_keys(self, combos):
+        sequence = ", ".join("+".join(KEYBOARD_KEY_NAMES.get(k, k) for k in combo) for combo in combos)
+        self.keyboard.send(sequence)
+
+    def type_chars(self, text, interval):
+        self.keyboard.write(text, delay=interval)  # unlike pyautogui.write, types non-ASCII characters too
+
+
+_input_backend = None
+
+
+def get_input_backend():
+    global _input_backend
+    if _input_backend is None:
+        backends = (KeyboardInput, PyAutoGUIInput) if sys.platform.startswith("win") else (PyAutoGUIInput,)
+        for backend_class in backends:
+            try:
+                _input_backend = backend_class()
+                break
+            except Exception:
+                continue
+    return _input_backend
+
+
+def set_input_backend(backend):
+    global _input_backend
+    _input_backend = backend
+
+
+# ------------------ Engine ------------------
+def _batches(steps):
+    """Groups consecutive key steps so they go to the backend together."""
+    batch = []
+    for step in steps:
+        if step.kind == "keys":
+            batch.append(step)
+            continue
+        if batch:
+            yield batch
+            batch = []
+        yield [step]
+    if batch:
+        yield batch
+
+
+def _require(step, window):
+    # Without a window backend nothing can be observed, and the plan carries on as before.
+    if window is None and window_backend.get_backend() is not None:
+        raise StepFailed(f"{step!r}: no '{step.args[0]}' window has the focus")
+
+
+def _failsafe_check(backend):
+    pyautogui = getattr(backend, "pyautogui", None)
+    if pyautogui is not None and pyautogui.FAILSAFE:
+        pyautogui.failSafeCheck()  # keep the corner-of-screen abort working without PAUSE
+
+
+def run_plan(name: str, steps, backend=None) -> dict:
+    """Executes `steps` in order and returns {"plan", "total", "steps": [(description, seconds), ...]}."""
+    backend = backend or get_input_backend()
+    pyautogui = getattr(backend, "pyautogui", None)
+    saved_pause = pyautogui.PAUSE if pyautogui is not None else None
+    if pyautogui is not None:
+        pyautogui.PAUSE = 0
+    marked_title = None
+    timings = []
+    plan_start = time.perf_counter()
+    try:
+        for batch in _batches(steps):
+            _failsafe_check(backend)
+            waits.check_abort()
+            step = batch[0]
+            start = time.perf_counter()
+            if step.kind == "keys":
+                backend.send_keys([s.args[0] for s in batch])
+            elif step.kind == "write":
+                backend.write(step.args[0], step.kwargs["interval"])
+            elif step.kind == "click":
+                backend.click(step.args[0], step.args[1], step.kwargs["clicks"])
+            elif step.kind == "move":
+                backend.move(step.args[0], step.args[1], step.kwargs["duration"])
+            elif step.kind == "sleep":
+                time.sleep(step.args[0])
+            elif step.kind == "focus":
+                window = waits.activate_and_wait(step.args[0], timeout=step.kwargs["timeout"])
+                if step.kwargs["required"]:
+                    _require(step, window)
+            elif step.kind == "wait_focus":
+                _require(step, waits.wait_for_focus(step.args[0], **step.kwargs))
+            elif step.kind == "mark_title":
+                marked_title = waits.active_title()
+            elif step.kind == "wait_title_change":
+                waits.wait_for_title_change(marked_title, **step.kwargs)
+            elif step.kind == "call":
+                step.args[0](*step.args[1:], **step.kwargs)
+            else:
+                raise ValueError(f"Unknown plan step: {step.kind}")
+            description = " + ".join(repr(s) for s in batch)
+            timings.append((description, time.perf_counter() - start))
+    finally:
+        if pyautogui is not None:
+            pyautogui.PAUSE = saved_pause
+    report = {"plan": name, "total": time.perf_counter() - plan_start, "steps": timings}
+    tracing.record(f"plan.{name}", report["total"], steps=len(timings))
+    if PRINT_TIMINGS:
+        print(format_report(report))
+    return report
+
+
+def format_report(report: dict) -> str:
+    lines = [f"[Plan] {report['plan']}: {report['total']:.2f}s ({len(report['steps'])} steps)"]
+    for description, seconds in report["steps"]:
+        lines.append(f"    {seconds * 1000:8.1f} ms  {description}")
+    return "\n".join(lines)
@@ -0,0 +1,329 @@
+"""Index of installed applications for launching them without the Start menu.
+
+Built from Linux `.desktop` files, Windows Start Menu shortcuts and macOS
+`.app` bundles. The index is cached in `~/.friday/app_index.json` together with
+the mtime of every scanned directory; on load only directories whose mtime
+changed are rescanned. Lookups are fuzzy over names, generic names, keywords
+and aliases, and `launch()` spawns the process directly.
+
+    python app_launcher.py spotify            # show the match and launch it
+    python app_launcher.py --dirs /tmp/apps --list
+"""
+import os
+import re
+import sys
+import shlex
+import difflib
+import threading
+import subprocess
+
+import startup_profile
+from friday_store import load_json, save_json
+
+INDEX_FILE = "app_index.json"
+INDEX_VERSION = 2  # bumped when entries change shape or content, so old caches are rebuilt
+MIN_SCORE = 60
+MIN_PREFIX_LENGTH = 3  # shorter names only match exactly ("s" isn't Spotify)
+
+# Spoken names that don't resemble the installed entry's name.
+APP_ALIASES = {
+    "vs code": "visual studio code",
+    "vscode": "visual studio code",
+    "code": "visual studio code",
+    "chrome": "google chrome",
+    "edge": "microsoft edge",
+    "cmd": "command prompt",
+}
+
+_FIELD_CODES = re.compile(r"%[fFuUdDnNickvm]")
+
+# Launchers that run the real program (`Exec=env FOO=1 app`, `flatpak run ...`): not names of the app.
+WRAPPER_EXECUTABLES = {"env", "sh", "bash", "dash", "zsh", "flatpak", "snap", "gtk-launch", "xdg-open",
+                       "gio", "exo-open", "kioclient", "kioclient5", "sudo", "pkexec", "nice", "ionice"}
+
+
+def default_app_dirs():
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        return [
+            os.path.join(os.getenv("APPDATA", ""), "Microsoft", "Windows", "Start Menu", "Programs"),
+            os.path.join(os.getenv("PROGRAMDATA", r"C:\ProgramData"), "Microsoft", "Windows", "Start Menu", "Programs"),
+        ]
+    if sys.platform == "darwin":
+        return ["/Applications", "/System/Applications", os.path.join(home, "Applications")]
+    data_dirs = os.getenv("XDG_DATA_DIRS", "/usr/local/share:/usr/share").split(":")
+    return [os.path.join(os.getenv("XDG_DATA_HOME", os.path.join(home, ".local", "share")), "applications")] + [
+        os.path.join(d, "applications") for d in data_dirs
+    ] + [
+        "/var/lib/flatpak/exports/share/applications",
+        os.path.join(home, ".local", "share", "flatpak", "exports", "share", "applications"),
+        "/var/lib/snapd/desktop/applications",
+    ]
+
+
+def normalize_name(name: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", (name or "").lower()).split())
+
+
+# ------------------ Parsers ------------------
+def parse_desktop_file(path: str):
+    """Returns an entry dict for a launchable `.desktop` file, or None."""
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    in_entry = line == "[Desktop Entry]"
+                    continue
+                if in_entry and "=" in line and not line.startswith("#"):
+                    key, value = line.split("=", 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+    if fields.get("Type", "Application") != "Application" or not fields.get("Exec"):
+        return None
+    if fields.get("NoDisplay", "").lower() == "true" or fields.get("Hidden", "").lower() == "true":
+        return None
+    command = _FIELD_CODES.sub("", fields["Exec"]).replace("%%", "%")
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv:
+        return None
+    executable = os.path.basename(argv[0])
+    aliases = [fields.get("GenericName", ""), os.path.splitext(os.path.basename(path))[0],
+               "" if executable in WRAPPER_EXECUTABLES else executable]
+    aliases += [k for k in fields.get("Keywords", "").split(";") if k]
+    return {"name": fields.get("Name") or aliases[1], "aliases": [a for a in aliases if a],
+            "argv": argv, "path": path}
+
+
+def shortcut_entry(path: str):
+    """Windows .lnk/.url shortcuts and macOS .app bundles are opened by the shell."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name.lower().startswith("uninstall"):
+        return None
+    return {"name": name, "aliases": [], "argv": None, "path": path}
+
+
+def scan_directory(directory: str):
+    """Entries directly inside `directory` (subdirectories are scanned as their own directories)."""
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                lower = item.name.lower()
+                if lower.endswith(".desktop") and item.is_file():
+                    entry = parse_desktop_file(item.path)
+                elif lower.endswith((".lnk", ".url")) and item.is_file():
+                    entry = shortcut_entry(item.path)
+                elif lower.endswith(".app") and item.is_dir():
+                    entry = shortcut_entry(item.path)
+                else:
+                    entry = None
+                if entry:
+                    entries.append(entry)
+    except OSError:
+        pass
+    return entries
+
+
+def _walk_dirs(root: str, max_depth: int = 3):
+    """`root` plus its subdirectories (Start Menu folders nest, e.g. Programs/Spotify)."""
+    dirs = []
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        if not os.path.isdir(directory):
+            continue
+        dirs.append(directory)
+        if depth >= max_depth:
+            continue
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.is_dir() and not item.name.lower().endswith(".app"):
+                        stack.append((item.path, depth + 1))
+        except OSError:
+            pass
+    return dirs
+
+
+# ------------------ Index ------------------
+class AppIndex:
+    def __init__(self, roots=None, cache_name: str = INDEX_FILE):
+        self.roots = list(roots) if roots is not None else default_app_dirs()
+        self.cache_name = cache_name
+        self._dirs = {}   # directory -> {"mtime": float, "entries": [...]}
+        self._keys = {}   # normalized name/alias -> entry
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load_cache(self):
+        data = load_json(self.cache_name, {}) if self.cache_name else {}
+        if data.get("version") == INDEX_VERSION and data.get("roots") == self.roots:
+            self._dirs = data.get("dirs", {})
+
+    def refresh(self, force: bool = False) -> int:
+        """Rescans directories whose mtime changed (all of them if `force`); returns how many were rescanned."""
+        with self._lock:
+            if not self._loaded and not force:
+                self._load_cache()
+            current = {}
+            rescanned = 0
+            for root in self.roots:
+                for directory in _walk_dirs(root):
+                    try:
+                        mtime = os.stat(directory).st_mtime
+                    except OSError:
+                        continue
+                    cached = self._dirs.get(directory)
+                    if not force and cached and cached["mtime"] == mtime:
+                        current[directory] = cached
+                    else:
+                        current[directory] = {"mtime": mtime, "entries": scan_directory(directory)}
+                        rescanned += 1
+            changed = rescanned or set(current) != set(self._dirs)
+            self._dirs = current
+            self._rebuild_keys()
+            self._loaded = True
+            if changed and self.cache_name:
+                save_json(self.cache_name, {"version": INDEX_VERSION, "roots": self.roots, "dirs": self._dirs})
+            return rescanned
+
+    def _rebuild_keys(self):
+        names, aliases = {}, {}
+        # Earlier roots (user-level) win over later (system-level) ones.
+        for directory in reversed(list(self._dirs)):
+            for entry in self._dirs[directory]["entries"]:
+                key = normalize_name(entry["name"])
+                if key:
+                    names[key] = entry
+                for alias in entry["aliases"]:
+                    key = normalize_name(alias)
+                    if key:
+                        aliases[key] = entry
+        # An app's own name beats another app's keyword or generic name ("Explorer", "Web Browser").
+        self._keys = {**aliases, **names}
+
+    @property
+    def loaded(self) -> bool:
+        """Whether lookups answer from memory, without scanning the app directories first."""
+        return self._loaded
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    def entries(self):
+        self._ensure_loaded()
+        unique = {entry["path"]: entry for entry in self._keys.values()}
+        return sorted(unique.values(), key=lambda e: e["name"].lower())
+
+    def lookup(self, app_name: str):
+        """Best matching entry for a spoken/typed app name, or None."""
+        self._ensure_loaded()
+        query = normalize_name(app_name)
+        query = APP_ALIASES.get(query, query)
+        if not query:
+            return None
+        if query in self._keys:
+            return self._keys[query]
+        if len(query) < MIN_PREFIX_LENGTH:
+            return None
+        best, best_score = None, 0
+        query_tokens = query.split()
+        for key, entry in self._keys.items():
+            if key.startswith(query):
+                score = 80 - min(len(key) - len(query), 15)  # prefer the closest completion
+            elif all(any(t.startswith(q) for t in key.split()) for q in query_tokens):
+                score = 70 - min(len(key) - len(query), 15)
+            else:
+                ratio = difflib.SequenceMatcher(None, query, key).ratio()
+                score = int(ratio * 75) if ratio >= 0.8 else 0
+            if score > best_score:
+                best, best_score = entry, score
+        return best if best_score >= MIN_SCORE else None
+
+    def spawn(self, app_name: str):
+        """Starts the matching app directly; returns (entry, process or None), or (None, None) if it can't.
+
+        The process is only known for apps started from a command line (`start_new_session`
+        makes it the leader of its own process group); shortcuts opened by the OS have none.
+        """
+        entry = self.lookup(app_name)
+        if entry is None and self._loaded and self.refresh():
+            entry = self.lookup(app_name)  # something was installed since the last scan
+        if entry is None:
+            return None, None
+        process = None
+        try:
+            if entry["argv"]:
+                process = subprocess.Popen(entry["argv"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                           start_new_session=True)
+            elif sys.platform.startswith("win"):
+                os.startfile(entry["path"])
+            else:
+                subprocess.Popen(["open", entry["path"]])
+        except OSError as e:
+            print(f"[Launcher] Could not start {entry['name']}: {e}")
+            return None, None
+        print(f"🚀 Launched {entry['name']} directly")
+        return entry, process
+
+    def launch(self, app_name: str) -> bool:
+        """Spawns the matching app directly. Returns False if it isn't indexed or fails to start."""
+        entry, _ = self.spawn(app_name)
+        return entry is not None
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> AppIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AppIndex()
+    return _index
+
+
+def warm_in_background():
+    """Loads/refreshes the index off the critical path so the first launch doesn't pay for it."""
+    def warm():
+        with startup_profile.step("app index"):
+            get_index().refresh()
+    thread = threading.Thread(target=warm, name="app-index", daemon=True)
+    thread.start()
+    return thread
+
+
+def spawn(app_name: str):
+    return get_index().spawn(app_name)
+
+
+def launch(app_name: str) -> bool:
+    return get_index().launch(app_name)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect FRIDAY's application launch index.")
+    parser.add_argument("app", nargs="?", help="app name to look up and launch")
+    parser.add_argument("--dirs", nargs="+", help="scan these directories instead of the system ones")
+    parser.add_argument("--list", action="store_true", help="list every indexed app")
+    parser.add_argument("--dry-run", action="store_true", help="show the match without launching")
+    args = parser.parse_args()
+    index = AppIndex(args.dirs, cache_name=None) if args.dirs else get_index()
+    if args.list:
+        for entry in index.entries():
+            print(f"{entry['name']:<40} {' '.join(entry['argv']) if entry['argv'] else entry['path']}")
+    if args.app:
+        entry = index.lookup(args.app)
+        print(entry if entry else f"No match for '{args.app}'")
+        if entry and not args.dry_run:
+            index.launch(args.app)
@@ -0,0 +1,311 @@
+"""Continuous microphone capture overlapped with speech recognition.
+
+A capture thread reads the microphone without pause and cuts the stream into
+phrases with `PhraseSegmenter` (an energy gate like `Recognizer.listen`, plus a
+pre-roll ring buffer so the start of a phrase - usually the wake word - isn't
+clipped). Finished phrases go into a bounded queue that a small pool of
+recognition workers drains, so audio keeps being recorded while earlier
+phrases are transcribed. `next_phrase()` hands results back in the order they
+were spoken.
+
+An optional `gate` (e.g. `WakeWordDetector.detect`) runs before recognition:
+phrases it rejects are never sent to the recognizer, and for accepted ones only
+the audio after the offset it returns is transcribed. `expect_follow_up()`
+lets answers to the assistant's own questions through without the wake word.
+
+If reading the microphone fails, the capture thread reopens it up to
+REOPEN_ATTEMPTS times in a row; after that the pipeline stops (`running` is
+False) and `error` holds the last exception.
+"""
+import math
+import time
+import queue
+import threading
+import collections
+from array import array
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 4
+PRE_ROLL = 0.5            # seconds kept from before the energy gate opened
+MAX_PHRASE = 15.0         # seconds; matches the push-to-talk phrase limit
+MIN_COMMAND = 0.3         # seconds; less speech than this after the wake word means "just the wake word"
+REOPEN_ATTEMPTS = 3       # consecutive microphone failures before the pipeline gives up
+REOPEN_DELAY = 1.0        # seconds between attempts (e.g. while a USB microphone reconnects)
+_ARRAY_TYPES = {1: "b", 2: "h", 4: "i"}
+
+
+def rms(chunk: bytes, sample_width: int = 2) -> float:
+    samples = array(_ARRAY_TYPES[sample_width], chunk)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class PhraseSegmenter:
+    """Turns a stream of fixed-size audio chunks into phrases. `feed()` returns a phrase's bytes when one ends."""
+
+    def __init__(self, sample_rate: int, sample_width: int, chunk_size: int, energy_threshold: float = 300,
+                 pause_threshold: float = 0.8, min_phrase: float = 0.3, pre_roll: float = PRE_ROLL,
+                 max_phrase: float = MAX_PHRASE, dynamic_energy: bool = True, dynamic_damping: float = 0.15,
+                 dynamic_ratio: float = 1.5):
+        self.sample_width = sample_width
+        self.seconds_per_chunk = chunk_size / sample_rate
+        self.energy_threshold = energy_threshold
+        self.pause_chunks = max(1, math.ceil(pause_threshold / self.seconds_per_chunk))
+        self.min_speech_chunks = max(1, math.ceil(min_phrase / self.seconds_per_chunk))
+        self.max_chunks = math.ceil(max_phrase / self.seconds_per_chunk)
+        self.dynamic_energy = dynamic_energy
+        self.dynamic_damping = dynamic_damping
+        self.dynamic_ratio = dynamic_ratio
+        self._ring = collections.deque(maxlen=max(1, math.ceil(pre_roll / self.seconds_per_chunk)))
+        self._frames = None  # list while inside a phrase
+        self._speech_chunks = 0
+        self._silent_chunks = 0
+        self._pre_roll_chunks = 0
+        self.last_pre_roll = 0.0  # seconds of pre-roll at the start of the last returned phrase
+
+    @property
+    def in_phrase(self) -> bool:
+        return self._frames is not None
+
+    def _adapt(self, energy):
+        # Same update rule as speech_recognition's dynamic energy threshold.
+        damping = self.dynamic_damping ** self.seconds_per_chunk
+        self.energy_threshold = self.energy_threshold * damping + energy * self.dynamic_ratio * (1 - damping)
+
+    def feed(self, chunk: bytes):
+        energy = rms(chunk, self.sample_width)
+        if self._frames is None:
+            if energy > self.energy_threshold:
+                self._frames = list(self._ring) + [chunk]
+                self._pre_roll_chunks = len(self._ring)
+                self._ring.clear()
+                self._speech_chunks, self._silent_chunks = 1, 0
+            else:
+                self._ring.append(chunk)
+                if self.dynamic_energy:
+                    self._adapt(energy)
+            return None
+        self._frames.append(chunk)
+        if energy > self.energy_threshold:
+            self._speech_chunks += 1
+            self._silent_chunks = 0
+        else:
+            self._silent_chunks += 1
+        if self._silent_chunks < self.pause_chunks and len(self._frames) < self.max_chunks:
+            return None
+        return self._finish()
+
+    def flush(self):
+        """Ends the current phrase (e.g. at end of a recording); returns it or None."""
+        return self._finish() if self._frames is not None else None
+
+    def _finish(self):
+        frames, speech = self._frames, self._speech_chunks
+        self._frames = None
+        # Trailing silence becomes the next phrase's pre-roll.
+        tail = min(self._silent_chunks, len(frames) - 1)
+        for chunk in frames[len(frames) - tail:]:
+            self._ring.append(chunk)
+        if speech < self.min_speech_chunks:
+            return None  # a click or a bump, not speech
+        self.last_pre_roll = self._pre_roll_chunks * self.seconds_per_chunk
+        return b"".join(frames)
+
+
+class Phrase:
+    """`started_at` is when speech began (after the pre-roll), `ended_at` when the phrase was cut."""
+
+    def __init__(self, seq: int, audio, started_at: float, ended_at: float):
+        self.seq = seq
+        self.audio = audio
+        self.started_at = started_at
+        self.ended_at = ended_at
+        self.text = None
+        self.error = None
+        self.wake = None  # True/False once a gate has checked it for the wake word
+        self.recognized_at = None
+
+    def __repr__(self):
+        return (f"Phrase(#{self.seq}, {self.ended_at - self.started_at:.1f}s, wake={self.wake}, "
+                f"text={self.text!r}, error={self.error!r})")
+
+
+class AudioPipeline:
+    """Capture thread -> bounded phrase queue -> recognition worker pool -> in-order results."""
+
+    def __init__(self, recognizer, microphone, recognize=None, workers: int = DEFAULT_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, pre_roll: float = PRE_ROLL, max_phrase: float = MAX_PHRASE,
+                 gate=None):
+        self.recognizer = recognizer
+        self.microphone = microphone
+        self.recognize = recognize or recognizer.recognize_google
+        self.gate = gate
+        self._open_until = 0.0   # phrases starting before this skip the gate (see expect_follow_up)
+        self.workers = workers
+        self.pre_roll = pre_roll
+        self.max_phrase = max_phrase
+        self._phrases = queue.Queue(maxsize=queue_size)
+        self._results = {}       # seq -> recognized Phrase, until handed out in order
+        self._next_seq = 0       # next seq to hand out
+        self._captured = 0       # seq counter for the capture thread
+        self._done = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self._failures = 0
+        self.dropped = 0
+        self.error = None        # why capture stopped for good, if it did
+
+    def start(self):
+        if self._threads:
+            return self
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True)]
+        self._threads += [threading.Thread(target=self._recognize_loop, name=f"audio-recognize-{i}", daemon=True)
+                          for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+    def expect_follow_up(self, seconds: float):
+        """Transcribes phrases starting within the next `seconds` even without the wake word."""
+        self._open_until = time.monotonic() + seconds
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads) and not self._stop.is_set()
+
+    # ------------------ Capture ------------------
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            try:
+                self._capture()
+                return
+            except Exception as e:
+                self._failures += 1
+                print(f"[Audio] Microphone capture failed ({self._failures}/{REOPEN_ATTEMPTS}): {e}")
+                if self._failures >= REOPEN_ATTEMPTS:
+                    self.error = e
+                    self._stop.set()
+                    with self._done:
+                        self._done.notify_all()  # wake up next_phrase()
+                    return
+                self._stop.wait(REOPEN_DELAY)
+
+    def _capture(self):
+        import speech_recognition as sr
+        with self.microphone as source:
+            segmenter = PhraseSegmenter(
+                source.SAMPLE_RATE, source.SAMPLE_WIDTH, source.CHUNK,
+                energy_threshold=self.recognizer.energy_threshold,
+                pause_threshold=self.recognizer.pause_threshold,
+                min_phrase=self.recognizer.phrase_threshold,
+                pre_roll=self.pre_roll, max_phrase=self.max_phrase,
+                dynamic_energy=self.recognizer.dynamic_energy_threshold,
+                dynamic_damping=self.recognizer.dynamic_energy_adjustment_damping,
+                dynamic_ratio=self.recognizer.dynamic_energy_ratio,
+            )
+            while not self._stop.is_set():
+                chunk = source.stream.read(source.CHUNK)
+                self._failures = 0
+                data = segmenter.feed(chunk)
+                self.recognizer.energy_threshold = segmenter.energy_threshold
+                if data is None:
+                    continue
+                ended_at = time.monotonic()
+                duration = len(data) / (source.SAMPLE_RATE * source.SAMPLE_WIDTH)
+                audio = sr.AudioData(data, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                self._enqueue(audio, ended_at - duration + segmenter.last_pre_roll, ended_at)
+
+    def _enqueue(self, audio, started_at: float, ended_at: float):
+        phrase = Phrase(self._captured, audio, started_at, ended_at)
+        self._captured += 1
+        while True:
+            try:
+                self._phrases.put_nowait(phrase)
+                return
+            except queue.Full:
+                # Recognition can't keep up: drop the oldest waiting phrase, newer speech matters more.
+                try:
+                    stale = self._phrases.get_nowait()
+                except queue.Empty:
+                    continue
+                self.dropped += 1
+                self._publish(stale)
+
+    # ------------------ Recognition ------------------
+    def _recognize_loop(self):
+        import speech_recognition as sr
+        while not self._stop.is_set():
+            try:
+                phrase = self._phrases.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if self.gate is not None and phrase.started_at > self._open_until and not self._apply_gate(phrase, sr):
+                self._publish(phrase)
+                continue
+            try:
+                phrase.text = self.recognize(phrase.audio)
+            except sr.UnknownValueError:
+                phrase.text = None
+            except sr.RequestError as e:
+                phrase.error = e
+            except Exception as e:
+                phrase.error = e
+            phrase.recognized_at = time.monotonic()
+            self._publish(phrase)
+
+    def _apply_gate(self, phrase, sr) -> bool:
+        """Runs the gate; returns True if the phrase (possibly trimmed to the command) still needs recognizing."""
+        audio = phrase.audio
+        try:
+            offset = self.gate(audio.frame_data, audio.sample_rate, audio.sample_width)
+        except Exception as e:
+            print(f"[Audio] Wake-word gate failed, transcribing anyway: {e}")
+            return True
+        phrase.wake = offset is not None
+        if not phrase.wake:
+            return False
+        remainder = audio.frame_data[offset:]
+        step = int(0.02 * audio.sample_rate) * audio.sample_width
+        voiced = sum(1 for i in range(0, len(remainder), step)
+                     if rms(remainder[i:i + step], audio.sample_width) > self.recognizer.energy_threshold)
+        if voiced * 0.02 < MIN_COMMAND:
+            phrase.text = ""  # just the wake word; the caller asks what to do
+            phrase.recognized_at = time.monotonic()
+            return False
+        phrase.audio = sr.AudioData(remainder, audio.sample_rate, audio.sample_width)
+        return True
+
+    def _publish(self, phrase):
+        with self._done:
+            self._results[phrase.seq] = phrase
+            self._done.notify_all()
+
+    def next_phrase(self, timeout: float = None, since: float = None):
+        """Next recognized phrase in spoken order, or None on timeout.
+
+        Phrases that started before `since` (a time.monotonic() value, e.g. taken
+        right after the assistant finished speaking) are skipped, as are phrases
+        nothing could be recognized in and phrases the gate rejected.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._done:
+            while True:
+                while self._next_seq in self._results:
+                    phrase = self._results.pop(self._next_seq)
+                    self._next_seq += 1
+                    if since is not None and phrase.started_at < since:
+                        continue
+                    if phrase.text or phrase.error or phrase.wake:
+                        return phrase
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if (remaining is not None and remaining <= 0) or self.error is not None:
+                    return None
+                self._done.wait(remaining)
@@ -0,0 +1,266 @@
+"""Runs keyboard/mouse automation in a worker process supervised by a watchdog.
+
+The listener process keeps everything that is slow to set up (microphone
+calibration, the recognition pipeline, the text-to-speech engine, the Gemini
+connection, the caches) and hands only the GUI steps to the worker:
+
+* jobs wait in a priority queue and run one at a time, so the listener can
+  accept new commands while an action is still in progress;
+* `cancel()` stops the running job at its next wait or plan step (see
+  `waits.set_abort_check`) and releases the caller right away;
+* the watchdog restarts the worker when a job outlives its timeout (a hung
+  pyautogui call), does not stop within CANCEL_GRACE seconds of being
+  cancelled, or the process dies. The listener is not affected, and the
+  replacement process starts importing right away.
+
+Jobs are module-level functions (sent to the worker by reference) and their
+arguments. `initializer(notify)` runs once in each worker process;
+`notify(kind, payload)` reaches the listener's `on_event` (e.g. speech).
+
+    worker = AutomationWorker(initializer=setup, on_event=handle).start()
+    worker.submit(open_spotify_song, "believer").result()
+"""
+import time
+import pickle
+import queue
+import itertools
+import threading
+import multiprocessing
+import concurrent.futures
+
+URGENT, NORMAL = 0, 1
+JOB_TIMEOUT = 60.0      # seconds a job may run before the worker is restarted
+CANCEL_GRACE = 1.5      # seconds a cancelled job gets to stop at its next step
+STARTUP_TIMEOUT = 30.0  # seconds for a (re)started worker to finish importing
+STOP_TIMEOUT = 2.0      # seconds to wait for a terminated worker before killing it
+POLL_INTERVAL = 0.05
+MODIFIER_KEYS = ("ctrl", "shift", "alt", "win", "command")
+
+
+class WorkerRestarted(Exception):
+    """The job was cut short because the worker process had to be restarted."""
+
+
+class Job:
+    def __init__(self, seq: int, fn, args, timeout: float):
+        self.seq = seq
+        self.fn = fn
+        self.args = args
+        self.timeout = timeout
+        self.name = getattr(fn, "__name__", repr(fn))
+        self.future = concurrent.futures.Future()
+        self.finished = threading.Event()   # the worker is done with it (the future may be cancelled earlier)
+        self.cancel_requested_at = None
+
+    def __repr__(self):
+        return f"Job(#{self.seq}, {self.name})"
+
+
+def release_modifiers():
+    """Lets go of modifier keys that a killed job may have left held down."""
+    import pyautogui
+    for key in MODIFIER_KEYS:
+        try:
+            pyautogui.keyUp(key)
+        except Exception:
+            pass
+
+
+def _picklable(value):
+    try:
+        pickle.dumps(value)
+        return value
+    except Exception:
+        return None
+
+
+def _worker_main(jobs, events, cancel_flag, initializer):
+    import waits
+    waits.set_abort_check(cancel_flag.is_set)
+    if initializer is not None:
+        initializer(lambda kind, payload=None: events.put((kind, None, payload)))
+    events.put(("ready", None, None))
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        seq, fn, args = job
+        try:
+            events.put(("done", seq, _picklable(fn(*args))))
+        except BaseException as e:  # SystemExit too: only the listener decides when to stop
+            events.put(("failed", seq, f"{type(e).__name__}: {e}"))
+
+
+class AutomationWorker:
+    def __init__(self, initializer=None, on_event=None, job_timeout: float = JOB_TIMEOUT):
+        self.initializer = initializer
+        self.on_event = on_event
+        self.job_timeout = job_timeout
+        self.restarts = 0
+        self._context = multiprocessing.get_context("spawn")  # no inherited locks or GUI handles
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._jobs = {}            # seq -> Job, queued or running
+        self._current = None
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._process = None
+        self._pipes = None         # (jobs, events, cancel flag, ready) of the current process
+        self._stopping = False
+
+    # ------------------ Public API ------------------
+    def start(self):
+        with self._lock:
+            if self._process is None:
+                self._start_process()
+                threading.Thread(target=self._dispatch_loop, name="automation-dispatch", daemon=True).start()
+        return self
+
+    def submit(self, fn, *args, priority: int = NORMAL, timeout: float = None) -> concurrent.futures.Future:
+        """Queues `fn(*args)` for the worker; the future is cancelled if the job is."""
+        job = Job(next(self._seq), fn, args, timeout or self.job_timeout)
+        job.future.add_done_callback(lambda future: future.cancelled() and self._cancel_job(job))
+        with self._lock:
+            self._jobs[job.seq] = job
+        self._queue.put((priority, job.seq, job))
+        return job.future
+
+    def cancel(self, future=None):
+        """Cancels one job (by its future), or every queued and running job."""
+        if future is not None:
+            future.cancel()
+            return
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.future.cancel()
+
+    def shutdown(self):
+        self._stopping = True
+        self.cancel()
+        self._queue.put((-1, -1, None))
+        with self._lock:
+            process, pipes = self._process, self._pipes
+        if process is not None:
+            try:
+                pipes[0].put(None)
+            except (OSError, ValueError):
+                pass
+            self._stop_process(process)
+
+    # ------------------ Worker process ------------------
+    def _start_process(self):
+        self._generation += 1
+        jobs, events = self._context.Queue(), self._context.Queue()
+        cancel_flag, ready = self._context.Event(), threading.Event()
+        self._pipes = (jobs, events, cancel_flag, ready)
+        self._process = self._context.Process(target=_worker_main, args=(jobs, events, cancel_flag, self.initializer),
+                                              name="automation-worker", daemon=True)
+        self._process.start()
+        threading.Thread(target=self._read_events, args=(events, ready, self._generation),
+                         name="automation-events", daemon=True).start()
+
+    def _stop_process(self, process):
+        process.terminate()
+        process.join(STOP_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join(STOP_TIMEOUT)
+
+    def _restart(self, reason: str):
+        print(f"[Worker] Restarting the automation worker: {reason}")
+        with self._lock:
+            old = self._process
+            self._start_process()
+            self.restarts += 1
+        self._stop_process(old)
+        # Runs before anything queued, in case the job died holding a modifier key.
+        self.submit(release_modifiers, priority=URGENT, timeout=STOP_TIMEOUT * 5)
+
+    def _read_events(self, events, ready, generation):
+        while generation == self._generation and not self._stopping:
+            try:
+                kind, seq, payload = events.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError, ValueError):
+                return  # the process was terminated mid-write
+            if kind == "ready":
+                ready.set()
+            elif kind in ("done", "failed"):
+                with self._lock:
+                    job = self._jobs.get(seq)
+                if job is not None:
+                    self._finish(job, payload if kind == "done" else None,
+                                 None if kind == "done" else RuntimeError(payload))
+            elif self.on_event is not None:
+                try:
+                    self.on_event(kind, payload)
+                except Exception as e:
+                    print(f"[Worker] Event handler failed: {e}")
+
+    # ------------------ Dispatch and watchdog ------------------
+    def _finish(self, job, result=None, error=None):
+        with self._lock:
+            self._jobs.pop(job.seq, None)
+        job.finished.set()
+        try:
+            if error is None:
+                job.future.set_result(result)
+            else:
+                job.future.set_exception(error)
+        except concurrent.futures.InvalidStateError:
+            pass  # cancelled while it ran
+
+    def _cancel_job(self, job):
+        with self._lock:
+            running = self._current is job
+            if running:
+                job.cancel_requested_at = time.monotonic()
+                self._pipes[2].set()
+
+    def _dispatch_loop(self):
+        while not self._stopping:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            if job.future.cancelled():
+                self._finish(job)
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        if not self._process.is_alive():
+            self._restart("the worker process exited")
+        jobs, _, cancel_flag, ready = self._pipes
+        if not ready.wait(STARTUP_TIMEOUT):
+            self._restart("the worker did not start")
+            self._finish(job, error=WorkerRestarted("the automation worker did not start"))
+            return
+        try:
+            # Queue.put pickles in a feeder thread, where an error would only be printed and the job never run.
+            pickle.dumps((job.seq, job.fn, job.args))
+        except Exception as e:  # e.g. a lambda or an open window handle
+            self._finish(job, error=e)
+            return
+        with self._lock:
+            cancel_flag.clear()
+            self._current = job
+        jobs.put((job.seq, job.fn, job.args))
+        deadline = time.monotonic() + job.timeout
+        while not job.finished.wait(POLL_INTERVAL):
+            if not self._process.is_alive():
+                reason = f"the worker process exited during {job.name}"
+            elif time.monotonic() > deadline:
+                reason = f"{job.name} timed out after {job.timeout:.0f}s"
+            elif job.cancel_requested_at and time.monotonic() - job.cancel_requested_at > CANCEL_GRACE:
+                reason = f"{job.name} did not stop after being cancelled"
+            else:
+                continue
+            with self._lock:
+                self._current = None
+            self._restart(reason)
+            self._finish(job, error=WorkerRestarted(reason))
+            return
+        with self._lock:
+            self._current = None
@@ -0,0 +1,607 @@
+"""Recording fakes for FRIDAY's desktop, audio and Gemini backends, on a virtual clock.
+
+`install()` puts fake `pyautogui`, `pygetwindow`, `keyboard`,
+`speech_recognition`, `pyttsx3`, `google.generativeai` and `google.genai`
+modules into sys.modules - so it must run before the assistant scripts are
+imported - and points time.sleep / time.monotonic / time.perf_counter at a
+`VirtualClock`. Every fake charges its simulated latency to the clock, so a
+benchmark run takes a fraction of a second of real time while still reporting
+how long the same run would take on a real desktop.
+
+The fake desktop reacts to input the way the scripts expect: the Start menu
+opens on Win, typing + Enter launches the typed app (its window appears after
+the `launch` latency), Ctrl+V pastes the fake clipboard, and a browser tab's
+title changes after a URL is entered.
+"""
+import os
+import sys
+import json
+import time
+import types
+import tempfile
+import threading
+
+_real_monotonic = time.monotonic
+
+DEFAULT_LATENCIES = {
+    "llm": 0.9,           # one generate_content round trip
+    "llm_connect": 0.3,   # count_tokens prewarm
+    "recognize": 0.6,     # recognize_google
+    "launch": 2.5,        # cold app start until its window appears
+    "page_load": 1.2,     # browser title changes after navigating
+    "key": 0.008,         # per key press / hotkey
+    "click": 0.015,
+    "speech_word": 0.3,   # text-to-speech, per word
+}
+DEFAULT_APPS = ("Spotify", "Brave", "WhatsApp", "Discord", "Visual Studio Code")
+DEFAULT_FOLDERS = ("Projects/aiml-projects", "Projects/friday", "Documents/College/Semester 5")
+SETTLE = 0.002  # real seconds without sleep activity before the clock skips ahead
+BROWSERS = ("brave",)
+
+
+# ------------------ Virtual clock ------------------
+class Usage:
+    """Virtual seconds and call counts charged by kind ("sleep", "wait", "llm", ...) during one case."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+
+    def charge(self, kind: str, seconds: float = 0.0):
+        self.seconds[kind] = self.seconds.get(kind, 0.0) + seconds
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+
+
+class VirtualClock:
+    """Time that skips ahead while every sleeping thread is just waiting.
+
+    A sleep registers its wake-up time and blocks. Once no thread has started or
+    finished a sleep for SETTLE real seconds, the clock jumps to the earliest
+    wake-up, so fixed delays and simulated latencies cost (almost) no real time,
+    while sleeps on different threads still overlap as they would for real.
+    """
+
+    def __init__(self, settle: float = SETTLE):
+        self.settle = settle
+        self.skipped = 0.0      # virtual seconds added on top of real time
+        self.overhead = 0.0     # real seconds spent waiting for threads to settle
+        self.usage = Usage()
+        self._wakeups = []
+        self._activity = _real_monotonic()
+        self._cond = threading.Condition()
+        self._driver = None
+
+    def now(self) -> float:
+        return _real_monotonic() + self.skipped
+
+    def charge(self, kind: str, seconds: float = 0.0):
+        with self._cond:
+            self.usage.charge(kind, seconds)
+
+    def sleep(self, seconds: float, kind: str = "sleep"):
+        self.charge(kind, max(seconds, 0.0))
+        if seconds <= 0:
+            return
+        with self._cond:
+            if self._driver is None:
+                self._driver = threading.Thread(target=self._drive, name="virtual-clock", daemon=True)
+                self._driver.start()
+            wake = self.now() + seconds
+            self._wakeups.append(wake)
+            self._activity = _real_monotonic()
+            self._cond.notify_all()
+            while self.now() < wake:
+                self._cond.wait()
+            self._wakeups.remove(wake)
+            self._activity = _real_monotonic()
+            self._cond.notify_all()
+
+    def _drive(self):
+        with self._cond:
+            while True:
+                if not self._wakeups:
+                    self._cond.wait()
+                    continue
+                quiet = _real_monotonic() - self._activity
+                if quiet < self.settle:
+                    self._cond.wait(self.settle - quiet)
+                    continue
+                gap = min(self._wakeups) - self.now()
+                if gap > 0:
+                    self.skipped += gap
+                    self.overhead += quiet
+                self._activity = _real_monotonic()
+                self._cond.notify_all()
+
+    def patched_sleep(self, seconds):
+        # Condition polls (waits.wait_until) are reported apart from fixed delays.
+        caller = sys._getframe(1).f_code.co_name
+        self.sleep(seconds, "wait" if caller == "wait_until" else "sleep")
+
+
+# ------------------ Desktop ------------------
+class FakeClipboard:
+    def __init__(self):
+        self.text = ""
+
+    def get(self):
+        return self.text
+
+    def set(self, text):
+        self.text = text
+
+
+class FakeDesktop:
+    """Windows (window_backend.FakeWindowBackend) plus the keyboard/mouse behaviour the scripts rely on."""
+
+    def __init__(self, clock: VirtualClock, latencies: dict, apps=DEFAULT_APPS):
+        self.clock = clock
+        self.latencies = latencies
+        self.apps = tuple(apps)
+        self.windows = None
+        self.clipboard = FakeClipboard()
+        self.log = []         # (virtual time, event) for every input event and launch
+        self.typed = ""
+        self.search = None    # the Start menu window while it is open
+        self.reset()
+
+    def reset(self, open_apps=()):
+        """A fresh desktop: a focused terminal, plus `open_apps` already running."""
+        import window_backend
+        import window_registry
+        self.windows = window_backend.FakeWindowBackend(clock=self.clock.now)  # drops pending launches too
+        window_registry.reset_registry()
+        for app in open_apps:
+            self.windows.open_window(self.title_for(app), focus=False, wm_class=app.lower())
+        self.windows.open_window("Terminal")
+        self.typed = ""
+        self.search = None
+
+    def record(self, event: str):
+        self.log.append((self.clock.now(), event))
+
+    def title_for(self, app: str) -> str:
+        return "New Tab - Brave" if app.lower() in BROWSERS else app
+
+    def launch(self, app: str):
+        self.record(f"launch {app}")
+        self.windows.open_window(self.title_for(app), delay=self.latencies["launch"], wm_class=app.lower())
+
+    def open_path(self, path: str):
+        self.record(f"open {path}")
+        self.windows.open_window(os.path.basename(path.rstrip("/\\")) or path, delay=0.3)
+
+    # -------- input --------
+    def keys(self, combo):
+        combo = tuple(k.lower() for k in combo)
+        self.record("+".join(combo))
+        self.clock.sleep(self.latencies["key"], "input")
+        active = self.windows.active_window()
+        if combo in (("win",), ("super",), ("command", "space")):
+            self.search = self.windows.open_window("Search")
+            self.typed = ""
+        elif combo in (("ctrl", "v"), ("command", "v")):
+            self.type(self.clipboard.text, record=False)
+        elif combo in (("ctrl", "a"), ("delete",), ("backspace",)):
+            self.typed = ""
+        elif combo == ("ctrl", "t") and active is not None and active.title.lower().endswith(" - brave"):
+            self.windows.set_title(active, "New Tab - Brave")
+        elif combo == ("enter",):
+            if self.search is not None:
+                self.windows.close(self.search)
+                self.search = None
+                if self.typed.strip():
+                    self.launch(self.typed.strip())
+            elif active is not None and active.title.lower().endswith(" - brave") and self.typed.strip():
+                self.windows.set_title(active, f"{self.typed.strip()} - Brave", delay=self.latencies["page_load"])
+            self.typed = ""
+
+    def type(self, text: str, interval: float = 0.0, record: bool = True):
+        if record:
+            self.record(f"type {text!r}")
+        if interval:
+            self.clock.sleep(interval * len(text), "input")
+        self.typed += text
+
+    def click(self, x, y, clicks=1):
+        self.record(f"click {x},{y}" + (f" x{clicks}" if clicks != 1 else ""))
+        self.clock.sleep(self.latencies["click"], "input")
+
+
+class FakeAppIndex:
+    """Stands in for app_launcher.AppIndex: the desktop's apps are "installed", launching opens their window."""
+    loaded = True
+
+    def __init__(self, desktop: FakeDesktop):
+        self.desktop = desktop
+
+    def refresh(self, force: bool = False) -> int:
+        return 0
+
+    def entries(self):
+        return [{"name": app, "argv": [app.lower()], "path": None} for app in self.desktop.apps]
+
+    def lookup(self, app_name: str):
+        name = (app_name or "").lower().strip()
+        for entry in self.entries():
+            if name and entry["name"].lower().startswith(name):
+                return entry
+        return None
+
+    def spawn(self, app_name: str):
+        entry = self.lookup(app_name)
+        if entry is None:
+            return None, None
+        self.desktop.launch(entry["name"])
+        return entry, None
+
+    def launch(self, app_name: str) -> bool:
+        return self.spawn(app_name)[0] is not None
+
+
+def folder_tree(folders) -> str:
+    """A scratch home directory holding `folders`, for the real folder_index to scan."""
+    root = tempfile.mkdtemp(prefix="friday-home-")
+    for folder in folders:
+        os.makedirs(os.path.join(root, *folder.split("/")), exist_ok=True)
+    return root
+
+
+# ------------------ Gemini ------------------
+class FakeLLM:
+    """Answers from the corpus: intents and plans by command, URLs by target, tool calls and replies by prompt."""
+
+    def __init__(self, clock: VirtualClock, latencies: dict):
+        self.clock = clock
+        self.latencies = latencies
+        self.intents = {}
+        self.plans = {}
+        self.urls = {}
+        self.tool_calls = {}
+        self.replies = {}
+
+    @staticmethod
+    def key(text: str) -> str:
+        return " ".join((text or "").lower().split())
+
+    def _round_trip(self):
+        self.clock.sleep(self.latencies["llm"], "llm")
+
+    def connect(self):
+        self.clock.sleep(self.latencies["llm_connect"], "llm_connect")
+
+    def complete(self, prompt: str) -> str:
+        self._round_trip()
+        if "User commands:" in prompt:
+            plan = self.plans.get(self.key(prompt.rsplit("User commands:", 1)[1]))
+            return json.dumps({"actions": plan or []})
+        if "User command:" in prompt:
+            intent = self.intents.get(self.key(prompt.rsplit("User command:", 1)[1]))
+            return json.dumps(intent or {"action": None})
+        if "official website URL for:" in prompt:
+            return json.dumps({"url": self.urls.get(self.key(prompt.rsplit(":", 1)[1]), "")})
+        return "{}"
+
+    def tool_turn(self, prompt: str, has_tools: bool):
+        """(function calls, text) for a prompt; a follow-up turn (no tools) gets the scripted reply."""
+        self._round_trip()
+        call = self.tool_calls.get(self.key(prompt)) if has_tools else None
+        if call:
+            return [types.SimpleNamespace(name=call["name"], args=dict(call.get("args", {})))], None
+        return None, self.replies.get(self.key(prompt), "Done.")
+
+
+def _genai_legacy(llm: FakeLLM):
+    module = types.ModuleType("google.generativeai")
+
+    class GenerativeModel:
+        def __init__(self, model_name, **kwargs):
+            self.model_name = model_name
+
+        def generate_content(self, prompt, generation_config=None, **kwargs):
+            return types.SimpleNamespace(text=llm.complete(prompt))
+
+        def count_tokens(self, contents):
+            llm.connect()
+            return types.SimpleNamespace(total_tokens=1)
+
+    module.configure = lambda **kwargs: None
+    module.GenerativeModel = GenerativeModel
+    return module
+
+
+def _genai(llm: FakeLLM):
+    module = types.ModuleType("google.genai")
+    types_module = types.ModuleType("google.genai.types")
+    errors_module = types.ModuleType("google.genai.errors")
+
+    class _Record:
+        def __init__(self, *args, **kwargs):
+            self.__dict__.update(kwargs)
+
+    class Part(_Record):
+        @classmethod
+        def from_text(cls, text=None, **kwargs):
+            return cls(text=text if text is not None else kwargs.get("text"))
+
+        @classmethod
+        def from_function_response(cls, name=None, response=None):
+            return cls(function_response=types.SimpleNamespace(name=name, response=response))
+
+    class GenerateContentConfig(_Record):
+        pass
+
+    class AutomaticFunctionCallingConfig(_Record):
+        pass
+
+    class Content(_Record):
+        pass
+
+    class APIError(Exception):
+        pass
+
+    def prompt_of(contents):
+        # The latest user text; earlier turns are history and function responses have no text.
+        for item in reversed(contents):
+            if isinstance(item, str):
+                return item
+            if getattr(item, "role", None) == "user":
+                text = " ".join(getattr(p, "text", "") or "" for p in item.parts)
+                if text:
+                    return text
+        return ""
+
+    class Models:
+        def generate_content(self, model=None, contents=(), config=None):
+            calls, text = llm.tool_turn(prompt_of(contents), bool(getattr(config, "tools", None)))
+            return types.SimpleNamespace(function_calls=calls, text=text)
+
+        def count_tokens(self, model=None, contents=None):
+            llm.connect()
+            return types.SimpleNamespace(total_tokens=1)
+
+    class Client:
+        def __init__(self, *args, **kwargs):
+            self.models = Models()
+
+    types_module.Part = Part
+    types_module.Content = Content
+    types_module.GenerateContentConfig = GenerateContentConfig
+    types_module.AutomaticFunctionCallingConfig = AutomaticFunctionCallingConfig
+    errors_module.APIError = APIError
+    module.Client = Client
+    module.types = types_module
+    module.errors = errors_module
+    return module, types_module, errors_module
+
+
+# ------------------ Input, audio, speech ------------------
+def _pyautogui(desktop: FakeDesktop):
+    module = types.ModuleType("pyautogui")
+    module.PAUSE = 0.1
+    module.FAILSAFE = True
+
+    class FailSafeException(Exception):
+        pass
+
+    def pause():
+        # Real pyautogui sleeps PAUSE after every call.
+        if module.PAUSE:
+            desktop.clock.sleep(module.PAUSE, "sleep")
+
+    def press(keys, presses=1, interval=0.0):
+        for _ in range(presses):
+            for key in ([keys] if isinstance(keys, str) else keys):
+                desktop.keys((key,))
+        pause()
+
+    def hotkey(*keys, **kwargs):
+        desktop.keys(keys)
+        pause()
+
+    def write(message, interval=0.0):
+        desktop.type(message, interval)
+        pause()
+
+    def click(x=None, y=None, clicks=1, **kwargs):
+        desktop.click(x, y, clicks)
+        pause()
+
+    def move_to(x=None, y=None, duration=0.0, **kwargs):
+        desktop.clock.sleep(duration, "input")
+        pause()
+
+    module.FailSafeException = FailSafeException
+    module.failSafeCheck = lambda: None
+    module.press = press
+    module.hotkey = hotkey
+    module.write = module.typewrite = write
+    module.click = click
+    module.moveTo = move_to
+    module.size = lambda: (1920, 1080)
+    module.position = lambda: (960, 540)
+    return module
+
+
+def _keyboard(desktop: FakeDesktop):
+    module = types.ModuleType("keyboard")
+    module.pressed = set()  # keys a benchmark wants is_pressed() to report
+
+    def send(sequence):
+        for combo in sequence.split(","):
+            desktop.keys(tuple(k.strip() for k in combo.split("+")))
+
+    module.is_pressed = lambda key: key in module.pressed
+    module.send = send
+    module.write = lambda text, delay=0: desktop.type(text, delay)
+    module.add_hotkey = lambda *args, **kwargs: None
+    return module
+
+
+def _pygetwindow(desktop: FakeDesktop):
+    module = types.ModuleType("pygetwindow")
+    module.getAllWindows = lambda: desktop.windows.windows()
+    module.getActiveWindow = lambda: desktop.windows.active_window()
+    module.getAllTitles = lambda: [w.title for w in desktop.windows.windows()]
+    module.getWindowsWithTitle = lambda title: [w for w in desktop.windows.windows() if title.lower() in w.title.lower()]
+    return module
+
+
+def _speech_recognition(clock: VirtualClock, latencies: dict, utterances: list):
+    """`utterances` is a queue of strings the fake microphone hears (None = silence until the timeout)."""
+    module = types.ModuleType("speech_recognition")
+
+    class WaitTimeoutError(Exception):
+        pass
+
+    class UnknownValueError(Exception):
+        pass
+
+    class RequestError(Exception):
+        pass
+
+    class AudioData:
+        def __init__(self, frame_data, sample_rate, sample_width, text=None):
+            self.frame_data = frame_data
+            self.sample_rate = sample_rate
+            self.sample_width = sample_width
+            self.text = text
+
+    class Microphone:
+        SAMPLE_RATE = 16000
+        SAMPLE_WIDTH = 2
+        CHUNK = 1024
+
+        def __init__(self, device_index=None, **kwargs):
+            self.device_index = device_index
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return False
+
+        @staticmethod
+        def get_pyaudio():
+            raise RequestError("no audio devices in benchmark mode")
+
+    class Recognizer:
+        def __init__(self):
+            self.energy_threshold = 300
+            self.pause_threshold = 0.8
+            self.phrase_threshold = 0.3
+            self.dynamic_energy_threshold = True
+            self.dynamic_energy_adjustment_damping = 0.15
+            self.dynamic_energy_ratio = 1.5
+
+        def adjust_for_ambient_noise(self, source, duration=1):
+            clock.sleep(duration, "listen")
+
+        def listen(self, source, timeout=None, phrase_time_limit=None):
+            text = utterances.pop(0) if utterances else None
+            if text is None:
+                clock.sleep(timeout or 0, "listen")
+                raise WaitTimeoutError("listening timed out")
+            clock.sleep(0.4 * len(text.split()) + 0.8, "listen")  # speaking, then the pause threshold
+            return AudioData(b"", Microphone.SAMPLE_RATE, Microphone.SAMPLE_WIDTH, text)
+
+        def recognize_google(self, audio, language=None, **kwargs):
+            clock.sleep(latencies["recognize"], "recognize")
+            if not audio.text:
+                raise UnknownValueError()
+            return audio.text
+
+    for item in (WaitTimeoutError, UnknownValueError, RequestError, AudioData, Microphone, Recognizer):
+        setattr(module, item.__name__, item)
+    return module
+
+
+def _pyttsx3(clock: VirtualClock, latencies: dict, spoken: list):
+    module = types.ModuleType("pyttsx3")
+
+    class Engine:
+        def __init__(self):
+            self._queue = []
+            self._properties = {"voice": "benchmark", "rate": 200, "volume": 1.0}
+
+        def say(self, text):
+            self._queue.append(text)
+
+        def runAndWait(self):
+            queue, self._queue = self._queue, []
+            for text in queue:
+                spoken.append(text)
+                clock.sleep(latencies["speech_word"] * len(text.split()), "speech")
+
+        def stop(self):
+            self._queue = []
+
+        def connect(self, name, callback):
+            return None
+
+        def getProperty(self, name):
+            return self._properties.get(name)
+
+        def setProperty(self, name, value):
+            self._properties[name] = value
+
+        def save_to_file(self, text, path):
+            raise RuntimeError("rendering to files is disabled in benchmark mode")
+
+    module.init = lambda *args, **kwargs: Engine()
+    return module
+
+
+# ------------------ Installation ------------------
+class Fakes:
+    def __init__(self, clock, desktop, llm, spoken, utterances):
+        self.clock = clock
+        self.desktop = desktop
+        self.llm = llm
+        self.spoken = spoken          # everything text-to-speech said
+        self.utterances = utterances  # what the fake microphone will hear next
+
+
+def install(latencies: dict = None, apps=DEFAULT_APPS) -> Fakes:
+    """Injects the fake modules and the virtual clock. Call before importing yes/yes3/main/main2."""
+    latencies = dict(DEFAULT_LATENCIES, **(latencies or {}))
+    clock = VirtualClock()
+    time.sleep = clock.patched_sleep
+    time.monotonic = clock.now
+    time.perf_counter = clock.now
+
+    desktop = FakeDesktop(clock, latencies, apps)
+    llm = FakeLLM(clock, latencies)
+    spoken, utterances = [], []
+    genai, genai_types, genai_errors = _genai(llm)
+    google = types.ModuleType("google")
+    google.__path__ = []
+    google.genai = genai
+    google.generativeai = _genai_legacy(llm)
+    sys.modules.update({
+        "pyautogui": _pyautogui(desktop),
+        "keyboard": _keyboard(desktop),
+        "pygetwindow": _pygetwindow(desktop),
+        "speech_recognition": _speech_recognition(clock, latencies, utterances),
+        "pyttsx3": _pyttsx3(clock, latencies, spoken),
+        "google": google,
+        "google.generativeai": google.generativeai,
+        "google.genai": genai,
+        "google.genai.types": genai_types,
+        "google.genai.errors": genai_errors,
+    })
+
+    # Point the shared helpers at the fake desktop.
+    import window_backend
+    import app_launcher
+    import text_input
+    import gemini_client
+    import folder_index
+    window_backend.set_backend(window_backend.PyGetWindowBackend())
+    # Its minutes-long sleeps would be skipped to whenever the other threads pause.
+    gemini_client.start_keepalive = lambda *args, **kwargs: None
+    app_launcher._index = FakeAppIndex(desktop)
+    folder_index._index = folder_index.FolderIndex([folder_tree(DEFAULT_FOLDERS)], cache_name=None)
+    text_input.get_clipboard = lambda: desktop.clipboard
+    os.startfile = desktop.open_path
+    return Fakes(clock, desktop, llm, spoken, utterances)
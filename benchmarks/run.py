@@ -0,0 +1,267 @@
+"""Headless end-to-end benchmark of FRIDAY's command paths.
+
+Runs the commands in corpus.json through `execute_command` in yes3.py and
+yes.py, the tool loop of `main.run_spotify_agent` and
+`main2.start_my_day_automation`, with every desktop, audio and Gemini backend
+replaced by the recording fakes in fakes.py, and reports for each command:
+
+* wall   - how long it would take on a real desktop (virtual clock)
+* work   - real time spent executing the assistant's own code
+* sleep  - fixed delays (time.sleep, pyautogui.PAUSE)
+* wait   - condition waits (waits.wait_until polling until a window/title shows up)
+* llm    - simulated Gemini latency, and the number of generate_content calls
+
+    python benchmarks/run.py                      # print the report
+    python benchmarks/run.py --check              # exit 1 if slower than baseline.json
+    python benchmarks/run.py --update-baseline    # accept the current numbers
+    python benchmarks/run.py --only yes3 --latency llm=2 --latency launch=5
+"""
+import os
+import sys
+import json
+import time
+import builtins
+import argparse
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+os.environ["FRIDAY_DATA_DIR"] = tempfile.mkdtemp(prefix="friday-bench-")  # cold caches, nothing of yours touched
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import fakes  # noqa: E402  (needs the repo root on sys.path)
+
+CORPUS_FILE = os.path.join(HERE, "corpus.json")
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+TARGETS = ("yes3", "yes", "main", "main2")
+WALL_TOLERANCE = 0.10    # fraction slower than the baseline that still passes
+WALL_SLACK = 0.05        # seconds, so tiny commands don't flap on scheduling noise
+_real_perf_counter = time.perf_counter
+
+
+class Case:
+    def __init__(self, target: str, spec: dict):
+        self.target = target
+        self.spec = spec
+        self.name = spec["name"]
+        self.result = None
+
+    @property
+    def key(self):
+        return f"{self.target}:{self.name}"
+
+
+class Meter:
+    """Measures one case: virtual wall time, real work time and what the fakes charged."""
+
+    def __init__(self, fake):
+        self.fake = fake
+
+    def start(self, case):
+        self.fake.clock.usage = fakes.Usage()
+        self.fake.desktop.reset(case.spec.get("open_apps", ()))
+        self._llm_calls = 0
+        self._virtual = self.fake.clock.now()
+        self._real = _real_perf_counter()
+        self._overhead = self.fake.clock.overhead
+
+    def stop(self, case):
+        clock = self.fake.clock
+        seconds, calls = clock.usage.seconds, clock.usage.calls
+        real = _real_perf_counter() - self._real - (clock.overhead - self._overhead)
+        case.result = {
+            "wall": round(clock.now() - self._virtual, 3),
+            "work": round(max(real, 0.0), 3),
+            "sleep": round(seconds.get("sleep", 0.0), 3),
+            "wait": round(seconds.get("wait", 0.0), 3),
+            "input": round(seconds.get("input", 0.0), 3),
+            "llm": round(seconds.get("llm", 0.0), 3),
+            "llm_calls": calls.get("llm", 0),
+            "speech": round(seconds.get("speech", 0.0), 3),
+        }
+
+
+# ------------------ Drivers ------------------
+def answer_with(case):
+    """input() for follow-up questions (e.g. "app or website?") answers from the case."""
+    builtins.input = lambda prompt="": case.spec.get("answer", "")
+
+
+def run_yes3(fake, meter, cases):
+    import yes3
+    yes3.voice.phrase_cache = None  # the fake engine can't render audio files
+    for case in cases:
+        answer_with(case)
+        meter.start(case)
+        yes3.execute_command(case.spec["command"], mode="typing", wait=True)
+        meter.stop(case)
+        yes3.voice.wait_idle(timeout=5)
+
+
+def run_yes(fake, meter, cases):
+    import yes
+    for case in cases:
+        answer_with(case)
+        meter.start(case)
+        try:
+            yes.execute_command(case.spec["command"])
+        except SystemExit:
+            pass
+        meter.stop(case)
+
+
+def run_main(fake, meter, cases):
+    import main
+    pending = list(cases)
+    current = []
+
+    def next_prompt(prompt=""):
+        # Each prompt the agent reads starts the next case; "quit" ends the loop.
+        if current:
+            meter.stop(current.pop())
+        if not pending:
+            return "quit"
+        case = pending.pop(0)
+        current.append(case)
+        meter.start(case)
+        return case.spec["command"]
+
+    builtins.input = next_prompt
+    main.run_spotify_agent()
+
+
+def run_main2(fake, meter, cases):
+    import main2
+    for case in cases:
+        meter.start(case)
+        main2.start_my_day_automation()
+        meter.stop(case)
+
+
+DRIVERS = {"yes3": run_yes3, "yes": run_yes, "main": run_main, "main2": run_main2}
+
+
+def load_corpus(fake, path=CORPUS_FILE, only=None):
+    with open(path, encoding="utf-8") as f:
+        corpus = json.load(f)
+    cases = {}
+    for target in TARGETS:
+        if only and target not in only:
+            continue
+        cases[target] = [Case(target, spec) for spec in corpus.get(target, [])]
+        for spec in corpus.get(target, []):
+            if "llm" in spec:
+                fake.llm.intents[fake.llm.key(spec["command"])] = spec["llm"]
+            if "plan" in spec:
+                fake.llm.plans[fake.llm.key(spec["command"])] = spec["plan"]
+            if "tool_call" in spec:
+                fake.llm.tool_calls[fake.llm.key(spec["command"])] = spec["tool_call"]
+            if "reply" in spec:
+                fake.llm.replies[fake.llm.key(spec["command"])] = spec["reply"]
+    for target, url in corpus.get("urls", {}).items():
+        fake.llm.urls[fake.llm.key(target)] = url
+    return cases
+
+
+# ------------------ Report ------------------
+COLUMNS = ("wall", "work", "sleep", "wait", "input", "llm", "llm_calls")
+
+
+def format_report(cases) -> str:
+    lines = [f"{'case':<34}" + "".join(f"{c:>10}" for c in COLUMNS)]
+    for target, target_cases in cases.items():
+        totals = dict.fromkeys(COLUMNS, 0)
+        for case in target_cases:
+            if case.result is None:
+                lines.append(f"{case.key:<34}   (did not run)")
+                continue
+            lines.append(f"{case.key:<34}" + "".join(f"{case.result[c]:>10}" for c in COLUMNS))
+            for c in COLUMNS:
+                totals[c] += case.result[c]
+        if target_cases:
+            lines.append(f"{'  total ' + target:<34}" + "".join(
+                f"{round(totals[c], 3):>10}" for c in COLUMNS))
+    return "\n".join(lines)
+
+
+def compare(cases, baseline) -> list:
+    """Regressions against the baseline: slower wall time or more LLM calls."""
+    problems = []
+    for target_cases in cases.values():
+        for case in target_cases:
+            base = baseline.get(case.key)
+            if base is None or case.result is None:
+                continue
+            if case.result["wall"] > base["wall"] * (1 + WALL_TOLERANCE) + WALL_SLACK:
+                problems.append(f"{case.key}: wall {case.result['wall']}s vs baseline {base['wall']}s")
+            if case.result["llm_calls"] > base["llm_calls"]:
+                problems.append(f"{case.key}: {case.result['llm_calls']} LLM calls vs baseline {base['llm_calls']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless end-to-end benchmark with fake backends.")
+    parser.add_argument("--only", nargs="+", choices=TARGETS, help="run only these scripts")
+    parser.add_argument("--latency", action="append", default=[], metavar="KIND=SECONDS",
+                        help=f"override a simulated latency ({', '.join(fakes.DEFAULT_LATENCIES)})")
+    parser.add_argument("--corpus", default=CORPUS_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="save these results as the new baseline")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    latencies = {}
+    for item in args.latency:
+        kind, _, seconds = item.partition("=")
+        if kind not in fakes.DEFAULT_LATENCIES:
+            parser.error(f"unknown latency kind: {kind}")
+        latencies[kind] = float(seconds)
+
+    fake = fakes.install(latencies)
+    cases = load_corpus(fake, args.corpus, args.only)
+    meter = Meter(fake)
+    real_input, real_stdout = builtins.input, sys.stdout
+    started = _real_perf_counter()
+    for target, target_cases in cases.items():
+        if not target_cases:
+            continue
+        sys.stdout = open(os.devnull, "w", encoding="utf-8")  # the scripts narrate every step
+        try:
+            DRIVERS[target](fake, meter, target_cases)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+            builtins.input = real_input
+    print(format_report(cases))
+    print(f"\nBenchmark ran in {_real_perf_counter() - started:.2f}s of real time.")
+
+    results = {case.key: case.result for target_cases in cases.values() for case in target_cases if case.result}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = compare(cases, json.load(f))
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems and args.check:
+            return 1
+        if not problems:
+            print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Runs each assistant command as an asyncio task so its stages can overlap.
+
+`CommandRunner` owns an event loop on a background thread. `submit()` starts a
+command coroutine and cancels the one still running, so a newer command
+supersedes an older one instead of queuing behind it. Inside a command:
+
+* `await command.run(fn, ...)` runs blocking work (Gemini calls, listening for
+  an answer, speech that must finish) on a worker thread, so several stages
+  can be in flight at once;
+* `await command.gui(fn, ...)` does the same for anything that types, clicks
+  or focuses a window, under one focus lock so only one command drives the
+  keyboard and mouse at a time.
+
+A thread can't be stopped halfway through a pyautogui call, so cancellation
+takes effect between stages: a superseded command stops at its next `await`,
+and a GUI stage still waiting for the focus lock is skipped instead of running
+late.
+
+With `runner.automation` set (an automation_worker.AutomationWorker), GUI
+stages run in that worker process instead. They are queued there one at a
+time, and cancelling the command also stops its running stage at the stage's
+next wait or plan step.
+"""
+import time
+import asyncio
+import itertools
+import contextvars
+import threading
+import concurrent.futures
+
+import tracing
+
+DEFAULT_WORKERS = 8  # superseded commands may still hold a worker until their blocking call returns
+
+
+class Superseded(Exception):
+    """Raised by a GUI stage whose command was cancelled while it waited for focus."""
+
+
+class Command:
+    def __init__(self, runner, seq: int, name: str):
+        self.runner = runner
+        self.seq = seq
+        self.name = name
+        self.cancelled = threading.Event()  # visible to worker threads, unlike task cancellation
+        self.task = None
+        self.jobs = []   # automation worker futures of this command's GUI stages
+
+    async def run(self, fn, *args):
+        # In a copy of the task's context, so the worker's tracing spans belong to this command.
+        context = contextvars.copy_context()
+        return await self.runner.loop.run_in_executor(self.runner.executor, context.run, fn, *args)
+
+    async def gui(self, fn, *args):
+        if self.runner.automation is not None:
+            return await asyncio.wrap_future(self._submit_gui(fn, args))
+
+        def with_focus():
+            with self.runner.focus_lock:
+                if self.cancelled.is_set():
+                    raise Superseded(self.name)
+                return fn(*args)
+        return await self.run(with_focus)
+
+    def call_gui(self, fn, *args):
+        """Blocking `gui()` for threads that already hold the focus lock (e.g. task_graph tasks)."""
+        if self.cancelled.is_set():
+            raise Superseded(self.name)
+        if self.runner.automation is None:
+            return fn(*args)
+        try:
+            return self._submit_gui(fn, args).result()
+        except concurrent.futures.CancelledError:
+            raise Superseded(self.name)
+
+    def _submit_gui(self, fn, args):
+        if self.cancelled.is_set():
+            raise Superseded(self.name)
+        future = self.runner.automation.submit(fn, *args)
+        self.jobs.append(future)
+        # The worker's own spans stay in its process; the listener traces the round trip.
+        context, started = contextvars.copy_context(), time.perf_counter()
+        future.add_done_callback(lambda _: context.run(
+            tracing.record, f"worker.{fn.__name__}", time.perf_counter() - started))
+        return future
+
+    def cancel(self):
+        self.cancelled.set()
+        if self.runner.automation is not None:
+            for future in self.jobs:
+                self.runner.automation.cancel(future)
+        if self.task is not None:
+            self.task.cancel()
+
+    def __repr__(self):
+        return f"Command(#{self.seq}, {self.name!r}, cancelled={self.cancelled.is_set()})"
+
+
+class CommandRunner:
+    def __init__(self, workers: int = DEFAULT_WORKERS, automation=None):
+        self.workers = workers
+        self.automation = automation
+        self.loop = None
+        self.executor = None
+        self.focus_lock = threading.Lock()
+        self.current = None
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.executor = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="command")
+                threading.Thread(target=self.loop.run_forever, name="commands", daemon=True).start()
+
+    def submit(self, coroutine_fn, *args, name: str = "command") -> concurrent.futures.Future:
+        """Starts `coroutine_fn(command, *args)`, superseding the command still running.
+
+        The returned future is cancelled if a later command supersedes this one.
+        """
+        self._ensure_started()
+        command = Command(self, next(self._seq), name)
+
+        async def start():
+            command.task = asyncio.current_task()
+            if self.current is not None:
+                self.current.cancel()
+            self.current = command
+            try:
+                return await coroutine_fn(command, *args)
+            finally:
+                if self.current is command:
+                    self.current = None
+
+        return asyncio.run_coroutine_threadsafe(start(), self.loop)
+
+    def cancel_current(self):
+        """Cancels whatever command is running (safe to call from any thread)."""
+        if self.loop is None:
+            return
+        def cancel():
+            if self.current is not None:
+                self.current.cancel()
+        self.loop.call_soon_threadsafe(cancel)
@@ -0,0 +1,198 @@
+"""Deterministic fast-path parser for common FRIDAY commands.
+
+Recognizes the same action set as `ask_gemini_for_command` in English, Romanized
+Hindi and Devanagari, and returns the same dict shape together with a confidence
+score. Callers only fall back to Gemini when the confidence is too low.
+
+`parse_compound` splits a command with several requests ("open discord, play
+seed by aurora and open github") into one intent per part.
+"""
+import re
+
+from intent_cache import WAKE_WORDS
+from intent_schema import needs_focus, normalize_url
+import site_index
+import app_launcher
+
+FAST_PATH_MIN_CONFIDENCE = 0.8
+
+SYSTEM_FOLDER_NAMES = {
+    "downloads": "downloads", "download": "downloads", "डाउनलोड": "downloads", "डाउनलोड्स": "downloads",
+    "documents": "documents", "document": "documents", "डॉक्यूमेंट्स": "documents", "दस्तावेज़": "documents",
+    "desktop": "desktop", "डेस्कटॉप": "desktop",
+    "pictures": "pictures", "photos": "pictures", "पिक्चर्स": "pictures", "फोटो": "pictures",
+    "videos": "videos", "वीडियो": "videos",
+    "music": "music", "म्यूजिक": "music", "संगीत": "music",
+}
+
+# Apps we can say "open X" about without asking Gemini whether X is an app.
+KNOWN_APPS = {
+    "spotify", "discord", "whatsapp", "brave", "chrome", "firefox", "notepad", "calculator",
+    "vs code", "vscode", "visual studio code", "file explorer", "explorer", "settings",
+    "terminal", "cmd", "command prompt", "word", "excel", "powerpoint", "telegram", "steam",
+    # Desktop apps that share their name with a website, so "open zoom" still asks which one.
+    "zoom", "slack", "teams", "microsoft teams", "outlook", "mail", "maps", "calendar",
+}
+
+MESSAGE_APPS = {
+    "whatsapp": "whatsapp", "व्हाट्सएप": "whatsapp", "व्हाट्सऐप": "whatsapp", "वॉट्सऐप": "whatsapp",
+    "discord": "discord", "डिस्कॉर्ड": "discord",
+}
+
+# ------------------ Grammar ------------------
+_APP = r"(?P<app>whatsapp|discord|व्हाट्सएप|व्हाट्सऐप|वॉट्सऐप|डिस्कॉर्ड)"
+_ON = r"(?:on|in|pe|par|per|पर|पे|में)"
+_OPEN = r"(?:open|launch|start|run)"
+_OPEN_HI = r"(?:kholo|khol do|khol|open karo|open kar do|chalu karo|खोलो|खोल दो|चालू करो)"
+_CLOSE = r"(?:close|band karo|band kar do|bandh karo|बंद करो|बंद कर दो)"
+_PLAY = r"(?:play|put on)"
+_PLAY_HI = r"(?:chalao|chala do|bajao|baja do|sunao|laga do|play karo|play kar do|चलाओ|चला दो|बजाओ|बजा दो|सुनाओ|लगा दो)"
+_SEND_HI = r"(?:bhejo|bhej do|send karo|send kar do|भेजो|भेज दो)"
+_SPOTIFY = r"(?:spotify|स्पॉटिफाई|स्पोटिफाई)"
+_YOUTUBE = r"(?:youtube|यूट्यूब)"
+_SONG = r"(?:songs?|gaana|gana|gaane|gane|गाना|गाने|गीत)"
+_FOLDER = r"(?:folder|directory|फ़ोल्डर|फोल्डर)"
+_WEBSITE = r"(?:website|site|वेबसाइट)"
+_DOMAIN = r"(?P<target>(?:https?://)?[\w\-]+(?:\.[\w\-]+)*\.(?:com|org|net|in|io|dev|co|ai|edu|gov|me|app|tv)(?:/\S*)?)"
+
+# (action, confidence, pattern). The first matching rule wins, so the most
+# specific phrasings come before the generic ones.
+RULES = [
+    ("exit", 1.0, r"(?:exit|quit|goodbye|bye|shut down|band karo|alvida|बंद करो|अलविदा)"),
+
+    # -------- Messaging --------
+    ("send_message", 0.95, rf"(?:send )?(?:a )?(?:message|msg|text) (?:to )?(?P<recipient>.+?) {_ON} {_APP}(?: saying| that)?[ :,]+(?P<message>.+)"),
+    ("send_message", 0.9, rf"(?:send|tell) (?P<recipient>.+?) {_ON} {_APP}(?: saying| that)?[ :,]+(?P<message>.+)"),
+    ("send_message", 0.9, rf"{_APP} (?:message|msg|text) (?:to )?(?P<recipient>.+?)(?: saying| that)?[ :,]+(?P<message>.+)"),
+    ("send_message", 0.9, rf"(?P<recipient>.+?) (?:ko|को) {_APP} {_ON} (?:(?:message|msg|मैसेज|संदेश)(?: karo| kar do| करो| कर दो)? )?(?:(?:ki|कि) )?(?P<message>.+?)(?: {_SEND_HI})?"),
+
+    # -------- YouTube --------
+    ("open_website", 0.95, rf"(?P<target>{_YOUTUBE}) (?:{_OPEN}|{_OPEN_HI})"),
+    ("play_youtube", 0.95, rf"(?:{_PLAY}|watch|search) (?P<target>.+?) {_ON} {_YOUTUBE}"),
+    # "youtube kholo" / "youtube band karo" are not searches for "kholo" / "band karo".
+    ("play_youtube", 0.9, rf"(?:search )?{_YOUTUBE} (?:for |{_ON} )?(?!(?:{_OPEN}|{_OPEN_HI}|{_CLOSE})$)(?P<target>.+?)(?: {_PLAY_HI}| dikhao| दिखाओ)?"),
+    ("play_youtube", 0.9, rf"{_YOUTUBE} {_ON} (?P<target>.+?) (?:{_PLAY_HI}|dikhao|दिखाओ)"),
+
+    # -------- Spotify --------
+    ("play_song", 0.95, rf"{_PLAY} (?P<target>.+?) {_ON} {_SPOTIFY}"),
+    ("play_song", 0.95, rf"{_SPOTIFY} {_ON} (?P<target>.+?)(?: {_SONG})? {_PLAY_HI}"),
+    ("play_song", 0.9, rf"{_PLAY} (?:the )?{_SONG} (?P<target>.+)"),
+    ("play_song", 0.9, rf"(?P<target>.+?) {_SONG} {_PLAY_HI}"),
+    ("play_song", 0.85, rf"{_PLAY} (?P<target>.+? by .+)"),
+    ("play_song", 0.8, rf"{_PLAY} (?P<target>.+)"),
+    ("play_song", 0.8, rf"(?P<target>.+?) {_PLAY_HI}"),
+
+    # -------- Folders --------
+    ("open_folder", 0.95, rf"{_OPEN} (?:the |my )?(?P<target>[\w\-. ]+?)(?: {_FOLDER})"),
+    ("open_folder", 0.95, rf"(?P<target>[\w\-. ]+?) {_FOLDER} {_OPEN_HI}"),
+    ("open_folder", 0.9, r"open (?:the |my )?(?P<target>downloads?|documents?|desktop|pictures|photos|videos|music)"),
+    ("open_folder", 0.9, rf"(?P<target>डाउनलोड्स?|डॉक्यूमेंट्स|दस्तावेज़|डेस्कटॉप|पिक्चर्स|फोटो|वीडियो|म्यूजिक|संगीत) {_OPEN_HI}"),
+
+    # -------- Websites --------
+    ("open_website", 0.95, rf"(?:{_OPEN}|go to|visit) {_DOMAIN}"),
+    ("open_website", 0.95, rf"{_DOMAIN} {_OPEN_HI}"),
+    ("open_website", 0.9, rf"(?:{_OPEN}|go to|visit) (?:the )?(?P<target>.+?) {_WEBSITE}"),
+    ("open_website", 0.9, rf"(?P<target>.+?) {_WEBSITE} {_OPEN_HI}"),
+
+    # -------- Apps --------
+    ("open_app", 0.9, rf"{_OPEN} (?:the )?(?P<target>.+?) (?:app|application|ऐप)"),
+    ("open_app", 0.9, rf"(?P<target>.+?) (?:app|application|ऐप) {_OPEN_HI}"),
+    ("open_app", 0.6, rf"{_OPEN} (?P<target>.+)"),
+    ("open_app", 0.6, rf"(?P<target>.+?) {_OPEN_HI}"),
+]
+
+COMPILED_RULES = [
+    (action, confidence, re.compile(rf"^{pattern}$", re.IGNORECASE))
+    for action, confidence, pattern in RULES
+]
+
+# Longer separators first, so "and then" isn't split at "and".
+_SEPARATOR = re.compile(
+    r"\s*,\s*(?:and then|and|then)?\s+|\s+(?:and then|and|then|aur phir|aur|phir|और फिर|और|फिर)\s+",
+    re.IGNORECASE,
+)
+
+_TRAILING_NOISE = re.compile(r"(?:\s+(?:please|plz|now|for me|na|zara|ज़रा|प्लीज़))+$", re.IGNORECASE)
+
+
+def _clean_command(command: str) -> str:
+    text = " ".join((command or "").split())
+    words = text.split(" ")
+    while words and words[0].lower().strip(",.!?") in WAKE_WORDS + ("hey", "ok", "okay"):
+        words.pop(0)
+    text = " ".join(words).strip(" ,.!?।")
+    return _TRAILING_NOISE.sub("", text)
+
+
+def _empty_intent():
+    return {"action": None, "target": None, "message_app": None, "recipient": None, "message": None, "url": None}
+
+
+def parse_command(command: str):
+    """Returns (intent_dict, confidence); (None, 0.0) when no rule matches."""
+    text = _clean_command(command)
+    if not text:
+        return None, 0.0
+    for action, confidence, pattern in COMPILED_RULES:
+        match = pattern.match(text)
+        if not match:
+            continue
+        groups = match.groupdict()
+        intent = _empty_intent()
+        intent["action"] = action
+        target = (groups.get("target") or "").strip(" ,.!?\"'")
+        if action == "send_message":
+            intent["message_app"] = MESSAGE_APPS[groups["app"].lower()]
+            intent["recipient"] = groups["recipient"].strip(" ,")
+            intent["message"] = groups["message"].strip()
+            if not intent["recipient"] or not intent["message"]:
+                continue
+        elif action == "open_folder":
+            intent["target"] = SYSTEM_FOLDER_NAMES.get(target.lower(), target)
+        elif action == "open_app" and target.lower() in KNOWN_APPS:
+            intent["target"] = target
+            intent["url"] = site_index.lookup(target)
+            confidence = max(confidence, 0.85)
+        elif action != "exit":
+            if not target:
+                continue
+            intent["target"] = target
+            if action in ("open_app", "open_website"):
+                intent["url"] = normalize_url(target) if "." in target else site_index.lookup(target)
+                apps = app_launcher.get_index()
+                if (confidence < FAST_PATH_MIN_CONFIDENCE and site_index.is_website(target)
+                        and apps.loaded and not apps.lookup(target)):
+                    # "open github": exactly a known site's name, and no installed app goes by it. An index
+                    # that is still loading would scan every app directory here, so the caller asks instead.
+                    intent["action"] = "open_website"
+                    confidence = 0.85
+        return intent, confidence
+    return None, 0.0
+
+
+def is_compound(command: str) -> bool:
+    """Whether the command might hold several requests (worth asking Gemini for a plan)."""
+    return len(_SEPARATOR.split(_clean_command(command))) > 1
+
+
+def parse_compound(command: str):
+    """Returns ([intent, ...], lowest confidence) for a command of two or more requests.
+
+    Every part has to parse on its own, so "play salt and pepper" and "message
+    mom on whatsapp milk and eggs" are not split: (None, 0.0). Only the last part
+    may be "exit" ("play believer and exit"). The parts don't depend on each
+    other (`depends_on` is empty).
+    """
+    parts = [part for part in _SEPARATOR.split(_clean_command(command)) if part.strip()]
+    if len(parts) < 2:
+        return None, 0.0
+    intents, lowest = [], 1.0
+    for i, part in enumerate(parts):
+        intent, confidence = parse_command(part)
+        if intent is None or (intent["action"] == "exit" and i < len(parts) - 1):
+            return None, 0.0
+        intent["depends_on"] = []
+        intent["needs_focus"] = needs_focus(intent)
+        intents.append(intent)
+        lowest = min(lowest, confidence)
+    return intents, lowest
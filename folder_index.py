@@ -0,0 +1,241 @@
+"""Index of the folders under your home directory, for opening them by name.
+
+The roots (your home directory, or FRIDAY_FOLDER_ROOTS separated by
+`os.pathsep`) are walked with `os.scandir` down to MAX_DEPTH levels, skipping
+hidden, system and build folders. The index is cached in
+`~/.friday/folder_index.json` with the mtime of every scanned directory; a
+refresh only lists directories whose mtime changed (a folder was created,
+renamed or removed inside them). Lookups match whole names, prefixes, word
+prefixes ("aiml proj" -> "aiml-projects") and close misspellings, and prefer
+the shallowest folder when several share a name.
+
+    python folder_index.py aiml projects      # show the best match
+    python folder_index.py --roots D:\\Work --list
+"""
+import os
+import re
+import difflib
+import threading
+
+import startup_profile
+from friday_store import load_json, save_json
+from app_launcher import normalize_name
+
+INDEX_FILE = "folder_index.json"
+INDEX_VERSION = 1
+MAX_DEPTH = 4          # folders this many levels below a root are still found
+MAX_DIRS = 20000       # scanned directories per refresh, so a huge tree can't stall it
+MIN_SCORE = 60
+MIN_PREFIX_LENGTH = 4  # shorter queries only match whole names ("p" doesn't open the first folder with a p)
+FUZZY_CUTOFF = 0.8
+
+SKIPPED_NAMES = {
+    "node_modules", "__pycache__", "site-packages", "venv", "env", "build", "dist", "target",
+    "appdata", "application data", "library", "local settings", "program files", "program files (x86)",
+    "programdata", "windows", "$recycle.bin", "system volume information",
+}
+_SPOKEN_NOISE = re.compile(r"^(?:my|the)\s+|\s+(?:folder|directory|फ़ोल्डर|फोल्डर)$")
+
+
+def default_roots():
+    roots = os.getenv("FRIDAY_FOLDER_ROOTS")
+    if roots:
+        return [r for r in roots.split(os.pathsep) if r]
+    return [os.path.expanduser("~")]
+
+
+def folder_key(name: str) -> str:
+    """'My AIML Projects folder' -> 'aiml projects', 'aiml-projects' / 'AIML_Projects' -> 'aiml projects'."""
+    return _SPOKEN_NOISE.sub("", normalize_name((name or "").replace("_", " ")))
+
+
+def list_subdirs(directory: str):
+    """Names of the folders directly inside `directory` worth indexing."""
+    names = []
+    try:
+        with os.scandir(directory) as it:
+            for item in it:
+                if item.name.startswith((".", "$")) or item.name.lower() in SKIPPED_NAMES:
+                    continue
+                try:
+                    if item.is_dir(follow_symlinks=False):
+                        names.append(item.name)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return names
+
+
+# ------------------ Index ------------------
+class FolderIndex:
+    def __init__(self, roots=None, cache_name: str = INDEX_FILE, max_depth: int = MAX_DEPTH):
+        self.roots = [os.path.abspath(r) for r in roots] if roots is not None else default_roots()
+        self.cache_name = cache_name
+        self.max_depth = max_depth
+        self._dirs = {}   # directory -> {"mtime": float, "subdirs": [names]}
+        self._keys = {}   # folder_key(name) -> [paths], shallowest first
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load_cache(self):
+        data = load_json(self.cache_name, {}) if self.cache_name else {}
+        if (data.get("version") == INDEX_VERSION and data.get("roots") == self.roots
+                and data.get("max_depth") == self.max_depth):
+            self._dirs = data.get("dirs", {})
+
+    def refresh(self, force: bool = False) -> int:
+        """Lists directories whose mtime changed (all of them if `force`); returns how many were listed."""
+        with self._lock:
+            if not self._loaded and not force:
+                self._load_cache()
+            current = {}
+            rescanned = 0
+            for root in self.roots:
+                stack = [(root, 0)]
+                while stack and len(current) < MAX_DIRS:
+                    directory, depth = stack.pop()
+                    try:
+                        mtime = os.stat(directory).st_mtime
+                    except OSError:
+                        continue
+                    cached = self._dirs.get(directory)
+                    if not force and cached and cached["mtime"] == mtime:
+                        subdirs = cached["subdirs"]
+                    else:
+                        subdirs = list_subdirs(directory)
+                        rescanned += 1
+                    current[directory] = {"mtime": mtime, "subdirs": subdirs}
+                    if depth + 1 < self.max_depth:
+                        stack.extend((os.path.join(directory, name), depth + 1) for name in subdirs)
+            changed = rescanned or set(current) != set(self._dirs)
+            self._dirs = current
+            self._rebuild_keys()
+            self._loaded = True
+            if changed and self.cache_name:
+                save_json(self.cache_name, {"version": INDEX_VERSION, "roots": self.roots,
+                                            "max_depth": self.max_depth, "dirs": self._dirs})
+            return rescanned
+
+    def _rebuild_keys(self):
+        keys = {}
+        for directory, info in self._dirs.items():
+            for name in info["subdirs"]:
+                key = folder_key(name)
+                if key:
+                    keys.setdefault(key, []).append(os.path.join(directory, name))
+        for paths in keys.values():
+            paths.sort(key=lambda p: (p.count(os.sep), len(p)))
+        self._keys = keys
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        if self.cache_name and not self._dirs:
+            with self._lock:
+                self._load_cache()
+                self._rebuild_keys()
+            if self._keys:
+                # Answer from the cached index now; pick up changes since it was saved off the critical path.
+                self._loaded = True
+                threading.Thread(target=self.refresh, name="folder-index", daemon=True).start()
+                return
+        self.refresh()
+
+    def folders(self):
+        self._ensure_loaded()
+        return sorted(path for paths in self._keys.values() for path in paths)
+
+    def lookup(self, folder_name: str, exact: bool = False):
+        """Path of the best matching folder for a spoken/typed name, or None.
+
+        `exact` only accepts the same words, spaced or punctuated differently.
+        """
+        self._ensure_loaded()
+        query = folder_key(folder_name)
+        if not query:
+            return None
+        keys = self._keys
+        if query in keys:
+            return keys[query][0]
+        compact = query.replace(" ", "")
+        if exact:
+            return next((paths[0] for key, paths in keys.items() if key.replace(" ", "") == compact), None)
+        query_tokens = query.split()
+        prefixes = len(compact) >= MIN_PREFIX_LENGTH
+        best, best_score = None, 0
+        for key, paths in keys.items():
+            if key.replace(" ", "") == compact:
+                score = 90  # "ai ml projects" vs "aiml-projects"
+            elif not prefixes:
+                continue
+            elif key.startswith(query):
+                score = 80 - min(len(key) - len(query), 15)
+            elif all(any(t.startswith(q) for t in key.split()) for q in query_tokens):
+                score = 70 - min(len(key) - len(query), 15)
+            else:
+                continue
+            if score > best_score:
+                best, best_score = paths[0], score
+        if best_score >= MIN_SCORE:
+            return best
+        # Only misspellings are left; get_close_matches filters with its cheap bounds first.
+        close = difflib.get_close_matches(query, keys, n=1, cutoff=FUZZY_CUTOFF)
+        return keys[close[0]][0] if close else None
+
+    def find(self, folder_name: str):
+        """`lookup`, refreshing once on a miss in case the folder was created since the last scan."""
+        path = self.lookup(folder_name)
+        if path is not None and not os.path.isdir(path):
+            path = None  # moved or deleted since it was indexed
+        if path is None and self.refresh():
+            path = self.lookup(folder_name)
+        return path
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> FolderIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FolderIndex()
+    return _index
+
+
+def warm_in_background():
+    """Loads/refreshes the index off the critical path so the first lookup doesn't pay for it."""
+    def warm():
+        with startup_profile.step("folder index"):
+            get_index().refresh()
+    thread = threading.Thread(target=warm, name="folder-index", daemon=True)
+    thread.start()
+    return thread
+
+
+def find(folder_name: str):
+    return get_index().find(folder_name)
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect FRIDAY's folder index.")
+    parser.add_argument("folder", nargs="*", help="folder name to look up")
+    parser.add_argument("--roots", nargs="+", help="index these directories instead of your home directory")
+    parser.add_argument("--depth", type=int, default=MAX_DEPTH, help="levels below each root (default: %(default)s)")
+    parser.add_argument("--list", action="store_true", help="list every indexed folder")
+    args = parser.parse_args()
+    index = FolderIndex(args.roots, cache_name=None, max_depth=args.depth) if args.roots else get_index()
+    started = time.perf_counter()
+    rescanned = index.refresh()
+    print(f"{len(index.folders())} folders, {rescanned} directories listed in {time.perf_counter() - started:.2f}s")
+    if args.list:
+        print("\n".join(index.folders()))
+    if args.folder:
+        name = " ".join(args.folder)
+        started = time.perf_counter()
+        path = index.lookup(name)
+        print(f"{path or f'No match for {name!r}'} ({(time.perf_counter() - started) * 1000:.1f}ms)")
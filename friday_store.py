@@ -0,0 +1,37 @@
+"""Shared on-disk location for FRIDAY's caches and learned state."""
+import os
+import json
+import tempfile
+
+# Override with FRIDAY_DATA_DIR to keep caches somewhere else (e.g. a portable install).
+DATA_DIR = os.getenv("FRIDAY_DATA_DIR", os.path.join(os.path.expanduser("~"), ".friday"))
+
+
+def data_path(name: str) -> str:
+    """Returns the absolute path of `name` inside the data directory, creating the directory if needed."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
+
+
+def load_json(name: str, default=None):
+    path = data_path(name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(name: str, data):
+    """Writes `data` atomically so a crash mid-write never leaves a half-written file behind."""
+    path = data_path(name)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
@@ -0,0 +1,125 @@
+"""Process-wide Gemini handles shared by main.py, yes.py and yes3.py.
+
+Building a model/client and opening the TLS connection costs noticeably more
+than a warm request, so both are created once, warmed in the background while
+the user is still picking a mode or the mic is calibrating, and then reused
+(the underlying HTTP/gRPC connection stays open between commands).
+"""
+import os
+import time
+import threading
+
+import startup_profile
+
+MODEL_NAME = "gemini-2.5-flash"
+KEEPALIVE_INTERVAL = 240  # seconds; servers drop idle connections after a few minutes
+KEEPALIVE_MAX_IDLE = 1800  # seconds without a real request after which the pings stop
+
+_lock = threading.RLock()
+_models = {}     # model name -> google.generativeai.GenerativeModel (yes.py / yes3.py)
+_client = None   # google.genai.Client (main.py)
+_configured = False
+_last_used = 0.0
+_keepalive_thread = None
+
+
+def _touch():
+    global _last_used
+    _last_used = time.monotonic()
+
+
+def _get_model(model_name: str):
+    global _configured
+    with _lock:
+        model = _models.get(model_name)
+        if model is None:
+            import google.generativeai as genai
+            if not _configured:
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+                _configured = True
+            model = _models[model_name] = genai.GenerativeModel(model_name)
+    return model
+
+
+def _get_client():
+    global _client
+    with _lock:
+        if _client is None:
+            from google import genai
+            _client = genai.Client()
+    return _client
+
+
+def get_model(model_name: str = MODEL_NAME):
+    """Returns the shared google.generativeai model, creating it on first use."""
+    _touch()
+    return _get_model(model_name)
+
+
+def get_client():
+    """Returns the shared google.genai client, creating it on first use."""
+    _touch()
+    return _get_client()
+
+
+def _warm(kind: str, model_name: str):
+    # count_tokens is the cheapest authenticated call: it opens the connection
+    # and validates the key without generating anything.
+    start = time.perf_counter()
+    try:
+        with startup_profile.step("gemini connection"):
+            if kind == "client":
+                get_client().models.count_tokens(model=model_name, contents="ping")
+            else:
+                get_model(model_name).count_tokens("ping")
+        print(f"[Gemini] Connection warmed in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        print(f"[Gemini] Prewarm failed (will retry on first command): {e}")
+
+
+def prewarm(kind: str = "model", model_name: str = MODEL_NAME, keepalive: bool = True) -> threading.Thread:
+    """Creates the shared handle and opens its connection on a background thread.
+
+    `kind` is "model" for the google.generativeai scripts and "client" for main.py.
+    """
+    thread = threading.Thread(target=_warm, args=(kind, model_name), name="gemini-prewarm", daemon=True)
+    thread.start()
+    if keepalive:
+        start_keepalive(kind, model_name)
+    return thread
+
+
+def _keepalive_loop(kind: str, model_name: str, interval: float, max_idle: float):
+    last_ping = 0.0
+    while True:
+        time.sleep(interval / 4)
+        now = time.monotonic()
+        idle = now - _last_used
+        # Pings don't count as use, so an assistant nobody talks to stops pinging after `max_idle`.
+        if idle < interval or idle > max_idle or now - last_ping < interval:
+            continue
+        last_ping = now
+        try:
+            if kind == "client":
+                _get_client().models.count_tokens(model=model_name, contents="ping")
+            else:
+                _get_model(model_name).count_tokens("ping")
+        except Exception:
+            pass  # the next real request reconnects on its own
+
+
+def start_keepalive(kind: str = "model", model_name: str = MODEL_NAME, interval: float = KEEPALIVE_INTERVAL,
+                    max_idle: float = KEEPALIVE_MAX_IDLE):
+    """Pings the API when idle so the pooled connection is still open for the next command.
+
+    Pings stop once nothing but pings has used the connection for `max_idle` seconds.
+    """
+    global _keepalive_thread
+    with _lock:
+        if _keepalive_thread is None:
+            _keepalive_thread = threading.Thread(
+                target=_keepalive_loop, args=(kind, model_name, interval, max_idle), name="gemini-keepalive",
+                daemon=True
+            )
+            _keepalive_thread.start()
+    return _keepalive_thread
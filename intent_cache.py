@@ -0,0 +1,176 @@
+"""Two-level (memory LRU + sqlite) cache for Gemini command intents.
+
+Keys are normalized commands, so "Friday, open   Downloads" and "open downloads"
+share one entry. Every cache is tied to a hash of the prompt template it was
+filled with; editing the template invalidates everything stored under the old one.
+Intents that carry free text from the command (send_message) are not cached:
+commands differing only in case share a key, and would replay the first casing.
+"""
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from friday_store import data_path
+
+WAKE_WORDS = ("friday", "फ्राईडे", "फ्राइडे")
+FILLER_PREFIXES = ("hey", "ok", "okay", "hi")
+
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+DEFAULT_MEMORY_SIZE = 256
+DEFAULT_DISK_SIZE = 5000
+UNCACHED_ACTIONS = ("send_message",)
+
+
+def normalize_command(command: str) -> str:
+    """Lowercases, strips punctuation/extra whitespace and any leading wake word."""
+    text = (command or "").lower()
+    # Drop punctuation/symbols by Unicode category so Devanagari vowel signs survive.
+    text = "".join(" " if unicodedata.category(ch)[0] in "PS" and ch not in "-." else ch for ch in text)
+    words = text.split()
+    while words and (words[0] in WAKE_WORDS or words[0] in FILLER_PREFIXES):
+        words.pop(0)
+    return " ".join(words).strip(" .")
+
+
+def template_version(template: str) -> str:
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:12]
+
+
+def is_cacheable(intent: dict) -> bool:
+    """False for an intent, or a plan ({"actions": [...]}), holding an action from UNCACHED_ACTIONS."""
+    actions = intent.get("actions") or [intent]
+    return not any(action.get("action") in UNCACHED_ACTIONS for action in actions)
+
+
+class IntentCache:
+    def __init__(self, name: str, prompt_template: str, ttl: float = DEFAULT_TTL,
+                 memory_size: int = DEFAULT_MEMORY_SIZE, disk_size: int = DEFAULT_DISK_SIZE):
+        self.version = template_version(prompt_template)
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.name = name
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (stored_at, intent)
+        self._lock = threading.Lock()
+        self._db = None
+
+    # ------------------ Disk layer ------------------
+    def _conn(self):
+        # Opened lazily so importing a script never touches the disk.
+        if self._db is None:
+            try:
+                self._db = sqlite3.connect(data_path(f"{self.name}.sqlite3"), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS intents ("
+                    "key TEXT PRIMARY KEY, version TEXT, intent TEXT, stored_at REAL, used_at REAL)"
+                )
+                # Prompt template changed -> everything cached under the old one is stale.
+                self._db.execute("DELETE FROM intents WHERE version != ?", (self.version,))
+                self._db.execute("DELETE FROM intents WHERE stored_at < ?", (time.time() - self.ttl,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"[Cache] Disk cache unavailable, using memory only: {e}")
+                self._db = False
+        return self._db
+
+    def _disk_get(self, key):
+        db = self._conn()
+        if not db:
+            return None
+        row = db.execute(
+            "SELECT intent, stored_at FROM intents WHERE key = ? AND version = ?", (key, self.version)
+        ).fetchone()
+        if not row:
+            return None
+        intent, stored_at = row
+        if time.time() - stored_at > self.ttl:
+            db.execute("DELETE FROM intents WHERE key = ?", (key,))
+            db.commit()
+            return None
+        db.execute("UPDATE intents SET used_at = ? WHERE key = ?", (time.time(), key))
+        db.commit()
+        return stored_at, json.loads(intent)
+
+    def _disk_put(self, key, stored_at, intent):
+        db = self._conn()
+        if not db:
+            return
+        db.execute(
+            "INSERT OR REPLACE INTO intents (key, version, intent, stored_at, used_at) VALUES (?, ?, ?, ?, ?)",
+            (key, self.version, json.dumps(intent, ensure_ascii=False), stored_at, stored_at),
+        )
+        # Size-based eviction: drop the least recently used rows beyond the limit.
+        db.execute(
+            "DELETE FROM intents WHERE key IN ("
+            "SELECT key FROM intents ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.disk_size,),
+        )
+        db.commit()
+
+    # ------------------ Memory layer ------------------
+    def _memory_put(self, key, stored_at, intent):
+        self._memory[key] = (stored_at, intent)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # ------------------ Public API ------------------
+    def get(self, command: str):
+        key = normalize_command(command)
+        if not key:
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and time.time() - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return dict(entry[1])
+            self._memory.pop(key, None)
+            try:
+                entry = self._disk_get(key)
+            except sqlite3.Error:
+                entry = None
+            if entry:
+                self._memory_put(key, *entry)
+                self.hits += 1
+                return dict(entry[1])
+            self.misses += 1
+            return None
+
+    def put(self, command: str, intent: dict):
+        key = normalize_command(command)
+        if not key or not intent or not is_cacheable(intent):
+            return
+        stored_at = time.time()
+        with self._lock:
+            self._memory_put(key, stored_at, dict(intent))
+            try:
+                self._disk_put(key, stored_at, intent)
+            except sqlite3.Error as e:
+                print(f"[Cache] Could not persist intent: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._conn()
+            if db:
+                db.execute("DELETE FROM intents")
+                db.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
@@ -0,0 +1,133 @@
+"""Response schema and strict parsing for Gemini's structured (JSON mode) replies.
+
+With `response_mime_type="application/json"` plus a schema, Gemini returns the
+whole intent - including the resolved website URL - in one call, and the reply
+is parsed as-is instead of being sliced out of free text with find("{").
+
+A command with several requests ("open discord, play seed by aurora and open
+github") is answered with PLAN_SCHEMA: the intents in spoken order, each with
+the earlier actions it has to wait for (`depends_on`).
+"""
+import json
+from urllib.parse import urlparse
+
+ACTIONS = ("open_app", "play_song", "open_website", "open_folder", "play_youtube", "send_message", "exit")
+MESSAGE_APPS = ("whatsapp", "discord")
+INTENT_FIELDS = ("action", "target", "message_app", "recipient", "message", "url")
+SYSTEM_FOLDERS = ("downloads", "documents", "desktop", "pictures", "videos", "music")
+
+INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": list(ACTIONS)},
+        "target": {"type": "string", "nullable": True},
+        "message_app": {"type": "string", "enum": list(MESSAGE_APPS), "nullable": True},
+        "recipient": {"type": "string", "nullable": True},
+        "message": {"type": "string", "nullable": True},
+        "url": {"type": "string", "nullable": True},
+    },
+    "required": ["action"],
+}
+
+URL_SCHEMA = {
+    "type": "object",
+    "properties": {"url": {"type": "string"}},
+    "required": ["url"],
+}
+
+PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "actions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    **INTENT_SCHEMA["properties"],
+                    "depends_on": {"type": "array", "items": {"type": "integer"}, "nullable": True},
+                },
+                "required": ["action"],
+            },
+        },
+    },
+    "required": ["actions"],
+}
+
+INTENT_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": INTENT_SCHEMA}
+URL_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": URL_SCHEMA}
+PLAN_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": PLAN_SCHEMA}
+
+
+def normalize_url(url):
+    """Returns a usable https URL, or None if `url` doesn't look like a website address."""
+    if not url:
+        return None
+    url = url.strip().strip("\"'").rstrip(".")
+    if not url or any(ch.isspace() for ch in url):
+        return None
+    if "://" not in url:
+        url = "https://" + url
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or "." not in parsed.netloc:
+        return None
+    return url
+
+
+def needs_focus(intent: dict) -> bool:
+    """Whether carrying out `intent` types, clicks or activates a window.
+
+    Only opening a system folder doesn't: it goes straight to the file manager.
+    """
+    if intent["action"] == "exit":
+        return False
+    return not (intent["action"] == "open_folder" and (intent["target"] or "").lower() in SYSTEM_FOLDERS)
+
+
+def parse_intent_response(text: str) -> dict:
+    """Parses a JSON-mode intent reply. Raises ValueError if it doesn't match INTENT_SCHEMA."""
+    return _parse_intent(json.loads(text))
+
+
+def _parse_intent(data) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    action = data.get("action")
+    if action not in ACTIONS:
+        raise ValueError(f"unknown action: {action!r}")
+    intent = {}
+    for field in INTENT_FIELDS:
+        value = data.get(field)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"field {field!r} must be a string, got {type(value).__name__}")
+        intent[field] = value.strip() if value and value.strip() else None
+    if intent["message_app"]:
+        intent["message_app"] = intent["message_app"].lower()
+        if intent["message_app"] not in MESSAGE_APPS:
+            raise ValueError(f"unknown message_app: {intent['message_app']!r}")
+    intent["url"] = normalize_url(intent["url"])
+    return intent
+
+
+def parse_plan_response(text: str) -> list:
+    """Parses a PLAN_SCHEMA reply into intents with `depends_on` (indices of earlier actions) and `needs_focus`."""
+    data = json.loads(text)
+    if not isinstance(data, dict) or not isinstance(data.get("actions"), list) or not data["actions"]:
+        raise ValueError("expected {\"actions\": [...]} with at least one action")
+    actions = []
+    for index, item in enumerate(data["actions"]):
+        intent = _parse_intent(item)
+        depends_on = item.get("depends_on") or []
+        if not isinstance(depends_on, list) or any(
+                not isinstance(d, int) or isinstance(d, bool) or not 0 <= d < index for d in depends_on):
+            raise ValueError(f"action {index}: depends_on must list earlier actions, got {depends_on!r}")
+        intent["depends_on"] = sorted(set(depends_on))
+        intent["needs_focus"] = needs_focus(intent)
+        actions.append(intent)
+    return actions
+
+
+def parse_url_response(text: str):
+    data = json.loads(text)
+    if not isinstance(data, dict) or not isinstance(data.get("url"), str):
+        raise ValueError("expected {\"url\": \"...\"}")
+    return normalize_url(data["url"])
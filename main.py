@@ -3,9 +3,16 @@ from dotenv import load_dotenv
 import pyautogui
 import time
 import sys
-from google import genai
+import collections
 from google.genai import types
 from google.genai.errors import APIError
+import gemini_client
+import tracing
+import app_launcher
+from text_input import type_text
+import action_plan as plan
+from action_plan import run_plan
+from waits import activate_and_wait, active_title, wait_for_focus, wait_for_title_change, wait_for_window
 
 # 🚨 CRITICAL CHANGE: Call load_dotenv() immediately
 load_dotenv() 
@@ -16,74 +23,87 @@ SEARCH_BAR_COORDS = (887, 31)
 TOP_SONG_COORDS = (996, 237) 
 LIKED_SONGS_PLAYLIST_COORDS = (909, 398)
 APP_NAME = "Spotify" # Application name to type in Windows Search
+NOT_RESPONSIVE = "Spotify not responsive."
 
 # Gemini Configuration
 MODEL_NAME = 'gemini-2.5-flash' 
 
-# PyAutoGUI Setup
-pyautogui.PAUSE = 0.5
+# PyAutoGUI Setup (no implicit pause, as in step plans: every call is followed by the wait it needs)
+pyautogui.PAUSE = 0
 pyautogui.FAILSAFE = True 
 
 # --- PyAutoGUI Helper Functions (Tools for Gemini) ---
 
+@tracing.traced()
 def open_application(app_name: str) -> bool:
-    """Opens an application using the Windows Start Menu/Search."""
+    """Focuses the application if it is running, otherwise starts it from the launch index or the Start Menu."""
     print(f"\n[AGENT] Opening application: '{app_name}'")
-    
-    # 1. Open Windows/Start Search Menu (Win Key)
-    pyautogui.press('win')
-    time.sleep(1) # Give time for the start menu to appear
 
-    # 2. Type the application name
-    pyautogui.write(app_name, interval=0.05)
-    time.sleep(1) # Give time for search results to appear
+    # 0. Already running? Just bring it to the front (tens of milliseconds instead of seconds)
+    window = activate_and_wait(app_name)
+    if window is None and app_launcher.launch(app_name):
+        # Installed app found in the launch index: started directly, no typing into the Start Menu
+        window = wait_for_window(app_name, timeout=20, fallback=4)
+    elif window is None:
+        # 1. Open Windows/Start Search Menu (Win Key) and wait for it to take focus
+        previous_title = active_title()
+        pyautogui.press('win')
+        wait_for_title_change(previous_title, timeout=1.5, fallback=1)
+
+        # 2. Type the application name
+        type_text(app_name, interval=0.05)
+        time.sleep(1) # Give time for search results to appear
+
+        # 3. Press Enter to launch the top result and wait until its window shows up
+        pyautogui.press('enter')
+        window = wait_for_window(app_name, timeout=20, fallback=4) # Spotify can take a while on a cold start
 
-    # 3. Press Enter to launch the top result
-    pyautogui.press('enter')
-    time.sleep(4) # **CRITICAL** Wait longer for Spotify to fully launch and load
-    
     # Optional: Try to maximize the window after launch for consistent coordinates
     try:
-        spotify_windows = pyautogui.getWindowsWithTitle(APP_NAME)
-        if spotify_windows:
-            spotify_windows[0].maximize()
-        time.sleep(1)
+        if window:
+            window.maximize()
+            wait_for_focus(app_name, timeout=2, fallback=0)
+        else:
+            time.sleep(1)
     except Exception as e:
         print(f"[ERROR] Could not maximize Spotify window after launch: {e}")
         # The script will proceed even if maximizing fails
         
     return True # We assume launch was successful
 
-def perform_search(query: str, search_coords: tuple):
-    """Activates Spotify, clicks the search bar, and types the internal query."""
+@tracing.traced()
+def perform_search(query: str, search_coords: tuple, followup_steps=()) -> bool:
+    """Activates Spotify, clicks the search bar, types the internal query, then runs `followup_steps`."""
     print(f"[AGENT] Performing Spotify internal search for: '{query}'")
-    
-    # 1. Activate Spotify Window (Use the window handle as before, or re-open)
-    # Since we now ensure it's open, just try to activate it for safety
-    try:
-        spotify_windows = pyautogui.getWindowsWithTitle(APP_NAME)
-        if spotify_windows:
-            spotify_windows[0].activate()
-        time.sleep(1.5) 
-    except Exception as e:
-        print(f"[ERROR] Could not activate Spotify window. {e}")
-        return False
-
-    # 2. Click the Search Bar
-    search_x, search_y = search_coords
-    pyautogui.moveTo(search_x, search_y, duration=0.1)
-    pyautogui.click() 
-    time.sleep(0.5)
 
-    # 3. Clear text and type
+    # Select-all shortcut used to clear any previous query
     if sys.platform.startswith('win'):
-        pyautogui.hotkey('ctrl', 'a')
+        select_all = [plan.hotkey('ctrl', 'a')]
     elif sys.platform.startswith('darwin'):
-        pyautogui.hotkey('command', 'a')
-    pyautogui.press('delete')
-    time.sleep(0.2)
-    pyautogui.write(query, interval=0.05)
-    time.sleep(1.5) # Wait for search results to load
+        select_all = [plan.hotkey('command', 'a')]
+    else:
+        select_all = []
+
+    try:
+        run_plan("spotify_search", [
+            # 1. Activate Spotify Window (we ensure it's open, just make sure it has focus before typing)
+            plan.focus(APP_NAME, timeout=1.5, required=True),
+            # 2. Click the Search Bar
+            plan.click(*search_coords),
+            plan.sleep(0.5),
+            # 3. Clear text and type
+            *select_all,
+            plan.press('delete'),
+            plan.sleep(0.2),
+            plan.write(query, interval=0.05),
+            plan.sleep(1.5), # Wait for search results to load
+            # 4. Spotify must still be in front (not hung or behind a dialog) before clicking into the results
+            plan.wait_focus(APP_NAME, timeout=1.5),
+            *followup_steps,
+        ])
+    except plan.StepFailed as e:
+        print(f"[ERROR] Spotify search failed: {e}")
+        return False
     return True
 
 
@@ -102,15 +122,9 @@ def play_song(song_name: str) -> str:
     # 🌟 NEW STEP: Launch Spotify first
     open_application(APP_NAME)
 
-    # Perform the internal search
-    if not perform_search(song_name, SEARCH_BAR_COORDS):
-        return "Spotify not responsive."
-
-    # Click the Top Song Result
-    song_x, song_y = TOP_SONG_COORDS
-    pyautogui.moveTo(song_x, song_y, duration=0.1)
-    pyautogui.click() 
-    time.sleep(1)
+    # Perform the internal search, then click the Top Song Result
+    if not perform_search(song_name, SEARCH_BAR_COORDS, [plan.click(*TOP_SONG_COORDS), plan.sleep(1)]):
+        return NOT_RESPONSIVE
 
     return f"Successfully launched Spotify and clicked the top result for '{song_name}'. Playback should start now."
 
@@ -128,25 +142,128 @@ def open_playlist(playlist_name: str) -> str:
     # 🌟 NEW STEP: Launch Spotify first
     open_application(APP_NAME)
     
-    # Perform the internal search
-    if not perform_search(playlist_name, SEARCH_BAR_COORDS):
-        return "Spotify not responsive."
-        
-    # Press Enter to finalize the search/filter for the playlist
-    pyautogui.press('enter')
-    time.sleep(1.5)
-
-    # Click the Playlist Coordinate
-    playlist_x, playlist_y = LIKED_SONGS_PLAYLIST_COORDS
-    pyautogui.moveTo(playlist_x, playlist_y, duration=0.1)
-    pyautogui.click()
-    time.sleep(1)
+    # Perform the internal search, press Enter to finalize the playlist filter, then click the Playlist Coordinate
+    followup = [plan.press('enter'), plan.sleep(1.5), plan.click(*LIKED_SONGS_PLAYLIST_COORDS), plan.sleep(1)]
+    if not perform_search(playlist_name, SEARCH_BAR_COORDS, followup):
+        return NOT_RESPONSIVE
     
     return f"Successfully launched Spotify and navigated to the playlist '{playlist_name}'."
 
-# --- Gemini Agent Logic (Remains the same as the corrected version) ---
+# --- Replies ---
+# Successful tool calls are answered from these templates instead of a second model call.
+# Gemini still phrases the reply when a tool failed or the prompt also asks a question.
+REPLY_TEMPLATES = {
+    "play_song": "Playing '{song_name}' on Spotify.",
+    "open_playlist": "Your '{playlist_name}' playlist is open on Spotify.",
+}
+QUESTION_WORDS = ("what", "which", "who", "whose", "why", "how", "when", "where")
+MAX_HISTORY_TURNS = 8 # Earlier exchanges sent with each prompt, so follow-ups don't need restating
+
+
+def is_question(prompt: str) -> bool:
+    text = prompt.strip().lower()
+    return text.endswith("?") or text.split(" ", 1)[0] in QUESTION_WORDS
+
+
+def render_reply(function_name: str, args: dict, result: str) -> str:
+    """The chat reply for a successful tool call, filled in from the call's arguments."""
+    template = REPLY_TEMPLATES.get(function_name)
+    if template is None:
+        return result
+    try:
+        return template.format(**args)
+    except (KeyError, IndexError):
+        return result
+
+
+class Conversation:
+    """The last `max_turns` exchanges (prompt, tool calls and results, reply), oldest first."""
+
+    def __init__(self, max_turns: int = MAX_HISTORY_TURNS):
+        self.turns = collections.deque(maxlen=max_turns)
 
-def run_spotify_agent():
+    def contents(self, *current):
+        return [content for turn in self.turns for content in turn] + list(current)
+
+    def add(self, *contents):
+        self.turns.append(list(contents))
+
+
+def text_content(role: str, text: str):
+    return types.Content(role=role, parts=[types.Part.from_text(text=text)])
+
+
+def call_tools(function_calls, tools):
+    """Runs the requested tools; returns [(name, args, result, failed)]."""
+    results = []
+    for function_call in function_calls:
+        # Get the function name and arguments
+        function_name = function_call.name
+        args = dict(function_call.args or {})
+        print(f"[AGENT] Model wants to call: {function_name}({args})")
+
+        # Get the actual Python function
+        tool_function = next((f for f in tools if f.__name__ == function_name), None)
+        if tool_function is None:
+            print(f"[AGENT] Error: Unknown function {function_name}")
+            results.append((function_name, args, f"Unknown function {function_name}", True))
+            continue
+        try:
+            # Execute the Python Function (Includes launching the app now)
+            with tracing.span(f"tool.{function_name}"):
+                function_result = tool_function(**args)
+        except Exception as e:
+            function_result = f"Error: {e}"
+        print(f"[AGENT] Function result: {function_result}")
+        failed = function_result == NOT_RESPONSIVE or function_result.startswith("Error:")
+        results.append((function_name, args, function_result, failed))
+    return results
+
+
+def handle_prompt(client, tools, conversation: Conversation, user_prompt: str, local_replies: bool = True) -> str:
+    """One agent turn: a single model call, the tools it asks for, and the reply."""
+    prompt_content = text_content("user", user_prompt)
+    with tracing.span("gemini.tool_turn"):
+        response = client.models.generate_content(
+            model=MODEL_NAME,
+            contents=conversation.contents(prompt_content),
+            config=types.GenerateContentConfig(
+                tools=tools,
+                # We run the tools ourselves; otherwise the SDK calls them and asks the model again.
+                automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
+            )
+        )
+
+    # No function call: the model's text is the answer
+    if not response.function_calls:
+        reply = response.text
+        conversation.add(prompt_content, text_content("model", reply))
+        return reply
+
+    results = call_tools(response.function_calls, tools)
+    call_content = types.Content(role="model", parts=[types.Part(function_call=fc) for fc in response.function_calls])
+    result_content = types.Content(role="user", parts=[
+        types.Part.from_function_response(name=name, response={"result": result})
+        for name, _, result, _ in results
+    ])
+
+    if local_replies and not is_question(user_prompt) and not any(failed for *_, failed in results):
+        reply = " ".join(render_reply(name, args, result) for name, args, result, _ in results)
+    else:
+        # Send the function results back to the Model to explain the failure or answer the question
+        with tracing.span("gemini.reply"):
+            response = client.models.generate_content(
+                model=MODEL_NAME,
+                contents=conversation.contents(prompt_content, call_content, result_content),
+            )
+        reply = response.text
+    conversation.add(prompt_content, call_content, result_content, text_content("model", reply))
+    return reply
+
+
+# --- Gemini Agent Logic ---
+
+def run_spotify_agent(local_replies: bool = True, history_turns: int = MAX_HISTORY_TURNS):
     """Main loop for the text-based Gemini Agent."""
 
     # Check for API Key
@@ -155,11 +272,14 @@ def run_spotify_agent():
         print("Please ensure your .env file is present and has the key, and you've run 'pip install python-dotenv'.")
         sys.exit(1)
 
-    # 1. Initialize Gemini Client
-    client = genai.Client()
+    # 1. Initialize the shared Gemini Client and open its connection in the background
+    gemini_client.prewarm(kind="client", model_name=MODEL_NAME)
+    app_launcher.warm_in_background()
+    client = gemini_client.get_client()
     
     # Define the functions as tools
     tools = [play_song, open_playlist]
+    conversation = Conversation(history_turns)
 
     print("-" * 50)
     print("✨ Spotify Voice Agent Activated (Text Commands) ✨")
@@ -174,62 +294,28 @@ def run_spotify_agent():
             print("Agent shutting down. Goodbye!")
             break
 
-        try:
-            # 2. Call the Model with the User's Prompt and Tools
-            response = client.models.generate_content(
-                model=MODEL_NAME, 
-                contents=[user_prompt],
-                config=types.GenerateContentConfig(
-                    tools=tools
-                )
-            )
-
-            # 3. Check for a Function Call
-            if response.function_calls:
-                for function_call in response.function_calls:
-                    
-                    # Get the function name and arguments
-                    function_name = function_call.name
-                    args = dict(function_call.args)
-                    
-                    print(f"[AGENT] Model wants to call: {function_name}({args})")
-
-                    # Get the actual Python function
-                    tool_function = next((f for f in tools if f.__name__ == function_name), None)
-
-                    if tool_function:
-                        # 4. Execute the Python Function (Includes launching the app now)
-                        function_result = tool_function(**args)
-                        print(f"[AGENT] Function result: {function_result}")
-
-                        # 5. Send the function result back to the Model to generate a natural language response
-                        response = client.models.generate_content(
-                            model=MODEL_NAME,
-                            contents=[
-                                types.Content(role="user", parts=[types.Part.from_text(user_prompt)]),
-                                types.Content(role="function", parts=[types.Part.from_text(function_result)], name=function_name),
-                            ]
-                        )
-
-                        print(f"Jarvis: {response.text}")
-
-                    else:
-                        print(f"[AGENT] Error: Unknown function {function_name}")
-            else:
-                # If no function call, just print the model's text response
-                print(f"Jarvis: {response.text}")
-        
-        except APIError as e:
-            print(f"\n[ERROR] Gemini API Error: {e}")
-            print("Please check your GEMINI_API_KEY and network connection.")
-        except Exception as e:
-            print(f"\n[ERROR] An unexpected error occurred during API call: {e}")
+        with tracing.command(user_prompt):
+            try:
+                reply = handle_prompt(client, tools, conversation, user_prompt, local_replies)
+                print(f"Jarvis: {reply}")
+            except APIError as e:
+                print(f"\n[ERROR] Gemini API Error: {e}")
+                print("Please check your GEMINI_API_KEY and network connection.")
+            except Exception as e:
+                print(f"\n[ERROR] An unexpected error occurred during API call: {e}")
         
         print("-" * 50)
 
 # --- Execute Script ---
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Spotify agent driven by Gemini tool calls.")
+    parser.add_argument("--model-replies", action="store_true",
+                        help="let Gemini phrase every reply (one more model call per command)")
+    parser.add_argument("--history", type=int, default=MAX_HISTORY_TURNS,
+                        help="number of earlier exchanges sent with each prompt")
+    args = parser.parse_args()
     try:
-        run_spotify_agent()
+        run_spotify_agent(local_replies=not args.model_replies, history_turns=args.history)
     except Exception as e:
         print(f"\nCritical script error: {e}")
\ No newline at end of file
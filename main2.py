@@ -1,8 +1,17 @@
 import os
 import time
+import shutil
+import subprocess
 import pyautogui
 import webbrowser
 import platform
+import app_launcher
+from text_input import type_text
+import action_plan as plan
+from action_plan import run_plan
+from waits import activate_and_wait, active_title, wait_for_focus, wait_for_title_change, wait_for_window
+from window_registry import find_window
+from task_graph import Task, run_graph, format_summary
 
 PLAYLIST_NAME = "seedhe maut"
 BRAVE_APP_NAME = "Brave"
@@ -14,56 +23,99 @@ WHATSAPP_APP_NAME = "WhatsApp"
 SPOTIFY_SEARCH_BAR_COORDS = (887, 31)
 PLAYLIST_COORDS = (909, 398)
 
-pyautogui.PAUSE = 0.5
+# Fallbacks for apps the launch index doesn't know, tried in order: executables/commands,
+# or URI schemes ("spotify:") handled by the installed app. Lets launches run in parallel.
+APP_LAUNCH_TARGETS = {
+    BRAVE_APP_NAME: ("brave.exe", "brave-browser", "brave"),
+    DISCORD_APP_NAME: ("discord", "discord://"),
+    SPOTIFY_APP_NAME: ("spotify", "spotify:"),
+    VSCODE_APP_NAME: ("code", "vscode:"),
+    WHATSAPP_APP_NAME: ("whatsapp:",),
+}
+
+pyautogui.PAUSE = 0  # as in step plans: every direct pyautogui call is followed by the wait it needs
 pyautogui.FAILSAFE = True
 
 def open_application(app_name: str, wait_time: int = 3) -> bool:
     print(f"\n[INFO] Attempting to open application: '{app_name}'...")
-    if platform.system() == "Windows":
-        pyautogui.press('win')
-    elif platform.system() == "Darwin":
-        pyautogui.hotkey('command', 'space')
-    else:
-        pyautogui.press('super')
-    time.sleep(1)
-    pyautogui.write(app_name, interval=0.05)
-    time.sleep(1)
-    pyautogui.press('enter')
-    time.sleep(wait_time)
+    window = activate_and_wait(app_name)
+    if window is None and app_launcher.launch(app_name):
+        window = wait_for_window(app_name, timeout=max(15, wait_time * 5), fallback=wait_time)
+    elif window is None:
+        previous_title = active_title()
+        if platform.system() == "Windows":
+            pyautogui.press('win')
+        elif platform.system() == "Darwin":
+            pyautogui.hotkey('command', 'space')
+        else:
+            pyautogui.press('super')
+        wait_for_title_change(previous_title, timeout=1.5, fallback=1)
+        type_text(app_name, interval=0.05)
+        time.sleep(1)
+        pyautogui.press('enter')
+        # wait_time is now only the fallback when window state can't be observed
+        window = wait_for_window(app_name, timeout=max(15, wait_time * 5), fallback=wait_time)
     try:
-        app_windows = pyautogui.getWindowsWithTitle(app_name)
-        if app_windows:
-            app_windows[0].maximize()
-            app_windows[0].activate()
-        time.sleep(0.5)
+        if window:
+            window.maximize()
+            window.activate()
+            wait_for_focus(app_name, timeout=2, fallback=0)
+        else:
+            time.sleep(0.5)
     except Exception:
         pass
     return True
 
-def spotify_play_playlist(playlist_name: str):
-    print(f"\n[INFO] Starting Spotify automation for playlist: '{playlist_name}'")
-    open_application(SPOTIFY_APP_NAME, wait_time=2)
-    time.sleep(2)
-    search_x, search_y = SPOTIFY_SEARCH_BAR_COORDS
-    print("[ACTION] Clicking the top search bar at (887, 31)...")
-    pyautogui.moveTo(search_x, search_y, duration=0.2)
-    pyautogui.doubleClick()
-    time.sleep(0.5)
-    print(f"[ACTION] Searching for playlist: '{playlist_name}'...")
-    pyautogui.write(playlist_name, interval=0.1)
-    time.sleep(1.5)
-    pyautogui.press('enter')
-    time.sleep(1)
-    playlist_x, playlist_y = PLAYLIST_COORDS
-    print("[ACTION] Clicking on the playlist result at (909, 398) to start playing.")
-    pyautogui.moveTo(playlist_x, playlist_y, duration=0.2)
-    pyautogui.click()
-    time.sleep(1)
-    print("[ACTION] Minimizing all windows (Win + D).")
+def launch_application(app_name: str) -> bool:
+    """Starts the app's process directly (no keyboard/mouse needed). Returns False if that isn't possible."""
+    if find_window(app_name):
+        return True  # already running
+    if app_launcher.launch(app_name):
+        return True
+    system = platform.system()
+    for target in APP_LAUNCH_TARGETS.get(app_name, ()):
+        is_uri = ":" in target
+        try:
+            if system == "Windows":
+                os.startfile(target)
+            elif is_uri:
+                subprocess.Popen(["open" if system == "Darwin" else "xdg-open", target],
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elif shutil.which(target):
+                subprocess.Popen([shutil.which(target)], stdout=subprocess.DEVNULL,
+                                 stderr=subprocess.DEVNULL, start_new_session=True)
+            else:
+                continue
+            print(f"[INFO] Launched '{app_name}' directly via '{target}'.")
+            return True
+        except OSError:
+            continue
+    return False
+
+def show_desktop_steps():
     if platform.system() == "Windows":
-        pyautogui.hotkey('win', 'd')
+        return [plan.hotkey('win', 'd')]
     elif platform.system() == "Darwin":
-        pyautogui.hotkey('fn', 'f11')
+        return [plan.hotkey('fn', 'f11')]
+    return []
+
+def spotify_play_playlist(playlist_name: str, launch: bool = True, show_desktop: bool = True):
+    print(f"\n[INFO] Starting Spotify automation for playlist: '{playlist_name}'")
+    if launch:
+        open_application(SPOTIFY_APP_NAME, wait_time=2)
+    print(f"[ACTION] Searching for playlist '{playlist_name}' and clicking the result at {PLAYLIST_COORDS}...")
+    run_plan("spotify_play_playlist", [
+        plan.focus(SPOTIFY_APP_NAME, timeout=2),
+        plan.click(*SPOTIFY_SEARCH_BAR_COORDS, clicks=2),
+        plan.sleep(0.5),
+        plan.write(playlist_name, interval=0.1),
+        plan.sleep(1.5),
+        plan.press('enter'),
+        plan.sleep(1),
+        plan.click(*PLAYLIST_COORDS),
+        plan.sleep(1),
+        *(show_desktop_steps() if show_desktop else []),  # Minimize all windows
+    ])
     print(f"[SUCCESS] Automation complete. '{playlist_name}' should now be playing and desktop is shown.")
 
 def open_browser(app_name: str):
@@ -71,15 +123,48 @@ def open_browser(app_name: str):
     open_application(app_name, wait_time=2)
     print(f"[SUCCESS] {app_name} is open.")
 
+def build_daily_startup_graph(playlist_name: str = PLAYLIST_NAME):
+    """Process launches and window waits overlap; anything that types, clicks or focuses runs one at a time."""
+    launched = {}
+    tasks = []
+
+    def launch(app):
+        launched[app] = launch_application(app)
+
+    def wait_ready(app):
+        if launched[app]:
+            wait_for_window(app, timeout=30, fallback=3)
+
+    def arrange(app):
+        window = find_window(app) if launched[app] else None
+        if window is None:
+            open_application(app)  # Start-menu fallback (also maximizes)
+            return
+        try:
+            window.maximize()
+            window.activate()
+            wait_for_focus(app, timeout=2, fallback=0.5)
+        except Exception:
+            pass
+
+    for app in (BRAVE_APP_NAME, DISCORD_APP_NAME, VSCODE_APP_NAME, WHATSAPP_APP_NAME, SPOTIFY_APP_NAME):
+        key = app.split()[0].lower()
+        tasks.append(Task(f"launch_{key}", lambda app=app: launch(app)))
+        tasks.append(Task(f"wait_{key}", lambda app=app: wait_ready(app), deps=[f"launch_{key}"]))
+        tasks.append(Task(f"arrange_{key}", lambda app=app: arrange(app), deps=[f"wait_{key}"], needs_focus=True))
+    # The playlist only needs Spotify; "show desktop" waits until every window has been arranged.
+    tasks.append(Task("spotify_playlist", lambda: spotify_play_playlist(playlist_name, launch=False, show_desktop=False),
+                      deps=["arrange_spotify"], needs_focus=True))
+    tasks.append(Task("show_desktop", lambda: run_plan("show_desktop", show_desktop_steps()),
+                      deps=[t.name for t in tasks if t.name.startswith("arrange_")] + ["spotify_playlist"], needs_focus=True))
+    return tasks
+
 def start_my_day_automation():
     print("\n" + "="*50)
     print("        🚀 DAILY STARTUP AUTOMATION SCRIPT 🚀")
     print("="*50)
-    open_browser(BRAVE_APP_NAME)
-    open_application(DISCORD_APP_NAME)
-    open_application(VSCODE_APP_NAME)
-    open_application(WHATSAPP_APP_NAME)
-    spotify_play_playlist(PLAYLIST_NAME)
+    report = run_graph(build_daily_startup_graph(PLAYLIST_NAME))
+    print("\n" + format_summary(report))
     print("\n" + "="*50)
     print("        ✅ ALL DAILY APPS LAUNCHED AND READY ✅")
     print("="*50)
@@ -0,0 +1,182 @@
+"""One microphone and recognizer for the whole process, calibrated once.
+
+Opening a new `sr.Microphone` and calling `adjust_for_ambient_noise` before
+every interaction costs 0.5-2 s each time. `get_microphone()` returns a shared
+`MicrophoneManager` that:
+
+* picks the input device by (part of) its name from FRIDAY_MIC_NAME, e.g.
+  "USB" or "Realtek" (`python microphone.py --list` shows the names), instead
+  of an index that changes whenever a device is plugged in;
+* reuses the energy threshold saved for that device in
+  `~/.friday/microphone.json`, so calibration only happens on the first run;
+* keeps the threshold current: speech_recognition's dynamic threshold adjusts
+  it while listening, the latest value is saved, and a background thread
+  recalibrates from a short sample of room noise when the microphone is idle
+  and the last calibration is older than RECALIBRATE_INTERVAL.
+
+The manager is used like `sr.Microphone` (`with mic as source:`); only one
+caller can have the device open at a time.
+"""
+import os
+import time
+import threading
+
+from friday_store import load_json, save_json
+
+SETTINGS_FILE = "microphone.json"
+DEVICE_NAME = os.getenv("FRIDAY_MIC_NAME")
+CALIBRATION_SECONDS = 1.0
+REFRESH_SECONDS = 0.3          # background recalibrations sample less noise to keep the device free
+RECALIBRATE_INTERVAL = 600     # seconds
+REFRESH_CHECK_INTERVAL = 60    # seconds between background checks
+SAVE_TOLERANCE = 0.05          # only rewrite the settings file when the threshold moved by more than 5%
+
+
+def input_devices():
+    """[(index, name)] of devices that can record."""
+    import speech_recognition as sr
+    pyaudio = sr.Microphone.get_pyaudio()
+    audio = pyaudio.PyAudio()
+    try:
+        devices = []
+        for index in range(audio.get_device_count()):
+            info = audio.get_device_info_by_index(index)
+            if info.get("maxInputChannels", 0) > 0:
+                devices.append((index, info.get("name", "")))
+        return devices
+    finally:
+        audio.terminate()
+
+
+def find_device_index(name: str):
+    """Index of the first input device whose name contains `name` (case-insensitive), or None for the default."""
+    if not name:
+        return None
+    wanted = name.casefold()
+    for index, device in input_devices():
+        if wanted in device.casefold():
+            return index
+    print(f"[Mic] No input device matching '{name}'; using the default microphone.")
+    return None
+
+
+class MicrophoneManager:
+    def __init__(self, device_name: str = DEVICE_NAME):
+        import speech_recognition as sr
+        self.device_name = device_name
+        self.device_index = find_device_index(device_name)
+        self.microphone = sr.Microphone(device_index=self.device_index)
+        self.recognizer = sr.Recognizer()
+        self._key = device_name or "default"
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._saved_threshold = None
+        self._calibrated_at = 0.0
+        saved = load_json(SETTINGS_FILE, {}).get(self._key)
+        if saved:
+            self.recognizer.energy_threshold = saved["energy_threshold"]
+            self._saved_threshold = saved["energy_threshold"]
+            self._calibrated_at = saved.get("calibrated_at", 0.0)
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            return self.microphone.__enter__()
+        except Exception:
+            self._lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            self.microphone.__exit__(*exc_info)
+        finally:
+            self._lock.release()
+        self.save_threshold()
+
+    @property
+    def needs_calibration(self) -> bool:
+        return self._saved_threshold is None
+
+    def calibrate(self, duration: float = CALIBRATION_SECONDS):
+        with self as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+        self.save_threshold(calibrated=True)
+
+    def ensure_calibrated(self):
+        """Calibrates only if this device has never been calibrated, then keeps it fresh in the background."""
+        if self.needs_calibration:
+            self.calibrate()
+        self.start_refresher()
+
+    def listen(self, timeout: float = None, phrase_time_limit: float = None):
+        with self as source:
+            return self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+
+    def save_threshold(self, calibrated: bool = False):
+        threshold = self.recognizer.energy_threshold
+        if calibrated:
+            self._calibrated_at = time.time()
+        elif self._saved_threshold and abs(threshold - self._saved_threshold) / self._saved_threshold < SAVE_TOLERANCE:
+            return
+        settings = load_json(SETTINGS_FILE, {})
+        settings[self._key] = {"energy_threshold": threshold, "calibrated_at": self._calibrated_at}
+        save_json(SETTINGS_FILE, settings)
+        self._saved_threshold = threshold
+
+    # ------------------ Background refresh ------------------
+    def _refresh_once(self):
+        if not self._lock.acquire(blocking=False):
+            # Someone is listening; their dynamic threshold is the freshest value there is.
+            self.save_threshold()
+            return
+        try:
+            if time.time() - self._calibrated_at < RECALIBRATE_INTERVAL:
+                return
+            with self.microphone as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=REFRESH_SECONDS)
+        finally:
+            self._lock.release()
+        self.save_threshold(calibrated=True)
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(REFRESH_CHECK_INTERVAL)
+            try:
+                self._refresh_once()
+            except Exception as e:
+                print(f"[Mic] Background calibration failed: {e}")
+
+    def start_refresher(self):
+        if self._refresher is None:
+            self._refresher = threading.Thread(target=self._refresh_loop, name="mic-calibration", daemon=True)
+            self._refresher.start()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_microphone() -> MicrophoneManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = MicrophoneManager()
+    return _manager
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="List input devices and calibrate FRIDAY's microphone.")
+    parser.add_argument("--list", action="store_true", help="list input devices")
+    parser.add_argument("--calibrate", action="store_true", help="recalibrate now and save the threshold")
+    args = parser.parse_args()
+    if args.list:
+        selected = find_device_index(DEVICE_NAME)
+        for index, name in input_devices():
+            print(f"{'*' if index == selected else ' '} {index:>3}  {name}")
+        print("Set FRIDAY_MIC_NAME to part of a device name to select it (default: system default).")
+    if args.calibrate:
+        mic = get_microphone()
+        print("Calibrating... stay quiet for a second.")
+        mic.calibrate()
+        print(f"Energy threshold for '{mic.device_name or 'default'}': {mic.recognizer.energy_threshold:.0f}")
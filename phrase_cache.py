@@ -0,0 +1,164 @@
+"""Pre-rendered audio for the phrases FRIDAY says over and over.
+
+Most of what the assistant says is fixed ("Friday assistant ready!", "Hold
+SPACE to speak... release to stop.") or starts with a fixed prefix ("Playing
+song on Spotify: ..."). Both are registered up front. The first time one is
+spoken it is queued for rendering with pyttsx3's `save_to_file`; from then on
+the file is played directly (winsound, afplay, aplay or paplay), and only the
+variable remainder of a templated phrase is synthesized. Anything else (song
+names, URLs, error messages) is synthesized every time and never cached. Files live in `~/.friday/tts_cache`,
+keyed by text, voice, rate and volume, and the least recently played ones are
+deleted once the cache exceeds MAX_BYTES.
+"""
+import os
+import sys
+import time
+import wave
+import shutil
+import hashlib
+import subprocess
+
+from friday_store import data_path
+
+CACHE_DIR = "tts_cache"
+MAX_BYTES = 20 * 1024 * 1024
+AUDIO_EXTENSION = ".aiff" if sys.platform == "darwin" else ".wav"  # NSSpeechSynthesizer always writes AIFF
+
+
+# ------------------ Playback ------------------
+class AudioPlayer:
+    """Plays a file to completion unless `should_stop()` becomes true first."""
+
+    def __init__(self):
+        self._winsound = None
+        self._command = None
+        if sys.platform.startswith("win"):
+            import winsound
+            self._winsound = winsound
+        elif sys.platform == "darwin":
+            self._command = ["afplay"]
+        elif shutil.which("aplay"):
+            self._command = ["aplay", "-q"]
+        elif shutil.which("paplay"):
+            self._command = ["paplay"]
+        else:
+            raise RuntimeError("No audio player available")
+
+    def play(self, path: str, should_stop=lambda: False) -> bool:
+        """Returns True if the file played to the end."""
+        if self._winsound is not None:
+            return self._play_winsound(path, should_stop)
+        process = subprocess.Popen(self._command + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while process.poll() is None:
+            if should_stop():
+                process.terminate()
+                return False
+            time.sleep(0.02)
+        return process.returncode == 0
+
+    def _play_winsound(self, path, should_stop):
+        winsound = self._winsound
+        with wave.open(path, "rb") as w:
+            duration = w.getnframes() / float(w.getframerate())
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            if should_stop():
+                winsound.PlaySound(None, 0)
+                return False
+            time.sleep(0.02)
+        return True
+
+
+# ------------------ Cache ------------------
+class PhraseCache:
+    def __init__(self, prefixes=(), phrases=(), directory: str = None, max_bytes: int = MAX_BYTES):
+        # Longest first, so "Opening website:" wins over a shorter "Opening" if both are registered.
+        self.prefixes = sorted(prefixes, key=len, reverse=True)
+        self.phrases = set(phrases)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.voice_key = ""
+        self.player = None
+        self._pending = []  # texts waiting to be rendered
+        self.hits = 0
+        self.misses = 0
+
+    def attach(self, engine):
+        """Binds the cache to an engine's voice settings; returns False if nothing can be played back."""
+        try:
+            self.player = AudioPlayer()
+        except Exception as e:
+            print(f"[TTS] Phrase cache disabled: {e}")
+            return False
+        settings = [str(engine.getProperty(name)) for name in ("voice", "rate", "volume")]
+        self.voice_key = "|".join(settings)
+        if self.directory is None:
+            self.directory = data_path(CACHE_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+        return True
+
+    def path_for(self, text: str) -> str:
+        key = hashlib.sha1(f"{self.voice_key}\n{text}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, key + AUDIO_EXTENSION)
+
+    def _template_prefix(self, text: str):
+        for prefix in self.prefixes:
+            if text.startswith(prefix) and len(text) > len(prefix):
+                return prefix
+        return None
+
+    def split(self, text: str):
+        """(cached file or None, remainder to synthesize). Queues a registered phrase or prefix not rendered yet."""
+        cacheable = self._template_prefix(text) or (text if text in self.phrases else None)
+        if cacheable is None:
+            return None, text  # one-off text would be rendered for nothing
+        path = self.path_for(cacheable)
+        if os.path.exists(path):
+            self.hits += 1
+            try:
+                os.utime(path)  # mtime doubles as "last played" for eviction
+            except OSError:
+                pass
+            return path, text[len(cacheable):].strip()
+        self.misses += 1
+        if cacheable not in self._pending:
+            self._pending.append(cacheable)
+        return None, text
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def render_next(self, engine):
+        """Renders one queued phrase with the engine (call from the engine's thread)."""
+        text = self._pending.pop(0)
+        path = self.path_for(text)
+        tmp_path = path + ".tmp" + AUDIO_EXTENSION
+        try:
+            engine.save_to_file(text, tmp_path)
+            engine.runAndWait()
+            if os.path.getsize(tmp_path) > 0:
+                os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[TTS] Could not pre-render '{text}': {e}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently played files until the cache fits in max_bytes."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(AUDIO_EXTENSION)]
+        except OSError:
+            return
+        files = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in entries), reverse=True)
+        total = 0
+        for _, size, path in files:
+            total += size
+            if total > self.max_bytes:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
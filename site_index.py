@@ -0,0 +1,132 @@
+"""Local website directory consulted before asking Gemini for a URL.
+
+Combines the bundled `data/sites.tsv` list with entries learned from successful
+Gemini resolutions (`~/.friday/learned_sites.tsv`, append-only). Both files are
+plain TSV and are only read on the first lookup, so importing costs nothing.
+Learned entries carry a fourth `website` column when they came from a request
+for the website, rather than the homepage of an app.
+"""
+import os
+import re
+import bisect
+import difflib
+import threading
+
+from friday_store import data_path
+from intent_schema import normalize_url
+
+BUNDLED_SITES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sites.tsv")
+LEARNED_SITES_FILE = "learned_sites.tsv"
+
+MIN_PREFIX_LENGTH = 4
+FUZZY_CUTOFF = 0.85
+
+_NOISE_WORDS = re.compile(r"\b(?:the|official|website|site|web ?page|homepage|वेबसाइट)\b")
+
+_lock = threading.Lock()
+_urls = None    # key -> url
+_keys = []      # sorted keys, for prefix search
+_sites = set()  # keys of bundled sites and of websites the user asked for
+
+
+def site_key(name: str) -> str:
+    """'The GitHub website' -> 'github', 'you tube' -> 'youtube'."""
+    text = (name or "").lower().strip()
+    text = re.sub(r"^https?://", "", text)
+    text = re.sub(r"^www\.", "", text)
+    text = _NOISE_WORDS.sub(" ", text)
+    return re.sub(r"[\s\-_'.,!?]+", "", text)
+
+
+def _read_tsv(path, urls, sites, bundled=False):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) < 2:
+                    continue
+                name, url = parts[0], parts[1]
+                aliases = parts[2].split(",") if len(parts) > 2 and parts[2] else []
+                website = bundled or (len(parts) > 3 and parts[3] == "website")
+                for alias in [name] + aliases:
+                    key = site_key(alias)
+                    if key:
+                        urls[key] = url
+                        if website:
+                            sites.add(key)
+    except OSError:
+        pass
+
+
+def _load():
+    global _urls, _keys
+    with _lock:
+        if _urls is None:
+            urls = {}
+            _read_tsv(BUNDLED_SITES_PATH, urls, _sites, bundled=True)
+            _read_tsv(data_path(LEARNED_SITES_FILE), urls, _sites)  # learned entries override bundled ones
+            _keys = sorted(urls)
+            _urls = urls
+    return _urls
+
+
+def lookup(name: str):
+    """Returns the URL for a brand/site name, or None if the index has no confident match."""
+    key = site_key(name)
+    if not key:
+        return None
+    if "." in (name or "") and " " not in name.strip():
+        return normalize_url(name)  # already a domain
+    urls = _load()
+    if key in urls:
+        return urls[key]
+    if len(key) >= MIN_PREFIX_LENGTH:
+        start = bisect.bisect_left(_keys, key)
+        candidates = []
+        for candidate in _keys[start:]:
+            if not candidate.startswith(key):
+                break
+            candidates.append(candidate)
+        if candidates:
+            return urls[min(candidates, key=len)]
+    close = difflib.get_close_matches(key, _keys, n=1, cutoff=FUZZY_CUTOFF)
+    return urls[close[0]] if close else None
+
+
+def is_website(name: str) -> bool:
+    """Whether `name` is exactly a bundled site, or one learned from a request for the website.
+
+    URLs Gemini gave for "open zoom" (an app with a homepage) don't count.
+    """
+    if "." in (name or "") and " " not in name.strip():
+        return True  # a domain
+    key = site_key(name)
+    return bool(key) and key in _load() and key in _sites
+
+
+def learn(name: str, url: str, website: bool = False):
+    """Remembers a Gemini-resolved URL so the next lookup for `name` stays local.
+
+    `website`: the user asked for the website itself, not an app that has one.
+    """
+    key = site_key(name)
+    url = normalize_url(url)
+    if not key or not url:
+        return
+    urls = _load()
+    if urls.get(key) == url and (key in _sites or not website):
+        return
+    with _lock:
+        urls[key] = url
+        if key not in _keys:
+            bisect.insort(_keys, key)
+        if website:
+            _sites.add(key)
+        marker = "\twebsite" if website else ""
+        try:
+            with open(data_path(LEARNED_SITES_FILE), "a", encoding="utf-8") as f:
+                f.write(f"{' '.join(name.split())}\t{url}\t{marker}\n")
+        except OSError as e:
+            print(f"[Sites] Could not save learned site: {e}")
@@ -0,0 +1,161 @@
+"""Starts the app a command is probably about while its intent is still being resolved.
+
+Commands like "play believer" or "message mom on whatsapp hi" name their app
+well before Gemini answers, and launching a cold app is the slowest step of
+carrying them out. `Speculator.start(command)` guesses the app from cue words
+and, if no window of it is open, launches it directly (app_launcher) on a
+background thread - never through the keyboard or mouse, so a wrong guess
+can't type into anything. Once the intent is known the caller either:
+
+* `commit()`s: waits for the launched window, then carries on as usual (the
+  GUI helper finds the app already open);
+* `abandon()`s: the launched process group is terminated. Apps opened through
+  an OS shortcut have no process handle and are left running.
+
+Nothing is speculated without a window backend, since there would be no way to
+tell whether the app is already open. Outcomes are counted in
+`~/.friday/speculation.json`; `python speculation.py` prints the hit rate and
+the launch time saved.
+"""
+import os
+import re
+import sys
+import time
+import signal
+import threading
+
+import app_launcher
+import window_backend
+from friday_store import load_json, save_json
+from waits import wait_until
+from window_registry import find_window
+
+STATS_FILE = "speculation.json"
+LAUNCH_TIMEOUT = 15.0
+EMPTY_STATS = {"predictions": 0, "hits": 0, "misses": 0, "launched": 0, "backed_off": 0, "saved_seconds": 0.0}
+
+
+class Speculation:
+    def __init__(self, app: str):
+        self.app = app
+        self.started_at = time.monotonic()
+        self.launched = False
+        self.process = None
+        self.ready_at = None
+        self.outcome = None    # "hit" / "miss" once resolved
+        self.saved = 0.0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        threading.Thread(target=self._warm_up, name=f"warm-up-{app}", daemon=True).start()
+
+    def _warm_up(self):
+        try:
+            if find_window(self.app, refresh=True) is not None:
+                return  # already open: nothing to gain
+            with self._lock:
+                if self.outcome == "miss":
+                    return
+                entry, self.process = app_launcher.spawn(self.app)
+                self.launched = entry is not None
+            if self.launched and wait_until(lambda: find_window(self.app), LAUNCH_TIMEOUT):
+                self.ready_at = time.monotonic()
+        except Exception as e:
+            print(f"[Speculation] Warm-up of {self.app} failed: {e}")
+        finally:
+            self._done.set()
+
+    def commit(self, timeout: float = LAUNCH_TIMEOUT):
+        """The guess was right: waits for the warm-up to finish and records the head start."""
+        committed_at = time.monotonic()
+        with self._lock:
+            self.outcome = "hit"
+        self._done.wait(timeout)
+        if self.launched:
+            # The launch started this much earlier than it would have otherwise.
+            self.saved = min(committed_at, self.ready_at or committed_at) - self.started_at
+
+    def abandon(self):
+        """The guess was wrong (or the command was cancelled): undoes the launch if possible."""
+        with self._lock:
+            if self.outcome is not None:
+                return
+            self.outcome = "miss"
+            process = self.process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if sys.platform.startswith("win"):
+                process.terminate()
+            else:
+                os.killpg(process.pid, signal.SIGTERM)  # launchers often fork the real app
+        except OSError as e:
+            print(f"[Speculation] Could not stop {self.app}: {e}")
+
+
+class Speculator:
+    def __init__(self, cues, stats_file: str = STATS_FILE):
+        """`cues` is [(cue words, app name)], checked in order (put "youtube" before "play")."""
+        self.cues = [(tuple(word.lower() for word in words), app) for words, app in cues]
+        self.stats_file = stats_file
+        self.stats = dict(EMPTY_STATS, **load_json(stats_file, {}))
+        self._lock = threading.Lock()
+
+    def predict(self, command: str):
+        words = set(re.split(r"[\s,.!?]+", command.lower()))
+        for cues, app in self.cues:
+            if any(cue in words for cue in cues):
+                return app
+        return None
+
+    def start(self, command: str):
+        """Starts warming up the predicted app; returns the Speculation, or None if there's no guess."""
+        app = self.predict(command)
+        if app is None or window_backend.get_backend() is None:
+            return None
+        return Speculation(app)
+
+    def resolve(self, speculation, actual_app):
+        """Commits if `actual_app` (the app the intent needs, or None) is the one guessed, else backs off."""
+        if speculation is None:
+            return
+        hit = bool(actual_app) and speculation.app.lower() in actual_app.lower()
+        if hit:
+            speculation.commit()
+            print(f"🔮 Warm-up hit: {speculation.app} (saved {speculation.saved:.1f}s)")
+        else:
+            speculation.abandon()
+            print(f"🔮 Warm-up miss: guessed {speculation.app}, needed {actual_app or 'no app'}")
+        self._record(speculation)
+
+    def _record(self, speculation):
+        with self._lock:
+            self.stats["predictions"] += 1
+            self.stats["hits" if speculation.outcome == "hit" else "misses"] += 1
+            if speculation.launched:
+                self.stats["launched"] += 1
+                if speculation.outcome == "miss":
+                    self.stats["backed_off"] += 1
+            self.stats["saved_seconds"] += speculation.saved
+            if self.stats_file:
+                save_json(self.stats_file, self.stats)
+
+
+def format_stats(stats) -> str:
+    predictions = stats["predictions"]
+    if not predictions:
+        return "No speculative warm-ups recorded yet."
+    hits = stats["hits"]
+    average = stats["saved_seconds"] / hits if hits else 0.0
+    return (f"Predictions: {predictions}, hit rate {hits / predictions:.0%} ({hits} hits, {stats['misses']} misses)\n"
+            f"Apps launched early: {stats['launched']} ({stats['backed_off']} backed off)\n"
+            f"Time saved: {stats['saved_seconds']:.1f}s total, {average:.2f}s per hit")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Show how well FRIDAY's speculative app warm-up is doing.")
+    parser.add_argument("--reset", action="store_true", help="clear the recorded statistics")
+    args = parser.parse_args()
+    if args.reset:
+        save_json(STATS_FILE, dict(EMPTY_STATS))
+    print(format_stats(dict(EMPTY_STATS, **load_json(STATS_FILE, {}))))
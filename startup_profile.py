@@ -0,0 +1,128 @@
+"""Deferred imports and a cold-start timing report.
+
+Importing pyautogui, keyboard and speech_recognition costs hundreds of
+milliseconds (and `keyboard` needs root on Linux) even in modes that never use
+them. `lazy_import(name)` returns a stand-in that imports the real module on
+first attribute access, and `preload(...)` imports modules on a background
+thread once it is known which input mode will need them.
+
+With `enable()` (the `--startup-profile` flag), every top-level import, lazy
+import and `step()` is timed along with the thread it ran on, and `report()`
+prints the breakdown, e.g.:
+
+       start    took  thread          what
+      0.000s  0.215s  MainThread      import dotenv
+      0.300s  0.412s  preload         import speech_recognition
+"""
+import sys
+import time
+import builtins
+import importlib
+import threading
+
+enabled = False
+_origin = time.perf_counter()
+_records = []       # (start, duration, thread name, label)
+_local = threading.local()
+_original_import = builtins.__import__
+
+
+def _record(label: str, start: float, duration: float):
+    _records.append((start - _origin, duration, threading.current_thread().name, label))
+
+
+class step:
+    """`with step("calibrate microphone"):` times an initialization step when profiling."""
+
+    def __init__(self, label: str):
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if enabled:
+            _record(self.label, self.start, time.perf_counter() - self.start)
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only the outermost import on each thread is recorded; its time includes everything it pulls in.
+    if level or name in sys.modules or getattr(_local, "depth", 0):
+        return _original_import(name, globals, locals, fromlist, level)
+    _local.depth = 1
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _local.depth = 0
+        _record(f"import {name}", start, time.perf_counter() - start)
+
+
+def enable():
+    """Starts timing imports; call before the imports you want to see."""
+    global enabled
+    if not enabled:
+        enabled = True
+        builtins.__import__ = _timed_import
+
+
+class _LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                if enabled and self._name not in sys.modules and not getattr(_local, "depth", 0):
+                    _local.depth = 1
+                    start = time.perf_counter()
+                    try:
+                        self._module = importlib.import_module(self._name)
+                    finally:
+                        _local.depth = 0
+                        _record(f"import {self._name}", start, time.perf_counter() - start)
+                else:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._module or self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> _LazyModule:
+    return _LazyModule(name)
+
+
+def preload(*modules, name: str = "preload") -> threading.Thread:
+    """Loads lazy modules (or imports module names) on a background thread."""
+    def load():
+        for module in modules:
+            try:
+                (module if isinstance(module, _LazyModule) else _LazyModule(module))._load()
+            except Exception as e:  # the foreground will hit (and report) the same error on first use
+                print(f"[Startup] Could not preload {getattr(module, '_name', module)}: {e}")
+    thread = threading.Thread(target=load, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+def report() -> str:
+    lines = [f"Startup profile ({time.perf_counter() - _origin:.3f}s since start):",
+             f"{'start':>9} {'took':>7}  {'thread':<15} what"]
+    for start, duration, thread, label in sorted(_records):
+        lines.append(f"{start:8.3f}s {duration:6.3f}s  {thread[:15]:<15} {label}")
+    blocking, covered_until = 0.0, 0.0
+    for start, duration, thread, _ in sorted(_records):  # union of intervals: steps contain imports
+        if thread == "MainThread":
+            end = start + duration
+            blocking += max(0.0, end - max(start, covered_until))
+            covered_until = max(covered_until, end)
+    lines.append(f"Main thread: {blocking:.3f}s in recorded imports/steps; the rest ran in the background.")
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+"""Tiny dependency-graph runner for multi-app routines.
+
+Tasks run on their own threads as soon as every dependency has finished.
+Tasks marked `needs_focus` (anything that types, clicks or activates a
+window) additionally take a shared focus lock, so only one of them drives the
+keyboard/mouse at a time while process launches and window waits overlap.
+Pass `focus_lock` to share that lock with other code that drives the GUI.
+`format_summary` prints per-task timings and the critical path.
+"""
+import time
+import threading
+import contextvars
+
+
+class Task:
+    def __init__(self, name: str, fn, deps=(), needs_focus: bool = False):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.needs_focus = needs_focus
+
+
+def _check_graph(tasks):
+    names = {t.name for t in tasks}
+    if len(names) != len(tasks):
+        raise ValueError("Duplicate task names in graph")
+    for task in tasks:
+        missing = [d for d in task.deps if d not in names]
+        if missing:
+            raise ValueError(f"Task '{task.name}' depends on unknown task(s): {missing}")
+    # Kahn's algorithm: anything left over is part of a cycle.
+    pending = {t.name: set(t.deps) for t in tasks}
+    while pending:
+        ready = [name for name, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependency cycle between: {sorted(pending)}")
+        for name in ready:
+            del pending[name]
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+
+def run_graph(tasks, focus_lock=None) -> dict:
+    """Runs the graph; returns {"total": seconds, "tasks": {name: timing dict}, "critical_path": [names]}."""
+    tasks = list(tasks)
+    _check_graph(tasks)
+    finished = {t.name: threading.Event() for t in tasks}
+    focus_lock = focus_lock or threading.Lock()
+    state = {"last_focus_holder": None}
+    timings = {}
+    origin = time.perf_counter()
+
+    def run(task):
+        info = timings[task.name] = {"deps": task.deps, "needs_focus": task.needs_focus, "status": "ok",
+                                     "error": None, "after_focus_of": None}
+        for dep in task.deps:
+            finished[dep].wait()
+        info["ready"] = time.perf_counter() - origin
+        failed = [d for d in task.deps if timings[d]["status"] != "ok"]
+        if failed:
+            info.update(status="skipped", error=f"dependency failed: {', '.join(failed)}",
+                        start=info["ready"], end=info["ready"])
+            finished[task.name].set()
+            return
+        if task.needs_focus:
+            focus_lock.acquire()
+            info["after_focus_of"] = state["last_focus_holder"]
+        info["start"] = time.perf_counter() - origin
+        try:
+            task.fn()
+        except Exception as e:
+            info["status"] = "failed"
+            info["error"] = str(e)
+            print(f"[ERROR] Task '{task.name}' failed: {e}")
+        finally:
+            info["end"] = time.perf_counter() - origin
+            if task.needs_focus:
+                state["last_focus_holder"] = task.name
+                focus_lock.release()
+            finished[task.name].set()
+
+    # Each task runs in a copy of the caller's context (e.g. so its tracing spans belong to the command).
+    threads = [threading.Thread(target=contextvars.copy_context().run, args=(run, t), name=f"task-{t.name}",
+                                daemon=True) for t in tasks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report = {"total": time.perf_counter() - origin, "tasks": timings}
+    report["critical_path"] = critical_path(report)
+    return report
+
+
+def critical_path(report: dict):
+    """Walks back from the last task to finish through whatever actually held it up."""
+    timings = report["tasks"]
+    if not timings:
+        return []
+    path = [max(timings, key=lambda name: timings[name]["end"])]
+    while True:
+        info = timings[path[-1]]
+        blockers = list(info["deps"])
+        # If it sat waiting for the focus lock, the previous focus holder gated its start.
+        if info["after_focus_of"] and info["start"] - info["ready"] > 0.01:
+            blockers.append(info["after_focus_of"])
+        if not blockers:
+            break
+        path.append(max(blockers, key=lambda name: timings[name]["end"]))
+    return list(reversed(path))
+
+
+def format_summary(report: dict) -> str:
+    timings = report["tasks"]
+    sequential = sum(info["end"] - info["start"] for info in timings.values())
+    lines = [f"{'task':<26}{'ready':>8}{'start':>8}{'end':>8}{'took':>8}  status"]
+    for name, info in sorted(timings.items(), key=lambda item: item[1]["start"]):
+        focus = " [focus]" if info["needs_focus"] else ""
+        lines.append(f"{name:<26}{info['ready']:>7.2f}s{info['start']:>7.2f}s{info['end']:>7.2f}s"
+                     f"{info['end'] - info['start']:>7.2f}s  {info['status']}{focus}")
+    lines.append(f"Wall time {report['total']:.2f}s (tasks back to back would take {sequential:.2f}s)")
+    lines.append("Critical path: " + " -> ".join(report["critical_path"]))
+    return "\n".join(lines)
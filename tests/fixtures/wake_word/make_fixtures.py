@@ -0,0 +1,103 @@
+"""Regenerates the synthetic wake-word fixtures: python tests/fixtures/wake_word/make_fixtures.py
+
+The "wake word" is a stand-in for "Friday": a burst of frication, then two
+vowel-like glides (formant pairs on a 120 Hz voice) with a short stop between
+them. Templates and positives vary pitch, speed, loudness and background
+noise; positives are followed by a different "command" sound. Two harder
+positives add twice the background noise or another speaker's formants; the near-miss
+negative keeps the first syllable and swaps the second. The other negatives
+are other syllables, noise and a steady tone.
+"""
+import os
+import math
+import wave
+import random
+from array import array
+
+RATE = 8000
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def silence(seconds):
+    return [0.0] * int(seconds * RATE)
+
+
+def frication(seconds, rng):
+    noise = [rng.uniform(-1, 1) for _ in range(int(seconds * RATE) + 1)]
+    return [(b - a) * 0.5 for a, b in zip(noise, noise[1:])]  # high-passed
+
+
+def glide(seconds, f1, f2, pitch=120.0):
+    """Vowel-like sound: two formants moving from f1[0]/f2[0] to f1[1]/f2[1], pulsed at `pitch`."""
+    n = int(seconds * RATE)
+    out, p1, p2 = [], 0.0, 0.0
+    for i in range(n):
+        t = i / max(n - 1, 1)
+        p1 += 2 * math.pi * (f1[0] + (f1[1] - f1[0]) * t) / RATE
+        p2 += 2 * math.pi * (f2[0] + (f2[1] - f2[0]) * t) / RATE
+        voice = 0.5 + 0.5 * math.cos(2 * math.pi * pitch * i / RATE)
+        envelope = math.sin(math.pi * t) ** 0.5
+        out.append(envelope * voice * (math.sin(p1) + 0.6 * math.sin(p2)))
+    return out
+
+
+def tone(seconds, freq):
+    return [math.sin(2 * math.pi * freq * i / RATE) for i in range(int(seconds * RATE))]
+
+
+def scaled(formants, scale):
+    return tuple(f * scale for f in formants)
+
+
+def wake_word(rng, speed=1.0, pitch=120.0, formants=1.0):
+    """`formants` scales the vowel resonances, e.g. 1.03 for a slightly shorter vocal tract."""
+    s, k = speed, formants
+    return (frication(0.09 * s, rng) + glide(0.18 * s, scaled((750, 350), k), scaled((1200, 2300), k), pitch)
+            + silence(0.03 * s) + glide(0.2 * s, scaled((550, 400), k), scaled((1800, 2400), k), pitch))
+
+
+def command(rng):
+    return glide(0.25, (300, 300), (800, 900)) + frication(0.06, rng) + glide(0.3, (650, 700), (1100, 1000))
+
+
+def write(path, samples, gain, noise, rng):
+    peak = max(abs(s) for s in samples) or 1.0
+    pcm = array("h", (max(-32767, min(32767, int((s / peak * gain + rng.gauss(0, noise)) * 32767))) for s in samples))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(pcm.tobytes())
+
+
+def main():
+    rng = random.Random(7)
+    for i, (speed, pitch) in enumerate([(1.0, 120), (0.92, 130), (1.08, 112)], 1):
+        write(os.path.join(HERE, "templates", f"friday_{i}.wav"),
+              silence(0.2) + wake_word(rng, speed, pitch) + silence(0.2), 0.6, 0.003, rng)
+    for i, (speed, pitch, gain) in enumerate([(1.0, 125, 0.3), (0.95, 118, 0.8), (1.05, 135, 0.5)], 1):
+        write(os.path.join(HERE, "positive", f"friday_command_{i}.wav"),
+              silence(0.3) + wake_word(rng, speed, pitch) + silence(0.08) + command(rng) + silence(0.2),
+              gain, 0.006, rng)
+    negatives = {
+        "other_words": glide(0.3, (300, 300), (800, 900)) + frication(0.06, rng) + glide(0.3, (650, 700), (1100, 1000)),
+        "reversed": glide(0.2, (400, 550), (2400, 1800)) + silence(0.03) + glide(0.18, (350, 750), (2300, 1200)),
+        "noise": [rng.uniform(-1, 1) for _ in range(int(0.7 * RATE))],
+        "tone": tone(0.6, 1000),
+    }
+    for name, samples in negatives.items():
+        write(os.path.join(HERE, "negative", f"{name}.wav"), silence(0.3) + samples + silence(0.2), 0.5, 0.006, rng)
+    # Generated last, so the fixtures above keep their random draws.
+    hard = {"friday_command_4.wav": (wake_word(rng, 1.0, 120), 0.6, 0.012),  # a noisier room
+            "friday_command_5.wav": (wake_word(rng, 1.0, 135, 1.03), 0.5, 0.006)}  # another voice
+    for name, (word, gain, noise) in hard.items():
+        write(os.path.join(HERE, "positive", name),
+              silence(0.3) + word + silence(0.08) + command(rng) + silence(0.2), gain, noise, rng)
+    near_miss = (frication(0.09, rng) + glide(0.18, (750, 350), (1200, 2300)) + silence(0.03)
+                 + glide(0.2, (400, 650), (900, 1100)))  # same first syllable, another second one
+    write(os.path.join(HERE, "negative", "near_miss.wav"), silence(0.3) + near_miss + silence(0.2), 0.5, 0.006, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Step plans that need a window stop with StepFailed when it isn't there."""
+import pytest
+
+import action_plan as plan
+import window_backend
+import window_registry
+from action_plan import StepFailed, run_plan
+from window_backend import FakeWindowBackend
+
+
+class RecordingInput:
+    def __init__(self):
+        self.events = []
+
+    def send_keys(self, combos):
+        self.events.append(("keys", combos))
+
+    def write(self, text, interval):
+        self.events.append(("write", text))
+
+    def click(self, x, y, clicks):
+        self.events.append(("click", x, y))
+
+    def move(self, x, y, duration):
+        self.events.append(("move", x, y))
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    monkeypatch.setattr(window_backend, "_backend", None)
+    monkeypatch.setattr(window_backend, "_backend_loaded", False)
+    fake = FakeWindowBackend()
+    window_backend.set_backend(fake)
+    yield fake
+    window_registry.reset_registry()
+
+
+def search_steps():
+    return [plan.focus("Spotify", timeout=0.1, required=True), plan.click(10, 20), plan.write("believer"),
+            plan.wait_focus("Spotify", timeout=0.1), plan.click(30, 40)]
+
+
+def test_runs_every_step_when_the_window_is_there(windows):
+    windows.open_window("Spotify Premium")
+    keyboard = RecordingInput()
+    report = run_plan("search", search_steps(), keyboard)
+    assert keyboard.events == [("click", 10, 20), ("write", "believer"), ("click", 30, 40)]
+    assert len(report["steps"]) == 5
+
+
+def test_required_focus_stops_without_a_window(windows):
+    keyboard = RecordingInput()
+    with pytest.raises(StepFailed):
+        run_plan("search", search_steps(), keyboard)
+    assert keyboard.events == []
+
+
+def test_wait_focus_stops_when_a_dialog_took_over(windows):
+    windows.open_window("Spotify Premium")
+    keyboard = RecordingInput()
+    steps = search_steps()
+    steps.insert(3, plan.call(windows.open_window, "Save As"))
+    with pytest.raises(StepFailed):
+        run_plan("search", steps, keyboard)
+    assert keyboard.events == [("click", 10, 20), ("write", "believer")]
+
+
+def test_optional_focus_carries_on(windows):
+    keyboard = RecordingInput()
+    run_plan("focus", [plan.focus("Spotify", timeout=0.1), plan.click(1, 2)], keyboard)
+    assert keyboard.events == [("click", 1, 2)]
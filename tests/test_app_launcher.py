@@ -0,0 +1,43 @@
+"""AppIndex over a temporary directory of .desktop files."""
+import pytest
+
+from app_launcher import AppIndex
+
+
+def desktop_file(directory, stem, name, exec_line, **fields):
+    lines = ["[Desktop Entry]", "Type=Application", f"Name={name}", f"Exec={exec_line}"]
+    lines += [f"{key}={value}" for key, value in fields.items()]
+    (directory / f"{stem}.desktop").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def index(tmp_path):
+    desktop_file(tmp_path, "firefox", "Firefox", "firefox %u", GenericName="Web Browser", Keywords="Web;Explorer;")
+    desktop_file(tmp_path, "explorer", "Explorer", "explorer")
+    desktop_file(tmp_path, "spotify", "Spotify", "env LD_PRELOAD=libcurl.so spotify %U")
+    desktop_file(tmp_path, "org.telegram.desktop", "Telegram Desktop", "flatpak run org.telegram.desktop")
+    return AppIndex([str(tmp_path)], cache_name=None)
+
+
+def test_name_beats_another_apps_keyword(index):
+    assert index.lookup("explorer")["name"] == "Explorer"
+    assert index.lookup("web browser")["name"] == "Firefox"
+
+
+def test_exact_and_alias_lookups(index):
+    assert index.lookup("firefox")["name"] == "Firefox"
+    assert index.lookup("spotify")["argv"][0] == "env"
+
+
+def test_wrapper_executables_are_not_aliases(index):
+    assert index.lookup("env") is None
+    assert index.lookup("flatpak") is None
+    assert index.lookup("telegram")["name"] == "Telegram Desktop"
+
+
+def test_short_names_only_match_exactly(index):
+    assert index.lookup("s") is None
+    assert index.lookup("sp") is None
+    assert index.lookup("t") is None
+    assert index.lookup("spo")["name"] == "Spotify"
+    assert index.lookup("spotfy")["name"] == "Spotify"  # fuzzy, long enough
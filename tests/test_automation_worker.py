@@ -0,0 +1,24 @@
+"""AutomationWorker jobs in a real (spawned) worker process."""
+import operator
+
+import pytest
+
+from automation_worker import AutomationWorker
+
+
+@pytest.fixture(scope="module")
+def worker():
+    worker = AutomationWorker(job_timeout=10).start()
+    yield worker
+    worker.shutdown()
+
+
+def test_runs_a_job(worker):
+    assert worker.submit(operator.add, 2, 3).result(timeout=30) == 5
+
+
+def test_unpicklable_job_fails_without_reaching_the_worker(worker):
+    with pytest.raises(Exception):
+        worker.submit(lambda: None).result(timeout=5)
+    assert worker.submit(operator.add, 1, 1).result(timeout=5) == 2
+    assert worker.restarts == 0
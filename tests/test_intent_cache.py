@@ -0,0 +1,43 @@
+"""IntentCache keys, and the intents it refuses to replay."""
+import pytest
+
+import friday_store
+from intent_cache import IntentCache, normalize_command
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(friday_store, "DATA_DIR", str(tmp_path))
+    return IntentCache("intents", "prompt {command}")
+
+
+def test_normalize_command():
+    assert normalize_command("Friday, open   Downloads!") == "open downloads"
+    assert normalize_command("hey friday play believer") == "play believer"
+
+
+def test_variants_share_an_entry(cache):
+    cache.put("open Downloads", {"action": "open_folder", "target": "downloads"})
+    assert cache.get("Friday, open downloads")["target"] == "downloads"
+    assert IntentCache("intents", "prompt {command}").get("open downloads") is not None  # from disk
+
+
+def test_messages_are_not_cached(cache):
+    message = {"action": "send_message", "message_app": "whatsapp", "recipient": "Dhruv", "message": "SEE YOU AT 5"}
+    cache.put("whatsapp dhruv SEE YOU AT 5", message)
+    assert cache.get("whatsapp dhruv see you at 5") is None
+
+
+def test_plans_with_a_message_are_not_cached(cache):
+    plan = {"actions": [{"action": "play_song", "target": "lofi"},
+                        {"action": "send_message", "message_app": "whatsapp", "recipient": "dhruv",
+                         "message": "Running late"}]}
+    cache.put("play lofi and tell dhruv Running late", plan)
+    assert cache.get("play lofi and tell dhruv running late") is None
+    cache.put("play lofi and open github", {"actions": plan["actions"][:1]})
+    assert cache.get("play lofi and open github") is not None
+
+
+def test_template_change_invalidates(cache):
+    cache.put("open downloads", {"action": "open_folder", "target": "downloads"})
+    assert IntentCache("intents", "another prompt {command}").get("open downloads") is None
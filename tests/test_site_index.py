@@ -0,0 +1,62 @@
+"""Which learned URLs count as websites, so "open X" may skip the app/website question."""
+import pytest
+
+import app_launcher
+import friday_store
+import site_index
+from app_launcher import AppIndex
+from fast_parser import parse_command
+
+
+@pytest.fixture(autouse=True)
+def learned_sites(tmp_path, monkeypatch):
+    monkeypatch.setattr(friday_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(site_index, "_urls", None)
+    monkeypatch.setattr(site_index, "_keys", [])
+    monkeypatch.setattr(site_index, "_sites", set())
+    return tmp_path
+
+
+@pytest.fixture
+def no_apps(tmp_path, monkeypatch):
+    apps = AppIndex([str(tmp_path / "applications")], cache_name=None)
+    monkeypatch.setattr(app_launcher, "_index", apps)
+    return apps
+
+
+def test_bundled_sites_and_domains_are_websites():
+    assert site_index.is_website("github")
+    assert site_index.is_website("example.org")
+    assert not site_index.is_website("aiml projects")
+
+
+def test_app_homepages_are_not_websites():
+    site_index.learn("acme studio", "https://acme.example")
+    assert site_index.lookup("acme studio") == "https://acme.example"
+    assert not site_index.is_website("acme studio")
+    site_index.learn("acme studio", "https://acme.example", website=True)
+    assert site_index.is_website("acme studio")
+
+
+def test_website_flag_survives_a_reload(learned_sites):
+    site_index.learn("acme studio", "https://acme.example", website=True)
+    site_index.learn("blender", "https://blender.org")
+    site_index._urls, site_index._keys, site_index._sites = None, [], set()
+    assert site_index.is_website("acme studio")
+    assert not site_index.is_website("blender")
+    assert site_index.lookup("blender") == "https://blender.org"
+
+
+def test_only_websites_are_promoted_from_open_app(no_apps):
+    no_apps.refresh()
+    intent, confidence = parse_command("open github")
+    assert intent["action"] == "open_website" and confidence >= 0.8
+    site_index.learn("acme studio", "https://acme.example")
+    intent, confidence = parse_command("open acme studio")
+    assert intent["action"] == "open_app" and confidence < 0.8
+
+
+def test_no_promotion_while_the_app_index_is_loading(no_apps):
+    intent, confidence = parse_command("open github")
+    assert intent["action"] == "open_app" and confidence < 0.8
+    assert not no_apps.loaded
@@ -0,0 +1,77 @@
+"""paste_text puts the user's clipboard back, also when a paste fails halfway."""
+import time
+
+import pytest
+
+import text_input
+from text_input import ClipboardError, paste_text
+
+
+class FlakyClipboard:
+    def __init__(self, text):
+        self.text = text
+        self.fail_set = False
+        self.fail_read_back = False
+
+    def get(self):
+        return self.text
+
+    def set(self, text):
+        if self.fail_set:
+            raise ClipboardError("clipboard is busy")
+        self.text = text.upper() if self.fail_read_back else text
+
+
+@pytest.fixture(autouse=True)
+def quick_restore(monkeypatch):
+    monkeypatch.setattr(text_input, "RESTORE_DELAY", 0.02)
+    monkeypatch.setattr(text_input, "_pending", {"timer": None, "saved": None, "pasted": ()})
+
+
+def settle():
+    time.sleep(0.1)
+
+
+def test_restores_after_a_paste():
+    clipboard, keys = FlakyClipboard("original"), []
+    assert paste_text("héllo", keys.append, clipboard)
+    assert clipboard.text == "héllo" and keys == [[text_input.PASTE_HOTKEY]]
+    settle()
+    assert clipboard.text == "original"
+
+
+def test_keeps_what_the_user_copied_meanwhile():
+    clipboard = FlakyClipboard("original")
+    paste_text("héllo", lambda keys: None, clipboard)
+    clipboard.text = "copied by the user"
+    settle()
+    assert clipboard.text == "copied by the user"
+
+
+def test_restores_when_the_next_paste_fails():
+    clipboard = FlakyClipboard("original")
+    assert paste_text("first", lambda keys: None, clipboard)
+    clipboard.fail_set = True
+    assert not paste_text("second", lambda keys: None, clipboard)
+    clipboard.fail_set = False
+    settle()
+    assert clipboard.text == "original"
+
+
+def test_restores_when_the_read_back_differs():
+    clipboard = FlakyClipboard("original")
+    assert paste_text("first", lambda keys: None, clipboard)
+    clipboard.fail_read_back = True
+    assert not paste_text("second", lambda keys: None, clipboard)
+    clipboard.fail_read_back = False
+    settle()
+    assert clipboard.text == "original"
+
+
+def test_restores_a_clipboard_that_rejected_the_first_paste():
+    clipboard = FlakyClipboard("original")
+    clipboard.fail_read_back = True
+    assert not paste_text("héllo", lambda keys: None, clipboard)
+    clipboard.fail_read_back = False
+    settle()
+    assert clipboard.text == "original"
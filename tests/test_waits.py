@@ -0,0 +1,78 @@
+"""Condition-based waits against FakeWindowBackend."""
+import time
+
+import pytest
+
+import waits
+import window_backend
+import window_registry
+from window_backend import FakeWindowBackend
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(window_backend, "_backend", None)
+    monkeypatch.setattr(window_backend, "_backend_loaded", False)
+    fake = FakeWindowBackend()
+    window_backend.set_backend(fake)
+    yield fake
+    window_registry.reset_registry()
+
+
+def test_wait_for_window_returns_once_it_opens(backend):
+    backend.open_window("Spotify Premium", delay=0.05)
+    window = waits.wait_for_window("spotify", timeout=2)
+    assert window is not None and window.title == "Spotify Premium"
+
+
+def test_wait_for_window_times_out(backend):
+    started = time.monotonic()
+    assert waits.wait_for_window("spotify", timeout=0.1) is None
+    assert time.monotonic() - started < 1
+
+
+def test_wait_for_focus(backend):
+    notepad = backend.open_window("Untitled - Notepad")
+    backend.open_window("Calculator")
+    assert waits.wait_for_focus("notepad", timeout=0.1) is None
+    notepad.activate()
+    assert waits.wait_for_focus("notepad", timeout=0.1) is notepad
+
+
+def test_wait_for_title_change(backend):
+    window = backend.open_window("Brave")
+    assert waits.wait_for_title_change("Brave", timeout=0.1) is None
+    backend.set_title(window, "YouTube - Brave", delay=0.05)
+    assert waits.wait_for_title_change("Brave", timeout=2) is window
+
+
+def test_wait_for_title_change_to_empty_title(backend):
+    window = backend.open_window("Start")
+    backend.set_title(window, "")
+    assert waits.wait_for_title_change("Start", timeout=0.1)
+
+
+def test_activate_and_wait_focuses_the_window(backend):
+    spotify = backend.open_window("Spotify")
+    backend.open_window("Calculator")
+    assert waits.activate_and_wait("spotify", timeout=1) is spotify
+    assert backend.active_window() is spotify
+
+
+def test_activate_and_wait_returns_a_window_slow_to_focus(backend):
+    spotify = backend.open_window("Spotify")
+    backend.open_window("Calculator")
+    spotify.activate = lambda: None  # never takes the focus
+    assert waits.activate_and_wait("spotify", timeout=0.1) is spotify
+
+
+def test_activate_and_wait_returns_the_window_when_activate_fails(backend):
+    spotify = backend.open_window("Spotify")
+    def refuse():
+        raise RuntimeError("access denied")
+    spotify.activate = refuse
+    assert waits.activate_and_wait("spotify", timeout=0.1) is spotify
+
+
+def test_activate_and_wait_without_a_window(backend):
+    assert waits.activate_and_wait("spotify", timeout=0.1) is None
@@ -0,0 +1,68 @@
+"""WakeWordDetector against the WAV fixtures in fixtures/wake_word (see make_fixtures.py there)."""
+import os
+import glob
+
+import pytest
+
+from wake_word import WakeWordDetector, read_wav, strip_wake_word
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "wake_word")
+# Where the wake word ends in each positive fixture (0.3s of silence, then the word).
+WAKE_WORD_ENDS = {"friday_command_1.wav": 0.8, "friday_command_2.wav": 0.775, "friday_command_3.wav": 0.825,
+                  "friday_command_4.wav": 0.8, "friday_command_5.wav": 0.8}
+
+
+def fixtures(label):
+    return sorted(glob.glob(os.path.join(FIXTURES, label, "*.wav")))
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return WakeWordDetector.from_directory(os.path.join(FIXTURES, "templates"), sensitivity=0.5)
+
+
+def test_fixtures_present():
+    assert len(fixtures("templates")) >= 2
+    assert len(fixtures("positive")) == len(WAKE_WORD_ENDS)
+    assert fixtures("negative")
+
+
+@pytest.mark.parametrize("path", fixtures("positive"), ids=os.path.basename)
+def test_detects_wake_word(detector, path):
+    data, rate, width = read_wav(path)
+    offset = detector.detect(data, rate, width)
+    assert offset is not None
+    # The command starts right after the wake word.
+    assert abs(offset / (rate * width) - WAKE_WORD_ENDS[os.path.basename(path)]) < 0.1
+
+
+@pytest.mark.parametrize("path", fixtures("negative"), ids=os.path.basename)
+def test_rejects_other_audio(detector, path):
+    assert detector.detect(*read_wav(path)) is None
+
+
+def test_recall_and_false_accepts(detector):
+    hits = sum(detector.detect(*read_wav(path)) is not None for path in fixtures("positive"))
+    false_accepts = sum(detector.detect(*read_wav(path)) is not None for path in fixtures("negative"))
+    assert hits == len(fixtures("positive"))
+    assert false_accepts == 0
+
+
+def test_sensitivity_is_monotonic(detector):
+    # Raising the sensitivity never loses a detection, on positives and negatives alike.
+    detectors = [WakeWordDetector(detector.templates, sensitivity=s) for s in (0.0, 0.25, 0.5, 0.75, 1.0)]
+    thresholds = [d.threshold for d in detectors]
+    assert thresholds == sorted(thresholds) and len(set(thresholds)) == len(thresholds)
+    for path in fixtures("positive") + fixtures("negative"):
+        detected = [d.detect(*read_wav(path)) is not None for d in detectors]
+        assert detected == sorted(detected), os.path.basename(path)
+
+
+def test_needs_two_templates(detector):
+    with pytest.raises(ValueError):
+        WakeWordDetector(detector.templates[:1])
+
+
+def test_strip_wake_word():
+    assert strip_wake_word("Friday, play believer") == "play believer"
+    assert strip_wake_word("play believer") is None
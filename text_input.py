@@ -0,0 +1,230 @@
+"""Text entry by clipboard paste instead of one synthetic key press per character.
+
+`type_text` puts the text on the clipboard, sends Ctrl+V (Cmd+V on macOS) and
+puts the user's previous clipboard text back shortly afterwards. Pasting is a
+single operation regardless of length and, unlike `pyautogui.write`, handles
+non-ASCII text such as Devanagari. Per-key typing is only used for very short
+ASCII strings, or when the clipboard can't be used: no clipboard tool, the
+clipboard refused the text, or it holds non-text data (an image, files) that
+we couldn't restore.
+"""
+import sys
+import time
+import shutil
+import threading
+import subprocess
+
+PASTE_MIN_CHARS = 3        # shorter ASCII strings are typed; a paste wouldn't save anything
+RESTORE_DELAY = 0.3        # seconds; the target app reads the clipboard asynchronously after Ctrl+V
+PASTE_HOTKEY = ("command", "v") if sys.platform == "darwin" else ("ctrl", "v")
+
+
+class ClipboardError(Exception):
+    pass
+
+
+# ------------------ Clipboard backends ------------------
+class WindowsClipboard:
+    name = "win32"
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        user32 = self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        kernel32 = self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        user32.OpenClipboard.argtypes = [wintypes.HWND]
+        user32.OpenClipboard.restype = wintypes.BOOL
+        user32.GetClipboardData.argtypes = [wintypes.UINT]
+        user32.GetClipboardData.restype = wintypes.HANDLE
+        user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+        user32.SetClipboardData.restype = wintypes.HANDLE
+        user32.IsClipboardFormatAvailable.argtypes = [wintypes.UINT]
+        user32.CountClipboardFormats.restype = ctypes.c_int
+        kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+        kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+        kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+        kernel32.GlobalLock.restype = wintypes.LPVOID
+        kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+        kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+
+    def _open(self):
+        # Another process may hold the clipboard for a moment (clipboard managers, RDP).
+        for _ in range(10):
+            if self._user32.OpenClipboard(None):
+                return
+            time.sleep(0.01)
+        raise ClipboardError("clipboard is locked by another application")
+
+    def get(self):
+        self._open()
+        try:
+            if not self._user32.IsClipboardFormatAvailable(self.CF_UNICODETEXT):
+                if self._user32.CountClipboardFormats() > 0:
+                    raise ClipboardError("clipboard holds non-text data")
+                return None
+            handle = self._user32.GetClipboardData(self.CF_UNICODETEXT)
+            pointer = self._kernel32.GlobalLock(handle) if handle else None
+            if not pointer:
+                return None
+            try:
+                return self._ctypes.wstring_at(pointer)
+            finally:
+                self._kernel32.GlobalUnlock(handle)
+        finally:
+            self._user32.CloseClipboard()
+
+    def set(self, text: str):
+        buffer = self._ctypes.create_unicode_buffer(text)
+        size = self._ctypes.sizeof(buffer)
+        handle = self._kernel32.GlobalAlloc(self.GMEM_MOVEABLE, size)
+        if not handle:
+            raise ClipboardError("GlobalAlloc failed")
+        pointer = self._kernel32.GlobalLock(handle)
+        self._ctypes.memmove(pointer, buffer, size)
+        self._kernel32.GlobalUnlock(handle)
+        self._open()
+        try:
+            self._user32.EmptyClipboard()
+            if not self._user32.SetClipboardData(self.CF_UNICODETEXT, handle):
+                self._kernel32.GlobalFree(handle)  # ownership only passes to the system on success
+                raise ClipboardError("SetClipboardData failed")
+        finally:
+            self._user32.CloseClipboard()
+
+
+class CommandClipboard:
+    """pbcopy/pbpaste, wl-copy/wl-paste, xclip or xsel."""
+
+    def __init__(self, name, copy_cmd, paste_cmd):
+        self.name = name
+        self.copy_cmd = copy_cmd
+        self.paste_cmd = paste_cmd
+
+    def get(self):
+        try:
+            result = subprocess.run(self.paste_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=2)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise ClipboardError(str(e))
+        if result.returncode != 0:
+            return None  # empty, or no text target
+        return result.stdout.decode("utf-8", errors="replace")
+
+    def set(self, text: str):
+        try:
+            # xclip/wl-copy fork to keep serving the selection, so don't wait on their output pipes.
+            result = subprocess.run(self.copy_cmd, input=text.encode("utf-8"), stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=2)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise ClipboardError(str(e))
+        if result.returncode != 0:
+            raise ClipboardError(f"{self.copy_cmd[0]} exited with {result.returncode}")
+
+
+def _command_clipboards():
+    import os
+    if sys.platform == "darwin":
+        yield CommandClipboard("pbcopy", ["pbcopy"], ["pbpaste"])
+    if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-copy"):
+        yield CommandClipboard("wl-clipboard", ["wl-copy"], ["wl-paste", "--no-newline"])
+    if os.environ.get("DISPLAY"):
+        if shutil.which("xclip"):
+            yield CommandClipboard("xclip", ["xclip", "-selection", "clipboard"],
+                                   ["xclip", "-selection", "clipboard", "-o"])
+        if shutil.which("xsel"):
+            yield CommandClipboard("xsel", ["xsel", "--clipboard", "--input"], ["xsel", "--clipboard", "--output"])
+
+
+_clipboard = None
+_clipboard_loaded = False
+
+
+def get_clipboard():
+    """Returns the clipboard backend for this platform, or None if there is none."""
+    global _clipboard, _clipboard_loaded
+    if not _clipboard_loaded:
+        _clipboard_loaded = True
+        if sys.platform.startswith("win"):
+            try:
+                _clipboard = WindowsClipboard()
+            except Exception:
+                _clipboard = None
+        else:
+            _clipboard = next((c for c in _command_clipboards() if shutil.which(c.copy_cmd[0])), None)
+    return _clipboard
+
+
+def set_clipboard(clipboard):
+    global _clipboard, _clipboard_loaded
+    _clipboard = clipboard
+    _clipboard_loaded = True
+
+
+# ------------------ Paste with save/restore ------------------
+_lock = threading.Lock()
+_pending = {"timer": None, "saved": None, "pasted": ()}
+
+
+def _restore(clipboard):
+    with _lock:
+        saved, pasted = _pending["saved"], _pending["pasted"]
+        _pending.update(timer=None, saved=None, pasted=())
+        try:
+            # Leave it alone if the user copied something else in the meantime.
+            if saved is not None and clipboard.get() in pasted:
+                clipboard.set(saved)
+        except ClipboardError:
+            pass
+
+
+def _schedule_restore(clipboard, saved, pasted):
+    """Puts `saved` back after RESTORE_DELAY if the clipboard still holds one of the `pasted` texts."""
+    timer = threading.Timer(RESTORE_DELAY, _restore, args=(clipboard,))
+    timer.daemon = True
+    _pending.update(timer=timer, saved=saved, pasted=pasted)
+    timer.start()
+
+
+def paste_text(text: str, send_keys, clipboard=None) -> bool:
+    """Pastes `text` via the clipboard. Returns False (having typed nothing) if the clipboard can't be used."""
+    clipboard = clipboard or get_clipboard()
+    if clipboard is None:
+        return False
+    with _lock:
+        timer = _pending["timer"]
+        saved = accepted = None
+        try:
+            if timer is not None:
+                # Back-to-back pastes: the clipboard still holds our previous text, keep the original.
+                timer.cancel()
+                saved = _pending["saved"]
+            else:
+                saved = clipboard.get()
+            clipboard.set(text)
+            accepted = clipboard.get()
+            if accepted != text:
+                raise ClipboardError("clipboard did not accept the text")
+        except ClipboardError as e:
+            print(f"[Input] Clipboard paste unavailable ({e}); typing instead.")
+            if saved is not None:
+                # The original must still come back, whether our earlier paste or (part of) `text` is on it now.
+                earlier = _pending["pasted"] if timer is not None else ()
+                _schedule_restore(clipboard, saved, (*earlier, text, accepted))
+            return False
+        send_keys([PASTE_HOTKEY])
+        _schedule_restore(clipboard, saved, (text,))
+    return True
+
+
+def type_text(text: str, interval: float = 0.0, backend=None):
+    """Enters `text` into the focused field: pasted in one go, typed per key only as a fallback."""
+    if backend is None:
+        import action_plan
+        backend = action_plan.get_input_backend()
+    if not text:
+        return
+    if (len(text) >= PASTE_MIN_CHARS or not text.isascii()) and paste_text(text, backend.send_keys):
+        return
+    backend.type_chars(text, interval)
@@ -0,0 +1,304 @@
+"""Per-command tracing: where the time of each command went.
+
+Spans wrap speech recognition, every Gemini call, command dispatch, the GUI
+helpers, the waits inside them and each step plan. A command's spans are
+appended as one JSON line to `~/.friday/traces.jsonl`:
+
+    {"command": "play believer", "at": "2025-01-01T09:00:00", "total": 3.412, "action": "play_song",
+     "spans": [{"name": "recognize", "start": -0.61, "duration": 0.6, "thread": "MainThread"},
+               {"name": "gemini.intent", "start": 0.003, "duration": 0.94, "thread": "command_0"}, ...]}
+
+`start` is relative to the start of the command (recognition happens before
+it), and `parent` names the enclosing span. The last WINDOW durations of each
+span are also kept in memory for rolling p50/p95/p99s: send SIGUSR1 to print
+them, they are printed on exit, and `python tracing.py` computes the same table
+from the trace file.
+
+Tracing is off unless FRIDAY_TRACE=1 is set (or `enable()` is called, e.g.
+`yes3.py --trace`). Off, `span()` returns a shared no-op object and `traced`
+functions call straight through, so the instrumentation stays in place.
+"""
+import os
+import sys
+import json
+import math
+import time
+import atexit
+import signal
+import datetime
+import functools
+import threading
+import contextvars
+import collections
+
+from friday_store import data_path
+
+TRACE_FILE = "traces.jsonl"
+MAX_FILE_BYTES = 5_000_000   # rotated to traces.jsonl.1 beyond this
+WINDOW = 500                 # recent durations kept per span name for the percentiles
+MAX_PENDING = 20             # spans kept per thread until a command picks them up
+PERCENTILES = (50, 95, 99)
+
+enabled = False
+_trace = contextvars.ContextVar("friday_trace", default=None)
+_parent = contextvars.ContextVar("friday_span", default=None)
+_samples = collections.defaultdict(lambda: collections.deque(maxlen=WINDOW))
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _error_name(exc_type):
+    return None if exc_type is None or exc_type is SystemExit else exc_type.__name__
+
+
+def _finish(name: str, start: float, duration: float, parent, attrs: dict):
+    with _lock:
+        _samples[name].append(duration)
+    span = {"name": name, "start": start, "duration": duration, "thread": threading.current_thread().name}
+    if parent:
+        span["parent"] = parent
+    if attrs:
+        span.update(attrs)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(span)
+    else:
+        # Recognition runs before its command exists; the next command on this thread collects it.
+        pending = getattr(_local, "pending", None)
+        if pending is None:
+            pending = _local.pending = collections.deque(maxlen=MAX_PENDING)
+        pending.append(span)
+
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "_token")
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Adds attributes once they are known (e.g. where an intent came from)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._token = _parent.set(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        _parent.reset(self._token)
+        error = _error_name(exc_type)
+        if error:
+            self.attrs["error"] = error
+        _finish(self.name, self.start, duration, _parent.get(), self.attrs)
+        return False
+
+
+def span(name: str, **attrs):
+    """`with span("gemini.intent"):` times a block as part of the current command."""
+    return Span(name, attrs) if enabled else _NO_SPAN
+
+
+def traced(name: str = None):
+    """Decorator: every call of the function is a span (named after the function by default)."""
+    def decorate(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name: str, seconds: float, **attrs):
+    """Adds a span measured elsewhere that ended just now (e.g. from a phrase's timestamps)."""
+    if enabled:
+        _finish(name, time.perf_counter() - seconds, seconds, _parent.get(), attrs)
+
+
+def take_pending() -> list:
+    """Spans recorded on this thread outside any command, to be carried into the next one."""
+    pending = getattr(_local, "pending", None) if enabled else None
+    if not pending:
+        return []
+    spans = list(pending)
+    pending.clear()
+    return spans
+
+
+def annotate(**attrs):
+    """Adds top-level fields (e.g. the resolved action) to the current command's trace."""
+    trace = _trace.get() if enabled else None
+    if trace is not None:
+        trace.attrs.update(attrs)
+
+
+class Trace:
+    def __init__(self, command_text: str, carried, attrs: dict):
+        self.command = command_text
+        self.attrs = attrs
+        self.at = datetime.datetime.now().isoformat(timespec="seconds")
+        self.origin = time.perf_counter()
+        self.spans = list(carried)
+        self._lock = threading.Lock()
+
+    def add(self, span: dict):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_json(self, total: float) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start"])
+        for s in spans:
+            s["start"] = round(s["start"] - self.origin, 4)
+            s["duration"] = round(s["duration"], 4)
+        return {"command": self.command, "at": self.at, "total": round(total, 4), **self.attrs, "spans": spans}
+
+
+class command:
+    """`with command(text):` collects the spans of one command and writes them out at the end.
+
+    Spans from worker threads belong to the command as long as the worker runs
+    in a copy of its context (see CommandRunner).
+    """
+
+    def __init__(self, text: str, carried=(), **attrs):
+        self.text = text
+        self.carried = carried
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.trace = Trace(self.text, self.carried, self.attrs) if enabled else None
+        if self.trace is not None:
+            self._token = _trace.set(self.trace)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        trace = self.trace
+        if trace is None:
+            return False
+        total = time.perf_counter() - trace.origin
+        _trace.reset(self._token)
+        error = _error_name(exc_type)
+        if error:
+            trace.attrs["error"] = error
+        with _lock:
+            _samples["command"].append(total)
+        try:
+            _write(trace.to_json(total))
+        except OSError as e:
+            print(f"[Tracing] Could not write the trace: {e}")
+        return False
+
+
+def _write(line: dict):
+    path = data_path(TRACE_FILE)
+    with _lock:
+        try:
+            if os.path.getsize(path) > MAX_FILE_BYTES:
+                os.replace(path, path + ".1")
+        except OSError:
+            pass
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+# ------------------ Percentiles ------------------
+def _percentile(ordered, p):
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples) -> dict:
+    """{span name: {"count", "p50", "p95", "p99", "max"}} from {span name: [seconds, ...]}."""
+    summary = {}
+    for name, durations in samples.items():
+        ordered = sorted(durations)
+        if ordered:
+            summary[name] = {"count": len(ordered), **{f"p{p}": _percentile(ordered, p) for p in PERCENTILES},
+                             "max": ordered[-1]}
+    return summary
+
+
+def stats() -> dict:
+    """Rolling percentiles over the last WINDOW calls of each span in this process."""
+    with _lock:
+        samples = {name: list(durations) for name, durations in _samples.items()}
+    return summarize(samples)
+
+
+def format_stats(summary) -> str:
+    if not summary:
+        return "No spans recorded yet."
+    lines = [f"{'span':<32}{'count':>7}" + "".join(f"{'p%d' % p:>10}" for p in PERCENTILES) + f"{'max':>10}"]
+    for name, row in sorted(summary.items(), key=lambda item: -item[1]["p50"]):
+        lines.append(f"{name[:31]:<32}{row['count']:>7}"
+                     + "".join(f"{row['p%d' % p] * 1000:>8.0f}ms" for p in PERCENTILES)
+                     + f"{row['max'] * 1000:>8.0f}ms")
+    return "\n".join(lines)
+
+
+def dump():
+    print(format_stats(stats()))
+
+
+def enable():
+    """Turns tracing on; dumps the percentiles on SIGUSR1 (where there is one) and at exit."""
+    global enabled
+    if enabled:
+        return
+    enabled = True
+    atexit.register(lambda: _samples and dump())
+    if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR1, lambda signum, frame: dump())
+
+
+if os.getenv("FRIDAY_TRACE", "").lower() in ("1", "true", "yes"):
+    enable()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Span percentiles from FRIDAY's command traces.")
+    parser.add_argument("--file", default=None, help=f"trace file (default: ~/.friday/{TRACE_FILE})")
+    parser.add_argument("--last", type=int, default=0, help="only the last N commands")
+    parser.add_argument("--command", help="only commands containing this text")
+    args = parser.parse_args()
+    path = args.file or data_path(TRACE_FILE)
+    try:
+        with open(path, encoding="utf-8") as f:
+            traces = [json.loads(line) for line in f if line.strip()]
+    except OSError as e:
+        sys.exit(f"Could not read {path}: {e}")
+    if args.command:
+        traces = [t for t in traces if args.command.lower() in t["command"].lower()]
+    if args.last:
+        traces = traces[-args.last:]
+    samples = collections.defaultdict(list)
+    for t in traces:
+        samples["command"].append(t["total"])
+        for s in t["spans"]:
+            samples[s["name"]].append(s["duration"])
+    print(f"{len(traces)} commands from {path}")
+    print(format_stats(summarize(samples)))
@@ -0,0 +1,161 @@
+"""Text-to-speech on a background thread.
+
+pyttsx3's `runAndWait()` blocks until a sentence has been spoken, which held
+every command up behind its own status message. `SpeechWorker` owns the engine
+on a dedicated thread (SAPI5 requires the engine to be used from the thread
+that created it) and speaks queued messages in priority order:
+
+* `say(text)` returns immediately; `say(text, wait=True)` returns once the text
+  has been spoken, for prompts that must finish before listening starts;
+* messages still waiting after `max_age` seconds are dropped rather than
+  spoken late;
+* `interrupt()` (barge-in) cuts off the current sentence with `engine.stop()`
+  from the engine's word callback and drops everything queued. Callers use it
+  when the user starts a new command (SPACE pressed, wake word heard) rather
+  than on raw microphone energy, since the microphone also hears FRIDAY.
+
+With a `PhraseCache`, phrases (or template prefixes) rendered earlier are
+played from disk instead of being synthesized, and new ones are rendered
+while the worker is otherwise idle.
+"""
+import time
+import queue
+import itertools
+import threading
+
+import startup_profile
+
+URGENT, NORMAL, LOW = 0, 1, 2
+STALE_AFTER = 10.0  # seconds a non-blocking message may wait before it is no longer worth saying
+
+
+class Utterance:
+    def __init__(self, text: str, priority: int, max_age: float, generation: int):
+        self.text = text
+        self.priority = priority
+        self.max_age = max_age
+        self.generation = generation
+        self.created_at = time.monotonic()
+        self.status = "queued"  # -> spoken / interrupted / dropped / failed
+        self.done = threading.Event()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self.done.wait(timeout)
+
+    def __repr__(self):
+        return f"Utterance({self.text!r}, priority={self.priority}, status={self.status})"
+
+
+class SpeechWorker:
+    def __init__(self, engine_factory=None, phrase_cache=None):
+        self._engine_factory = engine_factory
+        self._engine = None
+        self.phrase_cache = phrase_cache
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._generation = 0          # bumped by interrupt(); older utterances are dropped
+        self._stop_current = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self.current = None
+        self.stats = {"spoken": 0, "interrupted": 0, "dropped": 0, "failed": 0}
+
+    # ------------------ Public API ------------------
+    def say(self, text: str, priority: int = NORMAL, wait: bool = False, max_age: float = STALE_AFTER):
+        """Queues `text`; with `wait`, blocks until it has been spoken (and never drops it as stale)."""
+        self._ensure_started()
+        utterance = Utterance(text, priority, None if wait else max_age, self._generation)
+        self._queue.put((priority, next(self._seq), utterance))
+        if wait:
+            utterance.wait()
+        return utterance
+
+    def interrupt(self):
+        """Stops the sentence being spoken and drops everything queued."""
+        with self._lock:
+            self._generation += 1
+            if self.current is not None:
+                self._stop_current = True
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Waits until everything queued so far has been spoken or dropped."""
+        marker = self.say("", priority=LOW + 1, max_age=None)
+        return marker.wait(timeout)
+
+    # ------------------ Worker ------------------
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tts", daemon=True)
+                self._thread.start()
+
+    def _create_engine(self):
+        try:
+            with startup_profile.step("text-to-speech engine"):
+                if self._engine_factory is not None:
+                    engine = self._engine_factory()
+                else:
+                    import pyttsx3
+                    engine = pyttsx3.init()
+        except Exception as e:
+            print(f"[TTS] Text-to-speech unavailable: {e}")
+            return None
+        engine.connect("started-word", self._on_word)
+        return engine
+
+    def _on_word(self, name, location, length):
+        # pyttsx3 only supports stop() from inside its own callbacks on some drivers.
+        if self._stop_current:
+            self._engine.stop()
+
+    def _finish(self, utterance, status):
+        utterance.status = status
+        self.stats[status] += 1
+        utterance.done.set()
+
+    def _speak(self, text):
+        cached, remainder = self.phrase_cache.split(text) if self.phrase_cache else (None, text)
+        if cached and not self.phrase_cache.player.play(cached, lambda: self._stop_current):
+            return
+        if remainder and not self._stop_current:
+            self._engine.say(remainder)
+            self._engine.runAndWait()
+
+    def _run(self):
+        self._engine = self._create_engine()
+        if self.phrase_cache is not None and (self._engine is None or not self.phrase_cache.attach(self._engine)):
+            self.phrase_cache = None
+        while True:
+            try:
+                # With phrases waiting to be pre-rendered, render them whenever nothing is queued.
+                timeout = 0.2 if self.phrase_cache and self.phrase_cache.has_pending else None
+                _, _, utterance = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self.phrase_cache.render_next(self._engine)
+                continue
+            if not utterance.text:
+                utterance.status = "spoken"
+                utterance.done.set()  # wait_idle() marker
+                continue
+            with self._lock:
+                stale = utterance.generation != self._generation or (
+                    utterance.max_age is not None and time.monotonic() - utterance.created_at > utterance.max_age)
+                if not stale:
+                    self.current = utterance
+                    self._stop_current = False
+            if stale:
+                self._finish(utterance, "dropped")
+                continue
+            if self._engine is None:
+                self._finish(utterance, "failed")
+                continue
+            try:
+                self._speak(utterance.text)
+                status = "interrupted" if self._stop_current else "spoken"
+            except Exception as e:
+                print(f"[TTS] Could not speak: {e}")
+                status = "failed"
+            with self._lock:
+                self.current = None
+                self._stop_current = False
+            self._finish(utterance, status)
@@ -0,0 +1,130 @@
+"""Condition-based waits that replace fixed time.sleep calls in the GUI helpers.
+
+Each wait polls with a short, growing interval and returns as soon as its
+condition holds, so a warm app is ready in tens of milliseconds and a cold one
+still gets up to `timeout` seconds. When no window backend is available the
+wait sleeps `fallback` seconds instead, i.e. the old fixed delay.
+
+A process that runs cancellable jobs (automation_worker) installs an abort
+check; waits and plan steps then raise `Aborted` once the job is cancelled.
+"""
+import time
+
+import tracing
+import window_backend
+from window_registry import find_window
+
+POLL_INTERVAL = 0.02
+MAX_POLL_INTERVAL = 0.1
+POLL_BACKOFF = 1.5
+
+_abort_check = None
+
+
+class Aborted(Exception):
+    """The job this wait belongs to was cancelled."""
+
+
+def set_abort_check(check):
+    """`check()` returning True makes the next wait or plan step raise Aborted."""
+    global _abort_check
+    _abort_check = check
+
+
+def check_abort():
+    if _abort_check is not None and _abort_check():
+        raise Aborted("cancelled")
+
+
+def wait_until(predicate, timeout: float = 10.0, interval: float = POLL_INTERVAL,
+               max_interval: float = MAX_POLL_INTERVAL, backoff: float = POLL_BACKOFF):
+    """Polls `predicate` until it returns something truthy; returns that value, or None on timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        check_abort()
+        try:
+            result = predicate()
+        except Exception:
+            result = None
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+def _title_matches(window, title):
+    if window is None:
+        return False
+    # Focus on the registry's window counts even when its title doesn't name the app (Spotify while playing).
+    registered = find_window(title)
+    if registered is not None and window_backend.window_id(registered) == window_backend.window_id(window):
+        return True
+    return title.lower() in (window.title or "").lower()
+
+
+@tracing.traced()
+def wait_for_window(title: str, timeout: float = 10.0, fallback: float = 2.0):
+    """Waits until a window whose title contains `title` exists; returns it (or None)."""
+    backend = window_backend.get_backend()
+    if backend is None:
+        time.sleep(fallback)
+        return None
+    return wait_until(lambda: find_window(title), timeout)
+
+
+@tracing.traced()
+def wait_for_focus(title: str, timeout: float = 5.0, fallback: float = 1.0):
+    """Waits until the foreground window's title contains `title`; returns it (or None)."""
+    backend = window_backend.get_backend()
+    if backend is None:
+        time.sleep(fallback)
+        return None
+    def focused():
+        window = backend.active_window()
+        return window if _title_matches(window, title) else None
+    return wait_until(focused, timeout)
+
+
+def active_title():
+    backend = window_backend.get_backend()
+    if backend is None:
+        return None
+    window = backend.active_window()
+    return window.title if window is not None else ""
+
+
+@tracing.traced()
+def wait_for_title_change(old_title, timeout: float = 3.0, fallback: float = 1.0):
+    """Waits until the foreground window's title differs from `old_title`; returns a truthy value, or None on timeout."""
+    backend = window_backend.get_backend()
+    if backend is None or old_title is None:
+        time.sleep(fallback)
+        return None
+    def changed():
+        window = backend.active_window()
+        title = window.title if window is not None else ""
+        # The window (or True when nothing has the focus), since the new title may be "".
+        return (window or True) if title != old_title else None
+    return wait_until(changed, timeout)
+
+
+@tracing.traced()
+def activate_and_wait(title: str, timeout: float = 3.0):
+    """Brings an existing window to the front and waits for the focus; returns it, or None if there is none.
+
+    A window that is slow to take the focus is still returned, so callers don't launch the app a second time.
+    """
+    window = find_window(title)
+    if window is None:
+        return None
+    try:
+        window.activate()
+    except Exception as e:
+        print(f"[Waits] Could not activate '{title}': {e}")
+        return window
+    if wait_for_focus(title, timeout) is None:
+        print(f"[Waits] '{title}' did not take the focus within {timeout}s")
+    return window
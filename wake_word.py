@@ -0,0 +1,311 @@
+"""Offline wake-word spotting, so only speech addressed to FRIDAY is sent for transcription.
+
+Phrases cut by the audio pipeline's energy gate are compared against a few
+recordings of the wake word ("Friday", "फ्राईडे") stored in
+`~/.friday/wake_words/*.wav`. Each recording and the start of each phrase are
+turned into frames of log band energies (Goertzel filters, cepstral-mean
+normalized, so microphone gain doesn't matter) and matched with dynamic time
+warping. The detection threshold is calibrated from how much the recordings
+differ from each other and scaled by the sensitivity (0..1, higher accepts
+more; FRIDAY_WAKE_SENSITIVITY or `--sensitivity`).
+
+    python wake_word.py enroll --count 5          # record templates from the microphone
+    python wake_word.py score clip.wav            # distance and detection for one clip
+    python wake_word.py eval fixtures/            # fixtures/positive/*.wav, fixtures/negative/*.wav
+"""
+import os
+import sys
+import glob
+import math
+import wave
+from array import array
+
+from friday_store import data_path
+from intent_cache import WAKE_WORDS
+
+TEMPLATE_DIR = "wake_words"
+DEFAULT_SENSITIVITY = float(os.getenv("FRIDAY_WAKE_SENSITIVITY", "0.5"))
+FEATURE_RATE = 8000       # Hz; phrases are averaged down to this before feature extraction
+FRAME_SECONDS = 0.03
+HOP_SECONDS = 0.02
+BAND_FREQS = (250, 400, 600, 850, 1150, 1500, 2000, 2600, 3300)
+SPEECH_DB = 12            # frames this far above the quietest frame count as speech...
+PEAK_RANGE_DB = 30        # ...as long as they are within this much of the loudest frame
+START_SLACK = 5           # frames the match may start before/after the detected speech onset
+_ARRAY_TYPES = {2: "h", 4: "i"}
+
+
+# ------------------ Features ------------------
+def pcm_samples(data: bytes, sample_width: int):
+    if sample_width not in _ARRAY_TYPES:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    return array(_ARRAY_TYPES[sample_width], data[:len(data) - len(data) % sample_width])
+
+
+def downsample(samples, rate: int):
+    """Box-filter decimation to roughly FEATURE_RATE; returns (samples, new_rate)."""
+    step = max(1, round(rate / FEATURE_RATE))
+    if step == 1:
+        return list(samples), rate
+    out = [sum(samples[i:i + step]) / step for i in range(0, len(samples) - step + 1, step)]
+    return out, rate / step
+
+
+def frame_features(samples, rate: float):
+    """Per-frame [log band energies..., log energy] vectors."""
+    size = int(FRAME_SECONDS * rate)
+    hop = int(HOP_SECONDS * rate)
+    window = [0.5 - 0.5 * math.cos(2 * math.pi * i / (size - 1)) for i in range(size)]
+    coeffs = [2 * math.cos(2 * math.pi * f / rate) for f in BAND_FREQS if f < rate / 2]
+    frames = []
+    for start in range(0, len(samples) - size + 1, hop):
+        chunk = [s * w for s, w in zip(samples[start:start + size], window)]
+        vector = []
+        for coeff in coeffs:
+            # Goertzel: power of a single DFT bin without a full FFT.
+            s1 = s2 = 0.0
+            for x in chunk:
+                s1, s2 = x + coeff * s1 - s2, s1
+            vector.append(math.log(s1 * s1 + s2 * s2 - coeff * s1 * s2 + 1.0))
+        vector.append(math.log(sum(x * x for x in chunk) + 1.0))
+        frames.append(vector)
+    return frames
+
+
+def speech_bounds(frames):
+    """(first, last) frame index of the speech: loud relative to both the noise floor and the peak."""
+    if not frames:
+        return 0, 0
+    energies = [f[-1] for f in frames]
+    to_log = math.log(10) / 10  # dB -> natural log of power
+    level = max(min(energies) + SPEECH_DB * to_log, max(energies) - PEAK_RANGE_DB * to_log)
+    loud = [i for i, e in enumerate(energies) if e >= level]
+    if not loud:
+        return 0, len(frames) - 1
+    return loud[0], loud[-1]
+
+
+def normalize(frames, reference=None):
+    """Subtracts the per-dimension mean of `reference` (default: `frames`) - cepstral mean normalization."""
+    reference = reference or frames
+    if not reference:
+        return frames
+    means = [sum(col) / len(reference) for col in zip(*reference)]
+    return [[v - m for v, m in zip(frame, means)] for frame in frames]
+
+
+def _distance(a, b):
+    return math.sqrt(sum((x - y) * (x - y) for x, y in zip(a, b)))
+
+
+def dtw(template, query, start_range=(0, 1), open_end=True):
+    """Length-normalized DTW cost of aligning all of `template` to a prefix of `query`.
+
+    The match may begin at any query frame in `start_range` and (with
+    `open_end`) stop anywhere past 60% of the template length. Returns
+    (cost, end_frame_in_query).
+    """
+    m, n = len(template), len(query)
+    if not m or not n:
+        return math.inf, 0
+    inf = math.inf
+    prev_cost = [inf] * n
+    prev_len = [0] * n
+    for i in range(m):
+        cost = [inf] * n
+        length = [0] * n
+        for j in range(n):
+            d = _distance(template[i], query[j])
+            if i == 0:
+                if start_range[0] <= j < start_range[1]:
+                    cost[j], length[j] = d, 1
+                elif j and cost[j - 1] < inf:
+                    cost[j], length[j] = cost[j - 1] + d, length[j - 1] + 1
+                continue
+            best, best_len = prev_cost[j], prev_len[j]
+            if j and prev_cost[j - 1] <= best:
+                best, best_len = prev_cost[j - 1], prev_len[j - 1]
+            if j and cost[j - 1] < best:
+                best, best_len = cost[j - 1], length[j - 1]
+            if best < inf:
+                cost[j], length[j] = best + d, best_len + 1
+        prev_cost, prev_len = cost, length
+    first_end = max(start_range[0], int(m * 0.6)) if open_end else n - 1
+    ends = [(prev_cost[j] / prev_len[j], j) for j in range(first_end, n) if prev_cost[j] < inf]
+    return min(ends) if ends else (inf, 0)
+
+
+# ------------------ Detector ------------------
+class Template:
+    def __init__(self, name: str, frames):
+        self.name = name
+        first, last = speech_bounds(frames)
+        self.frames = normalize(frames[first:last + 1])
+
+
+def read_wav(path: str):
+    """Returns (pcm bytes, sample rate, sample width) of the first channel."""
+    with wave.open(path, "rb") as w:
+        rate, width, channels = w.getframerate(), w.getsampwidth(), w.getnchannels()
+        data = w.readframes(w.getnframes())
+    if channels > 1:
+        samples = pcm_samples(data, width)
+        data = array(_ARRAY_TYPES[width], samples[::channels]).tobytes()
+    return data, rate, width
+
+
+def features_from_pcm(data: bytes, rate: int, width: int, max_seconds: float = None):
+    if max_seconds is not None:
+        data = data[:int(max_seconds * rate) * width]
+    samples, feature_rate = downsample(pcm_samples(data, width), rate)
+    return frame_features(samples, feature_rate)
+
+
+class WakeWordDetector:
+    def __init__(self, templates, sensitivity: float = DEFAULT_SENSITIVITY, threshold: float = None):
+        if len(templates) < 2 and threshold is None:
+            raise ValueError("WakeWordDetector needs at least two templates to calibrate its threshold")
+        self.templates = list(templates)
+        self.sensitivity = min(max(sensitivity, 0.0), 1.0)
+        self.base_threshold = threshold or self._calibrate()
+        self.longest = max(len(t.frames) for t in self.templates)
+
+    @classmethod
+    def from_wavs(cls, paths, **kwargs):
+        templates = []
+        for path in paths:
+            data, rate, width = read_wav(path)
+            templates.append(Template(os.path.basename(path), features_from_pcm(data, rate, width)))
+        return cls(templates, **kwargs)
+
+    @classmethod
+    def from_directory(cls, directory: str = None, **kwargs):
+        """Detector built from every .wav in `directory` (default ~/.friday/wake_words), or None if there are too few."""
+        directory = directory or data_path(TEMPLATE_DIR)
+        paths = sorted(glob.glob(os.path.join(directory, "*.wav")))
+        return cls.from_wavs(paths, **kwargs) if len(paths) >= 2 else None
+
+    def _calibrate(self):
+        """Typical distance between two recordings of the wake word (the worst template's mean)."""
+        means = []
+        for a in self.templates:
+            costs = [dtw(a.frames, b.frames, open_end=False)[0] for b in self.templates if b is not a]
+            means.append(sum(costs) / len(costs))
+        return max(means)
+
+    @property
+    def threshold(self) -> float:
+        return self.base_threshold * (0.7 + 0.8 * self.sensitivity)  # 0.5 -> 1.1x the calibrated spread
+
+    def score(self, data: bytes, rate: int, width: int):
+        """Best (distance, template name, seconds where the wake word ends) for the start of a phrase."""
+        frames = features_from_pcm(data, rate, width, max_seconds=1 + self.longest * 1.6 * HOP_SECONDS)
+        onset, _ = speech_bounds(frames)
+        window = frames[:onset + int(self.longest * 1.6) + START_SLACK]
+        reference = window[onset:onset + self.longest]
+        query = normalize(window, reference)
+        best = (math.inf, None, 0.0)
+        for template in self.templates:
+            cost, end = dtw(template.frames, query, start_range=(max(0, onset - START_SLACK), onset + START_SLACK))
+            if cost < best[0]:
+                best = (cost, template.name, (end + 1) * HOP_SECONDS + FRAME_SECONDS - HOP_SECONDS)
+        return best
+
+    def detect(self, data: bytes, rate: int, width: int):
+        """Byte offset where the command starts (right after the wake word), or None if there's no wake word."""
+        cost, _, end_seconds = self.score(data, rate, width)
+        if cost > self.threshold:
+            return None
+        return min(len(data), int(end_seconds * rate) * width)
+
+
+def strip_wake_word(text: str):
+    """Text after a leading wake word ("friday ...", "फ्राईडे ..."), or None if it doesn't start with one."""
+    lowered = (text or "").lower().strip()
+    for word in WAKE_WORDS:
+        if lowered.startswith(word):
+            return lowered[len(word):].strip(" ,.!?।")
+    return None
+
+
+# ------------------ CLI ------------------
+def _enroll(args):
+    from microphone import get_microphone
+    directory = args.templates or data_path(TEMPLATE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    mic = get_microphone()
+    mic.ensure_calibrated()
+    r = mic.recognizer
+    with mic as source:
+        existing = len(glob.glob(os.path.join(directory, f"{args.word}_*.wav")))
+        for i in range(args.count):
+            input(f"[{i + 1}/{args.count}] Press Enter, then say '{args.word}' once...")
+            audio = r.listen(source, timeout=5, phrase_time_limit=2)
+            path = os.path.join(directory, f"{args.word}_{existing + i + 1}.wav")
+            with open(path, "wb") as f:
+                f.write(audio.get_wav_data(convert_rate=16000, convert_width=2))
+            print(f"Saved {path}")
+
+
+def _detector(args):
+    detector = WakeWordDetector.from_directory(args.templates, sensitivity=args.sensitivity)
+    if detector is None:
+        sys.exit("Need at least two wake-word templates; run `python wake_word.py enroll` first.")
+    return detector
+
+
+def _score(args):
+    detector = _detector(args)
+    print(f"Threshold {detector.threshold:.3f} (sensitivity {detector.sensitivity})")
+    for path in args.wavs:
+        cost, name, end = detector.score(*read_wav(path))
+        verdict = "WAKE" if cost <= detector.threshold else "-"
+        print(f"{verdict:<5} {cost:7.3f}  {os.path.basename(path)}  (closest: {name}, ends at {end:.2f}s)")
+
+
+def _evaluate(args):
+    """Recall and false accepts over fixtures/positive/*.wav and fixtures/negative/*.wav at several sensitivities."""
+    base = _detector(args)
+    costs = {}
+    for label in ("positive", "negative"):
+        for path in sorted(glob.glob(os.path.join(args.fixtures, label, "*.wav"))):
+            costs[path] = (label, base.score(*read_wav(path))[0])
+    if not costs:
+        sys.exit(f"No fixtures in {args.fixtures}/positive or {args.fixtures}/negative")
+    positives = sum(1 for label, _ in costs.values() if label == "positive")
+    negatives = len(costs) - positives
+    print(f"{len(costs)} fixtures ({positives} positive, {negatives} negative), calibrated spread {base.base_threshold:.3f}")
+    print(f"{'sensitivity':>11} {'threshold':>10} {'recall':>8} {'false accepts':>14}")
+    failures = 0
+    for sensitivity in sorted(set(args.sweep + [args.sensitivity])):
+        threshold = base.base_threshold * (0.7 + 0.8 * sensitivity)
+        hits = sum(1 for label, cost in costs.values() if label == "positive" and cost <= threshold)
+        false_accepts = sum(1 for label, cost in costs.values() if label == "negative" and cost <= threshold)
+        marker = " <" if sensitivity == args.sensitivity else ""
+        print(f"{sensitivity:>11.2f} {threshold:>10.3f} {hits:>4}/{positives:<3} {false_accepts:>8}/{negatives:<5}{marker}")
+        if sensitivity == args.sensitivity:
+            failures = (positives - hits) + false_accepts
+    if args.verbose:
+        for path, (label, cost) in costs.items():
+            print(f"{label:<9} {cost:7.3f}  {os.path.basename(path)}")
+    sys.exit(1 if args.strict and failures else 0)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Record, score and evaluate FRIDAY's offline wake-word detector.")
+    parser.add_argument("--templates", help="template directory (default ~/.friday/wake_words)")
+    parser.add_argument("--sensitivity", type=float, default=DEFAULT_SENSITIVITY)
+    sub = parser.add_subparsers(dest="command", required=True)
+    enroll = sub.add_parser("enroll", help="record wake-word templates from the microphone")
+    enroll.add_argument("--count", type=int, default=5)
+    enroll.add_argument("--word", default="friday")
+    score = sub.add_parser("score", help="score WAV files against the templates")
+    score.add_argument("wavs", nargs="+")
+    evaluate = sub.add_parser("eval", help="recall/false accepts over a fixtures directory")
+    evaluate.add_argument("fixtures")
+    evaluate.add_argument("--sweep", type=float, nargs="*", default=[0.1, 0.3, 0.5, 0.7, 0.9])
+    evaluate.add_argument("--strict", action="store_true", help="exit non-zero on any miss or false accept")
+    evaluate.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    {"enroll": _enroll, "score": _score, "eval": _evaluate}[args.command](args)
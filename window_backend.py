@@ -0,0 +1,282 @@
+"""Pluggable access to top-level windows.
+
+`get_backend()` returns the pygetwindow backend where it works (Windows/macOS),
+the X11 backend on Linux desktops with wmctrl/xdotool installed, or None when
+no window information is available - callers then fall back to their old fixed
+delays. `FakeWindowBackend` simulates windows appearing, gaining focus and
+changing title over time so the wait logic can run headlessly.
+
+Every backend provides `windows()`, `active_window()` and `is_valid(window)`;
+backends that can report window-manager changes also provide `watch(callback)`.
+"""
+import os
+import sys
+import time
+import shutil
+import threading
+import subprocess
+
+_backend = None
+_backend_loaded = False
+_lock = threading.Lock()
+
+
+class PyGetWindowBackend:
+    name = "pygetwindow"
+
+    def __init__(self):
+        import pygetwindow
+        self._gw = pygetwindow
+        self._gw.getAllWindows()  # raises on platforms pygetwindow doesn't implement
+        self._user32 = None
+        if sys.platform.startswith("win"):
+            import ctypes
+            self._user32 = ctypes.windll.user32
+
+    def windows(self):
+        return [w for w in self._gw.getAllWindows() if w.title]
+
+    def active_window(self):
+        try:
+            return self._gw.getActiveWindow()
+        except Exception:
+            return None
+
+    def is_valid(self, window):
+        # IsWindow is a single syscall, far cheaper than re-enumerating every window.
+        if self._user32 is not None and hasattr(window, "_hWnd"):
+            return bool(self._user32.IsWindow(window._hWnd))
+        try:
+            return bool(window.title)
+        except Exception:
+            return False
+
+
+class X11Window:
+    def __init__(self, backend, wid: int, wm_class: str, title: str):
+        self._backend = backend
+        self.handle = wid
+        self.wm_class = wm_class
+        self._title = title
+
+    @property
+    def title(self):
+        # As of the last `wmctrl -lx` listing (or refresh_title); scans read every title, so no process per read.
+        return self._title
+
+    def refresh_title(self) -> bool:
+        """Re-reads this window's title; False if the window is gone."""
+        name = self._backend._run("xdotool", "getwindowname", str(self.handle))
+        if name is not None:
+            self._title = name
+        return name is not None
+
+    @property
+    def isActive(self):
+        active = self._backend.active_window()
+        return active is not None and active.handle == self.handle
+
+    def activate(self):
+        self._backend._run("wmctrl", "-ia", hex(self.handle))
+
+    def maximize(self):
+        self._backend._run("wmctrl", "-ir", hex(self.handle), "-b", "add,maximized_vert,maximized_horz")
+
+    def minimize(self):
+        self._backend._run("xdotool", "windowminimize", str(self.handle))
+
+    def __repr__(self):
+        return f"X11Window({hex(self.handle)}, {self.wm_class!r}, {self._title!r})"
+
+
+class X11Backend:
+    """Linux/X11 windows via wmctrl + xdotool; `xprop -spy` on the root window supplies change events."""
+    name = "x11"
+
+    def __init__(self):
+        if not os.environ.get("DISPLAY") or not (shutil.which("wmctrl") and shutil.which("xdotool")):
+            raise RuntimeError("X11 backend needs DISPLAY, wmctrl and xdotool")
+        self._known = {}  # handle -> X11Window, so cached handles keep their identity across scans
+
+    def _run(self, *args):
+        try:
+            result = subprocess.run(args, capture_output=True, text=True, timeout=2)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def windows(self):
+        output = self._run("wmctrl", "-lx") or ""
+        windows = []
+        for line in output.splitlines():
+            # 0x03a00003  0 spotify.Spotify  host Spotify Premium
+            parts = line.split(None, 4)
+            if len(parts) < 4:
+                continue
+            wid = int(parts[0], 16)
+            title = parts[4] if len(parts) > 4 else ""
+            window = self._known.get(wid)
+            if window is None:
+                window = self._known[wid] = X11Window(self, wid, parts[2], title)
+            else:
+                window._title = title
+            windows.append(window)
+        alive = {w.handle for w in windows}
+        self._known = {wid: w for wid, w in self._known.items() if wid in alive}
+        return windows
+
+    def active_window(self):
+        wid = self._run("xdotool", "getactivewindow")
+        if not wid:
+            return None
+        window = self._known.get(int(wid))
+        if window is None:
+            self.windows()
+            window = self._known.get(int(wid))
+        elif not window.refresh_title():  # title waits poll the focused window
+            return None
+        return window
+
+    def is_valid(self, window):
+        return window.refresh_title()
+
+    def watch(self, callback):
+        """Calls `callback()` whenever the window list or the focused window changes."""
+        if not shutil.which("xprop"):
+            return None
+        def spy():
+            try:
+                proc = subprocess.Popen(
+                    ["xprop", "-root", "-spy", "_NET_CLIENT_LIST", "_NET_ACTIVE_WINDOW"],
+                    stdout=subprocess.PIPE, text=True,
+                )
+            except OSError:
+                return
+            for _ in proc.stdout:
+                callback()
+        thread = threading.Thread(target=spy, name="x11-window-events", daemon=True)
+        thread.start()
+        return thread
+
+
+class FakeWindow:
+    def __init__(self, backend, title: str, handle: int, wm_class: str = None):
+        self._backend = backend
+        self.title = title
+        self.handle = handle
+        self.wm_class = wm_class
+        self.isMaximized = False
+        self.isMinimized = False
+        self.activations = 0
+
+    @property
+    def isActive(self):
+        return self._backend.active_window() is self
+
+    def activate(self):
+        self.activations += 1
+        self.isMinimized = False
+        self._backend._active = self
+
+    def maximize(self):
+        self.isMaximized = True
+
+    def minimize(self):
+        self.isMinimized = True
+
+    def close(self):
+        self._backend.close(self)
+
+    def __repr__(self):
+        return f"FakeWindow({self.title!r})"
+
+
+class FakeWindowBackend:
+    """In-memory window manager. Scheduled events fire once `clock()` passes their time."""
+    name = "fake"
+
+    def __init__(self, clock=None):
+        self.clock = clock or time.monotonic
+        self._windows = []
+        self._active = None
+        self._events = []  # (due, callback)
+        self._next_handle = 1
+        self.scans = 0  # number of full enumerations, to check the registry avoids them
+
+    def _run_due_events(self):
+        now = self.clock()
+        due = [e for e in self._events if e[0] <= now]
+        self._events = [e for e in self._events if e[0] > now]
+        for _, callback in sorted(due, key=lambda e: e[0]):
+            callback()
+
+    def open_window(self, title: str, delay: float = 0.0, focus: bool = True, wm_class: str = None):
+        """Creates a window now, or after `delay` seconds to simulate a cold app launch."""
+        def create():
+            window = FakeWindow(self, title, self._next_handle, wm_class)
+            self._next_handle += 1
+            self._windows.append(window)
+            if focus:
+                self._active = window
+        if delay <= 0:
+            create()
+            return self._windows[-1]
+        self._events.append((self.clock() + delay, create))
+        return None
+
+    def set_title(self, window, title: str, delay: float = 0.0):
+        def rename():
+            window.title = title
+        if delay <= 0:
+            rename()
+        else:
+            self._events.append((self.clock() + delay, rename))
+
+    def close(self, window):
+        if window in self._windows:
+            self._windows.remove(window)
+        if self._active is window:
+            self._active = None
+
+    def windows(self):
+        self._run_due_events()
+        self.scans += 1
+        return list(self._windows)
+
+    def active_window(self):
+        self._run_due_events()
+        return self._active
+
+    def is_valid(self, window):
+        self._run_due_events()
+        return window in self._windows
+
+
+def window_id(window):
+    """Stable identity for a window across backend calls (pygetwindow returns new objects each time)."""
+    return getattr(window, "_hWnd", None) or getattr(window, "handle", None) or id(window)
+
+
+def get_backend():
+    """Returns the active window backend, or None if this platform has none."""
+    global _backend, _backend_loaded
+    with _lock:
+        if not _backend_loaded:
+            for backend_class in (PyGetWindowBackend, X11Backend):
+                try:
+                    _backend = backend_class()
+                    break
+                except Exception:
+                    _backend = None
+            _backend_loaded = True
+    return _backend
+
+
+def set_backend(backend):
+    """Overrides the backend (e.g. with FakeWindowBackend for headless runs)."""
+    global _backend, _backend_loaded
+    with _lock:
+        _backend = backend
+        _backend_loaded = True
+    import window_registry
+    window_registry.reset_registry()
@@ -0,0 +1,146 @@
+"""Per-app window handle cache with ranked matching.
+
+`getWindowsWithTitle(name)[0]` enumerates every top-level window on each call
+and happily returns a browser tab titled "Spotify" instead of the player. The
+registry remembers the handle it picked for each app, re-validates it with a
+cheap per-handle check, and only rescans the window list on a miss, at most
+every SCAN_INTERVAL seconds or when the window manager reports a change.
+"""
+import time
+import threading
+
+import window_backend
+
+SCAN_INTERVAL = 0.2  # seconds
+
+BROWSER_APPS = ("brave", "chrome", "google chrome", "firefox", "edge", "microsoft edge", "opera")
+BROWSER_TITLE_SUFFIXES = (
+    " - brave", " - google chrome", " - chromium", " - mozilla firefox", " — mozilla firefox",
+    " - microsoft edge", " - microsoft​ edge", " - opera",  # Edge's title really has a zero-width space
+)
+
+# Window classes (X11 WM_CLASS) that identify an app even when its title doesn't
+# mention it - e.g. Spotify's title is just "Song - Artist" while playing.
+APP_WINDOW_CLASSES = {
+    "spotify": ("spotify",),
+    "brave": ("brave-browser", "brave"),
+    "discord": ("discord",),
+    "whatsapp": ("whatsapp",),
+    "visual studio code": ("code",),
+    "vs code": ("code",),
+}
+
+
+def match_score(app_name: str, title: str, wm_class: str = None) -> int:
+    """How well a window matches an app; 0 means it isn't that app."""
+    app = app_name.lower().strip()
+    title = (title or "").lower()
+    wm_class = (wm_class or "").lower()
+    if wm_class and any(c in wm_class for c in APP_WINDOW_CLASSES.get(app, (app.replace(" ", ""),))):
+        return 100
+    if app not in title:
+        return 0
+    if app not in BROWSER_APPS and title.endswith(BROWSER_TITLE_SUFFIXES):
+        return 0  # a browser tab *about* the app, not the app itself
+    score = 10
+    if title == app or title.startswith(app + " "):
+        score += 50  # "Spotify", "Spotify Premium", "WhatsApp"
+    elif title.endswith((" - " + app, " | " + app, " — " + app)):
+        score += 40  # "#general | Server - Discord", "New Tab - Brave"
+    elif title.startswith(app):
+        score += 20
+    return score
+
+
+class WindowRegistry:
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._handles = {}   # app key -> window
+        self._snapshot = []
+        self._scanned_at = 0.0
+        self._dirty = True
+        self._lock = threading.Lock()
+        self.scans = 0
+        self.cache_hits = 0
+        if backend is not None and hasattr(backend, "watch"):
+            backend.watch(self.mark_dirty)
+
+    def mark_dirty(self):
+        """Window list changed (window-manager event); the next miss rescans immediately."""
+        self._dirty = True
+
+    def _scan(self, force=False):
+        now = time.monotonic()
+        if force or self._dirty or now - self._scanned_at >= SCAN_INTERVAL:
+            self._snapshot = self.backend.windows()
+            self._scanned_at = now
+            self._dirty = False
+            self.scans += 1
+        return self._snapshot
+
+    def _is_valid(self, window):
+        try:
+            return self.backend.is_valid(window)
+        except Exception:
+            return False
+
+    def candidates(self, app_name: str, refresh: bool = False):
+        """All windows matching `app_name`, best first."""
+        if self.backend is None:
+            return []
+        with self._lock:
+            ranked = []
+            for window in self._scan(force=refresh):
+                score = match_score(app_name, window.title, getattr(window, "wm_class", None))
+                if score:
+                    ranked.append((score, window))
+            ranked.sort(key=lambda pair: pair[0], reverse=True)
+            return [window for _, window in ranked]
+
+    def find(self, app_name: str, refresh: bool = False):
+        """Best window for `app_name`, or None. Uses the cached handle while it is still alive."""
+        if self.backend is None:
+            return None
+        key = app_name.lower().strip()
+        with self._lock:
+            window = self._handles.get(key)
+        if window is not None and not refresh:
+            if self._is_valid(window):
+                self.cache_hits += 1
+                return window
+            self.forget(app_name)
+        for window in self.candidates(app_name, refresh=refresh):
+            if self._is_valid(window):  # the snapshot may be up to SCAN_INTERVAL old
+                with self._lock:
+                    self._handles[key] = window
+                return window
+        return None
+
+    def forget(self, app_name: str = None):
+        with self._lock:
+            if app_name is None:
+                self._handles.clear()
+            else:
+                self._handles.pop(app_name.lower().strip(), None)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> WindowRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = WindowRegistry(window_backend.get_backend())
+    return _registry
+
+
+def reset_registry():
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def find_window(app_name: str, refresh: bool = False):
+    return get_registry().find(app_name, refresh=refresh)
@@ -1,17 +1,26 @@
 import os
 import sys
 import time
-import re
 import pyautogui
-import pygetwindow as gw
 import keyboard
-import speech_recognition as sr
 from dotenv import load_dotenv
-import google.generativeai as genai  # Gemini API client
+import tracing
+import gemini_client  # shared, prewarmed Gemini model
+from intent_cache import IntentCache
+from intent_schema import (
+    INTENT_GENERATION_CONFIG, URL_GENERATION_CONFIG, parse_intent_response, parse_url_response,
+)
+from fast_parser import parse_command, FAST_PATH_MIN_CONFIDENCE
+import site_index
+import app_launcher
+import folder_index
+from text_input import type_text
+from microphone import get_microphone
+from waits import activate_and_wait, active_title, wait_for_focus, wait_for_title_change, wait_for_window
+import action_plan as plan
+from action_plan import run_plan
 
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
 
 # ------------------ Config ------------------
 SPOTIFY_APP_NAME = "Spotify"
@@ -36,11 +45,11 @@ last_folder_path = None
 
 # ------------------ Voice Input ------------------
 def get_voice_input_continuous():
-    r = sr.Recognizer()
-    mic = sr.Microphone()
-    print("Calibrating microphone...")
-    with mic as source:
-        r.adjust_for_ambient_noise(source, duration=2)
+    mic = get_microphone()
+    r = mic.recognizer
+    if mic.needs_calibration:
+        print("Calibrating microphone...")
+    mic.ensure_calibrated()
     print("Listening continuously (say 'Friday')...")
     while True:
         if keyboard.is_pressed("esc"):
@@ -48,15 +57,17 @@ def get_voice_input_continuous():
         try:
             with mic as source:
                 audio = r.listen(source, timeout=5, phrase_time_limit=10)
-                text = r.recognize_google(audio)
+                with tracing.span("recognize"):
+                    text = r.recognize_google(audio)
                 if text.lower().strip().startswith("friday"):
                     return text
         except Exception:
             continue
 
 def get_voice_input_button():
-    r = sr.Recognizer()
-    mic = sr.Microphone()
+    mic = get_microphone()
+    mic.ensure_calibrated()
+    r = mic.recognizer
     max_retries = 3
     retries = 0
     while retries < max_retries:
@@ -67,93 +78,101 @@ def get_voice_input_button():
                 return None
             if keyboard.is_pressed("space"):
                 with mic as source:
-                    r.adjust_for_ambient_noise(source, duration=0.5)
-                    audio = r.listen(source, timeout=30, phrase_time_limit=10)
+                    with tracing.span("listen"):
+                        audio = r.listen(source, timeout=30, phrase_time_limit=10)
                     try:
-                        text = r.recognize_google(audio)
+                        with tracing.span("recognize"):
+                            text = r.recognize_google(audio)
                         return text
                     except Exception:
                         retries += 1
                         break
 
 # ------------------ Gemini Helpers ------------------
-def ask_gemini_for_command(command: str) -> dict:
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    prompt = f"""
-You are a desktop assistant. Analyze this command and return JSON with:
-{{ "action": "<open_app/play_song/open_website/open_folder/play_youtube/send_message/exit>", "target": "<app/song/URL/folder/video>", "message_app": "<whatsapp/discord>", "recipient": "<name>", "message": "<text>" }}
+COMMAND_PROMPT = """
+You are a desktop assistant. Analyze this command and fill in the JSON fields:
+- action: open_app/play_song/open_website/open_folder/play_youtube/send_message/exit
+- target: the app/song/website/folder/video the command refers to
+- message_app, recipient, message: only for send_message (message_app is whatsapp or discord)
+- url: the official website URL of the target when it is a website or an app that also has a website, otherwise null
 User command: {command}
 """
+intent_cache = IntentCache("intent_cache_yes", COMMAND_PROMPT)
+
+def ask_gemini_for_command(command: str) -> dict:
+    cached = intent_cache.get(command)
+    if cached:
+        return cached
+    model = gemini_client.get_model()
+    prompt = COMMAND_PROMPT.format(command=command)
     try:
-        resp = model.generate_content(prompt)
-        text = resp.text.strip()
-        import json
-        json_start = text.find("{")
-        json_end = text.rfind("}") + 1
-        if json_start != -1 and json_end != -1:
-            return json.loads(text[json_start:json_end])
+        with tracing.span("gemini.intent"):
+            resp = model.generate_content(prompt, generation_config=INTENT_GENERATION_CONFIG)
+        result = parse_intent_response(resp.text)
+        intent_cache.put(command, result)
+        if result["url"] and result["target"] and result["action"] in ("open_app", "open_website"):
+            site_index.learn(result["target"], result["url"], website=result["action"] == "open_website")
+        return result
     except Exception as e:
         print(f"[Gemini Error] Could not interpret command: {e}")
     return {"action": "unknown", "raw_text": command}
 
+def resolve_command(command: str) -> dict:
+    # Local grammar first; only ambiguous or unusual commands go to Gemini.
+    intent, confidence = parse_command(command)
+    if intent and confidence >= FAST_PATH_MIN_CONFIDENCE:
+        print(f"⚡ Fast path ({confidence:.2f}): {intent['action']}")
+        return intent
+    return ask_gemini_for_command(command)
+
 def ask_gemini_for_url(command: str) -> str:
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    url = ""
+    url = site_index.lookup(command)
+    if url:
+        return url
+    model = gemini_client.get_model()
     try:
-        prompt = f"Extract official website URL from: {command}. Respond only with JSON: {{'url': '<full URL>'}}"
-        resp = model.generate_content(prompt)
-        text = resp.text.strip()
-        import json
-        json_start = text.find("{")
-        json_end = text.rfind("}") + 1
-        if json_start != -1 and json_end != -1:
-            result = json.loads(text[json_start:json_end])
-            url = result.get("url", "")
-    except:
-        pass
-
-    if not url:
-        try:
-            explicit_prompt = f"Send only the full URL for the {command} website."
-            resp = model.generate_content(explicit_prompt)
-            url = resp.text.strip()
-        except:
-            url = ""
-
-    url = url.strip().strip('"').strip("'")
-    url = re.sub(r"\s+", "", url)
-    url = url.rstrip(".")
-    if url and not url.startswith("http"):
-        url = "https://" + url
-    return url
+        prompt = f"Give the official website URL for: {command}"
+        with tracing.span("gemini.url"):
+            resp = model.generate_content(prompt, generation_config=URL_GENERATION_CONFIG)
+        url = parse_url_response(resp.text)
+        if url:
+            site_index.learn(command, url, website=True)
+    except Exception as e:
+        print(f"[Gemini Error] Could not resolve URL: {e}")
+    return url or ""
 
 # ------------------ App / Folder / Brave / Spotify / YouTube / Messaging ------------------
+@tracing.traced()
 def open_app_windows_search(app_name: str):
-    windows = gw.getWindowsWithTitle(app_name)
-    if windows:
-        try:
-            windows[0].activate()
-            return
-        except:
-            pass
+    if activate_and_wait(app_name):
+        return
+    if app_launcher.launch(app_name):  # installed app found in the launch index
+        if wait_for_window(app_name, timeout=15, fallback=2):
+            wait_for_focus(app_name, timeout=2, fallback=0)
+        return
+    previous_title = active_title()
     pyautogui.hotkey('win')
-    time.sleep(0.5)
-    pyautogui.write(app_name)
-    time.sleep(0.5)
+    wait_for_title_change(previous_title, timeout=1, fallback=0.5)  # Start menu took focus
+    type_text(app_name)
+    time.sleep(0.5)  # search results have no window of their own to wait on
     pyautogui.press('enter')
-    time.sleep(2)
+    if wait_for_window(app_name, timeout=15, fallback=2):
+        wait_for_focus(app_name, timeout=2, fallback=0)
 
+@tracing.traced()
 def open_folder(folder_name: str):
     global last_folder_path
     folder_name_lower = folder_name.lower()
     if folder_name_lower in SYSTEM_FOLDERS:
         folder_path = SYSTEM_FOLDERS[folder_name_lower]
-    elif last_folder_path:  # Subfolder of last opened folder
+    elif last_folder_path and os.path.isdir(os.path.join(last_folder_path, folder_name)):  # Subfolder of last opened folder
         folder_path = os.path.join(last_folder_path, folder_name)
-    else:  # Fallback to Windows search
+    else:
+        folder_path = folder_index.find(folder_name)  # any folder under the home directory
+    if folder_path is None:  # Fallback to Windows search
         pyautogui.hotkey('win')
         time.sleep(0.5)
-        pyautogui.write(folder_name)
+        type_text(folder_name)
         pyautogui.press('enter')
         time.sleep(1)
         return
@@ -167,106 +186,99 @@ def open_folder(folder_name: str):
         # fallback to Windows search
         pyautogui.hotkey('win')
         time.sleep(0.5)
-        pyautogui.write(folder_name)
+        type_text(folder_name)
         pyautogui.press('enter')
         time.sleep(1)
 
+@tracing.traced()
 def open_brave_website(url: str):
-    # Check if Brave is already open
-    windows = gw.getWindowsWithTitle(BRAVE_APP_NAME)
-    if windows:
-        # Activate the first Brave window and open a new tab
-        try:
-            windows[0].activate()
-            time.sleep(0.5)
-            pyautogui.hotkey('ctrl', 't')  # Open new tab
-            time.sleep(0.5)
-        except:
-            # fallback if activation fails
-            pyautogui.hotkey('win')
-            time.sleep(0.5)
-            pyautogui.write(BRAVE_APP_NAME)
-            time.sleep(0.5)
-            pyautogui.press('enter')
-            time.sleep(2)
+    # Reuse an open Brave window with a new tab; otherwise launch it via Windows search
+    if activate_and_wait(BRAVE_APP_NAME):
+        run_plan("brave_new_tab", [
+            plan.mark_title(),
+            plan.hotkey('ctrl', 't'),  # Open new tab
+            plan.wait_title_change(timeout=0.5, fallback=0.5),
+        ])
     else:
-        # No Brave window, open via Windows search
-        pyautogui.hotkey('win')
-        time.sleep(0.5)
-        pyautogui.write(BRAVE_APP_NAME)
-        time.sleep(0.5)
-        pyautogui.press('enter')
-        time.sleep(2)
+        open_app_windows_search(BRAVE_APP_NAME)
     
     # Click on the address bar and enter the URL
-    pyautogui.click(*BRAVE_SEARCH_BAR_COORDS)
-    time.sleep(0.2)
-    pyautogui.hotkey('ctrl', 'a')
-    pyautogui.press('delete')
-    pyautogui.write(url, interval=0.02)
-    pyautogui.press('enter')
-    time.sleep(2)
+    run_plan("brave_navigate", [
+        plan.click(*BRAVE_SEARCH_BAR_COORDS),
+        plan.sleep(0.2),
+        plan.hotkey('ctrl', 'a'),
+        plan.press('delete'),
+        plan.write(url, interval=0.02),
+        plan.mark_title(),
+        plan.press('enter'),
+        plan.wait_title_change(timeout=5, fallback=2),  # page title replaces "New Tab"
+    ])
 
 
 
+@tracing.traced()
 def perform_spotify_search(query: str):
-    try:
-        spotify_windows = gw.getWindowsWithTitle(SPOTIFY_APP_NAME)
-        if spotify_windows:
-            spotify_windows[0].activate()
-        time.sleep(1.5)
-    except:
-        pass
-
-    # Press Ctrl+K to open Spotify search
-    pyautogui.hotkey('ctrl', 'k')
-    time.sleep(0.5)
-    pyautogui.write(query, interval=0.05)
-    time.sleep(1)  # Wait for search results to load
-    pyautogui.hotkey('shift', 'enter')  # Play the first search result
-    time.sleep(1)
-    pyautogui.press('escape')  
+    run_plan("spotify_search", [
+        plan.focus(SPOTIFY_APP_NAME, timeout=1.5),
+        plan.hotkey('ctrl', 'k'),  # Press Ctrl+K to open Spotify search
+        plan.sleep(0.5),
+        plan.write(query, interval=0.05),
+        plan.sleep(1),  # Wait for search results to load
+        plan.hotkey('shift', 'enter'),  # Play the first search result
+        plan.sleep(1),
+        plan.press('escape'),
+    ])
 
 
+@tracing.traced()
 def open_spotify_song(song_name: str):
     open_app_windows_search(SPOTIFY_APP_NAME)
     perform_spotify_search(song_name)
 
+@tracing.traced()
 def open_youtube_video(video_query: str):
     open_brave_website("https://www.youtube.com")
-    time.sleep(2)
-    pyautogui.press('/')  # YouTube search bar
-    time.sleep(0.5)
-    pyautogui.write(video_query, interval=0.02)
-    pyautogui.press('enter')
-    time.sleep(2)
-    pyautogui.click(*YOUTUBE_TOP_VIDEO_COORDS)
-    time.sleep(1)
+    run_plan("youtube_play", [
+        plan.sleep(2),
+        plan.press('/'),  # YouTube search bar
+        plan.sleep(0.5),
+        plan.write(video_query, interval=0.02),
+        plan.press('enter'),
+        plan.sleep(2),
+        plan.click(*YOUTUBE_TOP_VIDEO_COORDS),
+        plan.sleep(1),
+    ])
 
+@tracing.traced()
 def send_whatsapp_message(recipient: str, message: str):
     open_app_windows_search("WhatsApp")
-    time.sleep(2)
-    pyautogui.hotkey('ctrl', 'f')  # Search in WhatsApp
-    time.sleep(0.5)
-    pyautogui.write(recipient)
-    time.sleep(1)
-    pyautogui.click(*WHATSAPP_TOP_CONTACT_COORDS)
-    time.sleep(0.5)
-    pyautogui.write(message)
-    pyautogui.press('enter')
+    wait_for_focus("WhatsApp", timeout=5, fallback=2)
+    run_plan("whatsapp_send", [
+        plan.hotkey('ctrl', 'f'),  # Search in WhatsApp
+        plan.sleep(0.5),
+        plan.write(recipient),
+        plan.sleep(1),
+        plan.click(*WHATSAPP_TOP_CONTACT_COORDS),
+        plan.sleep(0.5),
+        plan.write(message),
+        plan.press('enter'),
+    ])
     print(f"✅ Message sent to {recipient} on WhatsApp.")
 
+@tracing.traced()
 def send_discord_message(recipient: str, message: str):
     open_app_windows_search("Discord")
-    time.sleep(2)
-    pyautogui.hotkey('ctrl', 'k')  # Discord search shortcut
-    time.sleep(0.5)
-    pyautogui.write(recipient)
-    time.sleep(1)
-    pyautogui.press('enter')
-    time.sleep(0.5)
-    pyautogui.write(message)
-    pyautogui.press('enter')
+    wait_for_focus("Discord", timeout=5, fallback=2)
+    run_plan("discord_send", [
+        plan.hotkey('ctrl', 'k'),  # Discord search shortcut
+        plan.sleep(0.5),
+        plan.write(recipient),
+        plan.sleep(1),
+        plan.press('enter'),
+        plan.sleep(0.5),
+        plan.write(message),
+        plan.press('enter'),
+    ])
     print(f"✅ Message sent to {recipient} on Discord.")
 
 # ------------------ Fallbacks ------------------
@@ -274,8 +286,8 @@ def fallback_google_search(command: str):
     url = f"https://www.google.com/search?q={command.replace(' ', '+')}"
     open_brave_website(url)
 
-def fallback_open_website(command: str):
-    url = ask_gemini_for_url(command)
+def fallback_open_website(command: str, url: str = None):
+    url = url or ask_gemini_for_url(command)
     if url:
         open_brave_website(url)
     else:
@@ -283,7 +295,14 @@ def fallback_open_website(command: str):
 
 # ------------------ Command Execution ------------------
 def execute_command(command: str):
-    parsed = ask_gemini_for_command(command)
+    # Recognition spans were recorded on this thread before the command existed.
+    with tracing.command(command, tracing.take_pending()):
+        parsed = resolve_command(command)
+        tracing.annotate(action=parsed.get("action"))
+        with tracing.span("dispatch"):
+            dispatch_intent(command, parsed)
+
+def dispatch_intent(command: str, parsed: dict):
     action = parsed.get("action")
     target = parsed.get("target")
     message_app = parsed.get("message_app")
@@ -295,7 +314,7 @@ def execute_command(command: str):
     elif action == "play_song":
         open_spotify_song(target)
     elif action == "open_website":
-        fallback_open_website(target)
+        fallback_open_website(target, parsed.get("url"))
     elif action == "open_folder":
         open_folder(target)
     elif action == "play_youtube":
@@ -316,6 +335,9 @@ def execute_command(command: str):
 
 # ------------------ Main Loop ------------------
 def main():
+    gemini_client.prewarm()  # connects while the user picks a mode / the mic calibrates
+    app_launcher.warm_in_background()
+    folder_index.warm_in_background()
     print("="*60)
     print("🤖 FRIDAY - Voice Controlled Assistant (Gemini + PyAutoGUI + Messaging + Folder Memory)")
     print("="*60)
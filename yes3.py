@@ -1,19 +1,48 @@
 import os
 import sys
 import time
+import startup_profile
+import tracing
+if "--startup-profile" in sys.argv:
+    startup_profile.enable()  # before the imports below, so they are timed too
 import re
-import pyautogui
-import pygetwindow as gw
-import keyboard
-import speech_recognition as sr
-import pyttsx3
+import queue
+import asyncio
+import threading
+import concurrent.futures
 from dotenv import load_dotenv
-import google.generativeai as genai  # Gemini API client
-import json
+import gemini_client  # shared, prewarmed Gemini model
+from intent_cache import IntentCache
+from intent_schema import (
+    INTENT_GENERATION_CONFIG, PLAN_GENERATION_CONFIG, URL_GENERATION_CONFIG, normalize_url, parse_intent_response,
+    parse_plan_response, parse_url_response,
+)
+from fast_parser import parse_command, parse_compound, is_compound, FAST_PATH_MIN_CONFIDENCE, KNOWN_APPS
+import site_index
+import app_launcher
+import folder_index
+from text_input import type_text
+from audio_pipeline import AudioPipeline
+from microphone import get_microphone
+from tts import SpeechWorker, URGENT, NORMAL
+from command_runner import CommandRunner, Superseded
+from automation_worker import AutomationWorker, JOB_TIMEOUT
+from speculation import Speculator
+from phrase_cache import PhraseCache
+from wake_word import WakeWordDetector, strip_wake_word
+from task_graph import Task, run_graph, format_summary
+from window_registry import find_window
+from waits import activate_and_wait, active_title, wait_for_focus, wait_for_title_change, wait_for_window
+import action_plan as plan
+from action_plan import run_plan
 
 load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=GEMINI_API_KEY)
+
+# Heavy input backends load on first use (or on a background thread once the mode is known),
+# so typing mode never pays for the audio stack and the keyboard hook.
+pyautogui = startup_profile.lazy_import("pyautogui")
+keyboard = startup_profile.lazy_import("keyboard")
+sr = startup_profile.lazy_import("speech_recognition")
 
 # ------------------ Config ------------------
 SPOTIFY_APP_NAME = "Spotify"
@@ -33,55 +62,122 @@ SYSTEM_FOLDERS = {
 last_folder_path = None
 
 # ------------------ Text-to-Speech ------------------
-engine = pyttsx3.init()
-def speak(text):
+# Fixed starts of the f-string messages below: the prefix is played from the phrase
+# cache and only the rest is synthesized. Other messages are cached whole.
+SPEECH_TEMPLATES = (
+    "Recognition error:", "Recognition service error:", "Microphone error:", "You said:", "Failed after", "Opened folder:",
+    "Message sent to", "Playing song on Spotify:", "Playing video on YouTube:", "Unknown messaging app:",
+    "Opening app:", "Opening website:", "Could not process command:", "Mode selected:", "An error occurred:",
+    "Error:",
+)
+SPEECH_PHRASES = (
+    "Friday assistant ready!", "On it.", "Cancelled.", "Goodbye!", "Stopping assistant. Goodbye!",
+    "Calibrating microphone...", "Listening continuously! Say 'Friday' to give a command. Press ESC to stop.",
+    "Stopping continuous listening.", "Yes? What should I do?", "Hold SPACE to speak... release to stop.",
+    "No speech detected.", "Could not understand. Try again.", "Do you want the app or the website?",
+    "You chose app", "You chose website", "Detected: app", "Detected: website",
+    "No response detected. Skipping app/website selection.", "Could not understand. Skipping selection.",
+    "I didn’t catch that, please try again.",
+)
+voice = SpeechWorker(phrase_cache=PhraseCache(SPEECH_TEMPLATES, SPEECH_PHRASES))  # speaks on its own thread
+speech_relay = None  # in the automation worker process: passes speech on to the listener
+def speak(text, wait=False):
+    """Queues `text` for speech; `wait=True` only where it must finish first (e.g. before listening)."""
+    if speech_relay is not None:
+        speech_relay("speak", text)
+        return
     print(f"🤖 {text}")
-    engine.say(text)
-    engine.runAndWait()
+    voice.say(text, priority=URGENT if wait else NORMAL, wait=wait)
 
 # ------------------ Voice Input ------------------
+voice_pipeline = None  # keeps recording (and transcribing) between commands once continuous mode starts
+answer_request = None  # (asked_at, Future) while a running command waits for a spoken answer
+typed_answers = False  # typing mode's main loop is back at the prompt while commands run, and routes answers
+exit_requested = threading.Event()  # set by the "exit" command, which runs off the main thread
+
+def get_voice_pipeline():
+    global voice_pipeline
+    if voice_pipeline is None:
+        with startup_profile.step("microphone"):
+            mic = get_microphone()
+            if mic.needs_calibration:
+                speak("Calibrating microphone...")
+            mic.ensure_calibrated()
+        with startup_profile.step("voice pipeline"):
+            # Offline wake-word spotting once templates are recorded (python wake_word.py enroll);
+            # until then every phrase is transcribed and checked for the wake word as text.
+            detector = WakeWordDetector.from_directory()
+            voice_pipeline = AudioPipeline(mic.recognizer, mic, gate=detector.detect if detector else None).start()
+        # Commands run in the background, so this is said once rather than after every command.
+        speak("Listening continuously! Say 'Friday' to give a command. Press ESC to stop.")
+    return voice_pipeline
+
+def deliver_answer(text, started_at=None) -> bool:
+    """Hands a phrase without the wake word (or a typed line) to the command waiting for an answer, if any."""
+    request = answer_request
+    if request is None or not text or (started_at is not None and started_at < request[0]):
+        return False
+    try:
+        request[1].set_result(text)
+    except concurrent.futures.InvalidStateError:  # answered, timed out or cancelled already
+        return False
+    return True
+
 def get_voice_input_continuous():
-    r = sr.Recognizer()
-    mic = sr.Microphone(device_index=2)
-    speak("Calibrating microphone...")
-    with mic as source:
-        r.adjust_for_ambient_noise(source, duration=2)
-    speak("Listening continuously! Say 'Friday' to give a command. Press ESC to stop.")
+    global voice_pipeline
+    pipeline = get_voice_pipeline()
 
     while True:
+        if exit_requested.is_set():
+            return None
+        if pipeline.error is not None:
+            # The microphone kept failing; the next call starts a fresh pipeline.
+            speak(f"Microphone error: {pipeline.error}", wait=True)
+            pipeline.stop()
+            voice_pipeline = None
+            return None
         if keyboard.is_pressed("esc"):
             speak("Stopping continuous listening.")
             return None
-        try:
-            with mic as source:
-                audio = r.listen(source)
-                text = r.recognize_google(audio)
-                print(f"📢 Heard: {text}")
-
-                # Check for wake word "Friday"
-                if text.lower().strip().startswith("friday"):
-                    # Remove "Friday" from the start
-                    command_text = text.lower().replace("friday", "", 1).strip()
-                    if command_text == "":
-                        speak("Yes? What should I do?")
-                        audio = r.listen(source)
-                        command_text = r.recognize_google(audio)
-                        print(f"📢 Command after wake word: {command_text}")
-                    return command_text
-
-        except sr.UnknownValueError:
-            continue  # couldn't understand, keep listening
-        except sr.RequestError as e:
-            speak(f"Recognition error: {e}")
-            time.sleep(1)
-        except Exception as e:
-            speak(f"Error: {e}")
-            time.sleep(1)
+        phrase = pipeline.next_phrase(timeout=0.1)
+        if phrase is None:
+            continue
+        if phrase.error:
+            speak(f"Recognition error: {phrase.error}")
+            continue
+        text = phrase.text or ""
+        if phrase.recognized_at is not None:  # from the end of speech until the text is handed over
+            tracing.record("recognize", time.monotonic() - phrase.ended_at, wake=phrase.wake,
+                           audio=round(phrase.ended_at - phrase.started_at, 2))
+        if phrase.wake:
+            voice.interrupt()  # the user is talking to us: stop whatever FRIDAY is still saying
+            # Wake word spotted offline; only the audio after it was transcribed
+            command_text = text.lower().strip()
+            if strip_wake_word(command_text) is not None:  # the cut can land just before the end of the word
+                command_text = strip_wake_word(command_text)
+            print(f"📢 Wake word heard, command: {command_text}")
+        else:
+            print(f"📢 Heard: {text}")
+            # Check for wake word "Friday" / "फ्राईडे" and remove it from the start
+            command_text = strip_wake_word(text)
+            if command_text is None:
+                deliver_answer(text, phrase.started_at)
+                continue
+            voice.interrupt()
+
+        if command_text == "":
+            speak("Yes? What should I do?", wait=True)
+            pipeline.expect_follow_up(10)
+            follow_up = pipeline.next_phrase(timeout=10, since=time.monotonic())  # ignore our own prompt
+            command_text = follow_up.text if follow_up and follow_up.text else ""
+            print(f"📢 Command after wake word: {command_text}")
+        return command_text
 
 
 def get_voice_input_button():
-    r = sr.Recognizer()
-    mic = sr.Microphone(device_index=2)
+    mic = get_microphone()
+    mic.ensure_calibrated()  # only blocks the very first time on this device
+    r = mic.recognizer
     max_retries = 3
     retry_count = 0
     while retry_count < max_retries:
@@ -92,11 +188,13 @@ def get_voice_input_button():
                 speak("Cancelled.")
                 return None
             if keyboard.is_pressed("space"):
+                voice.interrupt()  # barge-in: stop the prompt as soon as the user starts talking
                 with mic as source:
-                    r.adjust_for_ambient_noise(source, duration=0.5)
                     try:
-                        audio = r.listen(source, timeout=30, phrase_time_limit=10)
-                        text = r.recognize_google(audio)
+                        with tracing.span("listen"):
+                            audio = r.listen(source, timeout=30, phrase_time_limit=10)
+                        with tracing.span("recognize"):
+                            text = r.recognize_google(audio)
                         speak(f"You said: {text}")
                         return text
                     except sr.WaitTimeoutError:
@@ -116,160 +214,264 @@ def get_voice_input_button():
     speak(f"Failed after {max_retries} attempts.")
     return None
 
+typed_lines = queue.Queue()
+typing_reader = None
+
+def read_typed_lines():
+    while True:
+        try:
+            typed_lines.put(input("Command: "))
+        except EOFError:  # Ctrl+D / Ctrl+Z, or stdin closed
+            exit_requested.set()
+            return
+
+def get_typed_input():
+    """Next typed line, or None once an "exit" (which may finish after the prompt is back) was requested."""
+    global typing_reader
+    if typing_reader is None:
+        # input() can't be interrupted, so it runs on its own thread and the prompt can't outlive an exit.
+        typing_reader = threading.Thread(target=read_typed_lines, name="typing", daemon=True)
+        typing_reader.start()
+    while not exit_requested.is_set():
+        try:
+            return typed_lines.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return None
+
 # ------------------ Gemini Helpers ------------------
-def ask_gemini_for_command(command: str) -> dict:
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    prompt = f"""
-You are a desktop assistant. Analyze this command and return JSON with:
-{{ "action": "<open_app/play_song/open_website/open_folder/play_youtube/send_message/exit>", 
-   "target": "<app/song/URL/folder/video>", 
-   "message_app": "<whatsapp/discord>", 
-   "recipient": "<name>", 
-   "message": "<text>" }}
+COMMAND_PROMPT = """
+You are a desktop assistant. Analyze this command and fill in the JSON fields:
+- action: open_app/play_song/open_website/open_folder/play_youtube/send_message/exit
+- target: the app/song/website/folder/video the command refers to
+- message_app, recipient, message: only for send_message (message_app is whatsapp or discord)
+- url: the official website URL of the target when it is a website or an app that also has a website, otherwise null
 User command: {command}
 """
+intent_cache = IntentCache("intent_cache_yes3", COMMAND_PROMPT)
+
+def ask_gemini_for_command(command: str) -> dict:
+    cached = intent_cache.get(command)
+    if cached:
+        return cached
+    model = gemini_client.get_model()
+    prompt = COMMAND_PROMPT.format(command=command)
     try:
-        resp = model.generate_content(prompt)
-        text = resp.text.strip()
-        json_start = text.find("{")
-        json_end = text.rfind("}") + 1
-        if json_start != -1 and json_end != -1:
-            return json.loads(text[json_start:json_end])
-    except:
-        pass
-    return {"action": None, "target": None, "message_app": None, "recipient": None, "message": None}
+        with tracing.span("gemini.intent"):
+            resp = model.generate_content(prompt, generation_config=INTENT_GENERATION_CONFIG)
+        result = parse_intent_response(resp.text)
+        intent_cache.put(command, result)
+        if result["url"] and result["target"] and result["action"] in ("open_app", "open_website"):
+            site_index.learn(result["target"], result["url"], website=result["action"] == "open_website")
+        return result
+    except Exception as e:
+        print(f"[Gemini Error] Could not interpret command: {e}")
+    return {"action": None, "target": None, "message_app": None, "recipient": None, "message": None, "url": None}
+
+def is_folder_name(name: str) -> bool:
+    """"open aiml projects": not an app FRIDAY knows, but exactly the name of one of your folders."""
+    target = (name or "").lower()
+    if target in KNOWN_APPS or app_launcher.get_index().lookup(target):
+        return False
+    return folder_index.get_index().lookup(target, exact=True) is not None
+
+def resolve_locally(command: str):
+    """The intent from the local grammar or the intent cache, or None if Gemini has to be asked."""
+    with tracing.span("resolve_locally") as span:
+        intent, confidence = parse_command(command)
+        if intent and intent["action"] == "open_app" and is_folder_name(intent["target"]):
+            intent, confidence = dict(intent, action="open_folder"), FAST_PATH_MIN_CONFIDENCE
+        # A rule that matched a whole compound command has swallowed the other requests into its
+        # target or message ("message rahul on discord and open github"); the plan call sorts it out.
+        if intent and confidence >= FAST_PATH_MIN_CONFIDENCE and not is_compound(command):
+            print(f"⚡ Fast path ({confidence:.2f}): {intent['action']}")
+            span.set(source="fast_path")
+            return intent
+        intent = intent_cache.get(command)
+        span.set(source="cache" if intent else "miss")
+        return intent
+
+def resolve_command(command: str) -> dict:
+    # Local grammar first; only ambiguous or unusual commands go to Gemini.
+    return resolve_locally(command) or ask_gemini_for_command(command)
+
+def look_up_url(command: str):
+    """(url or None, whether Gemini answered). Learns nothing, so it can run speculatively."""
+    url = site_index.lookup(command)
+    if url:
+        return url, False
+    model = gemini_client.get_model()
+    try:
+        prompt = f"Give the official website URL for: {command}"
+        with tracing.span("gemini.url"):
+            resp = model.generate_content(prompt, generation_config=URL_GENERATION_CONFIG)
+        url = parse_url_response(resp.text)
+    except Exception as e:
+        print(f"[Gemini Error] Could not resolve URL: {e}")
+    return url, bool(url)
+
+def use_url(command: str, url, from_gemini: bool) -> str:
+    """Remembers a Gemini answer once the website is actually opened; guesses a domain if there was none."""
+    if from_gemini:
+        site_index.learn(command, url, website=True)
+    return url or normalize_url(command.strip().replace(" ", "")) or ""
 
 def ask_gemini_for_url(command: str) -> str:
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    url = ""
+    return use_url(command, *look_up_url(command))
+
+PLAN_PROMPT = """
+You are a desktop assistant. The command may ask for several things. List them as actions, in the order they were said:
+- action: open_app/play_song/open_website/open_folder/play_youtube/send_message/exit
+- target, message_app, recipient, message: as for a single command (message_app is whatsapp or discord)
+- url: the official website URL of the target when it is a website or an app that also has a website, otherwise null
+- depends_on: indices (from 0) of earlier actions that must finish first, e.g. opening an app before using it; [] if none
+User commands: {command}
+"""
+plan_cache = IntentCache("plan_cache_yes3", PLAN_PROMPT)
+
+def ask_gemini_for_plan(command: str):
+    """All actions of a command with several requests from one Gemini call, or None if that failed."""
+    cached = plan_cache.get(command)
+    if cached:
+        return cached["actions"]
+    model = gemini_client.get_model()
     try:
-        prompt = f"Extract official website URL from: {command}. Respond only with JSON: {{'url': '<full URL>'}}"
-        resp = model.generate_content(prompt)
-        text = resp.text.strip()
-        json_start = text.find("{")
-        json_end = text.rfind("}") + 1
-        if json_start != -1 and json_end != -1:
-            result = json.loads(text[json_start:json_end])
-            url = result.get("url", "")
-    except:
-        pass
-    if not url:
-        url = command.strip().replace(" ", "")
-        if url and not url.startswith("http"):
-            url = "https://" + url
-    return url
+        with tracing.span("gemini.plan"):
+            resp = model.generate_content(PLAN_PROMPT.format(command=command), generation_config=PLAN_GENERATION_CONFIG)
+        actions = parse_plan_response(resp.text)
+        plan_cache.put(command, {"actions": actions})
+        for intent in actions:
+            if intent["url"] and intent["target"] and intent["action"] in ("open_app", "open_website"):
+                site_index.learn(intent["target"], intent["url"], website=intent["action"] == "open_website")
+        return actions
+    except Exception as e:
+        print(f"[Gemini Error] Could not split command: {e}")
+    return None
+
+def resolve_actions_locally(command: str):
+    """The actions of a command with several requests, if the local grammar understands every part."""
+    intents, confidence = parse_compound(command)
+    if intents and confidence >= FAST_PATH_MIN_CONFIDENCE:
+        print(f"⚡ Fast path ({confidence:.2f}): {len(intents)} actions")
+        return intents
+    return None
 
 # ------------------ App / Folder / Brave / Spotify / YouTube / Messaging ------------------
+@tracing.traced()
 def open_app_windows_search(app_name: str):
-    windows = gw.getWindowsWithTitle(app_name)
-    if windows:
-        try:
-            windows[0].activate()
-            return
-        except:
-            pass
+    if activate_and_wait(app_name):
+        return
+    if app_launcher.launch(app_name):  # installed app found in the launch index
+        if wait_for_window(app_name, timeout=15, fallback=2):
+            wait_for_focus(app_name, timeout=2, fallback=0)
+        return
+    previous_title = active_title()
     pyautogui.hotkey('win')
-    time.sleep(0.5)
-    pyautogui.write(app_name)
-    time.sleep(0.5)
+    wait_for_title_change(previous_title, timeout=1, fallback=0.5)  # Start menu took focus
+    type_text(app_name)
+    time.sleep(0.5)  # search results have no window of their own to wait on
     pyautogui.press('enter')
-    time.sleep(2)
+    if wait_for_window(app_name, timeout=15, fallback=2):
+        wait_for_focus(app_name, timeout=2, fallback=0)
 
+@tracing.traced()
 def open_folder(folder_name: str):
     global last_folder_path
     folder_name_lower = folder_name.lower()
     folder_path = SYSTEM_FOLDERS.get(folder_name_lower, None)
-    if folder_path and os.path.exists(folder_path):
+    if not (folder_path and os.path.exists(folder_path)):
+        folder_path = folder_index.find(folder_name)  # any folder under the home directory
+    if folder_path:
         os.startfile(folder_path)
         last_folder_path = folder_path
         speak(f"Opened folder: {folder_path}")
     else:
         pyautogui.hotkey('win')
         time.sleep(0.5)
-        pyautogui.write(folder_name)
+        type_text(folder_name)
         pyautogui.press('enter')
         time.sleep(1)
 
+@tracing.traced()
 def open_brave_website(url: str):
-    windows = gw.getWindowsWithTitle(BRAVE_APP_NAME)
-    if windows:
-        try:
-            windows[0].activate()
-            time.sleep(0.5)
-            pyautogui.hotkey('ctrl', 't')
-            time.sleep(0.5)
-        except:
-            pass
+    if activate_and_wait(BRAVE_APP_NAME):
+        run_plan("brave_new_tab", [plan.mark_title(), plan.hotkey('ctrl', 't'), plan.wait_title_change(timeout=0.5, fallback=0.5)])
     else:
-        pyautogui.hotkey('win')
-        time.sleep(0.5)
-        pyautogui.write(BRAVE_APP_NAME)
-        pyautogui.press('enter')
-        time.sleep(2)
-    pyautogui.click(*BRAVE_SEARCH_BAR_COORDS)
-    pyautogui.hotkey('ctrl', 'a')
-    pyautogui.press('delete')
-    pyautogui.write(url, interval=0.02)
-    pyautogui.press('space')
-    pyautogui.press('enter')
-    time.sleep(2)
-
+        open_app_windows_search(BRAVE_APP_NAME)
+    run_plan("brave_navigate", [
+        plan.click(*BRAVE_SEARCH_BAR_COORDS),
+        plan.hotkey('ctrl', 'a'),
+        plan.press('delete'),
+        plan.write(url, interval=0.02),
+        plan.press('space'),
+        plan.mark_title(),
+        plan.press('enter'),
+        plan.wait_title_change(timeout=5, fallback=2),  # page title replaces "New Tab"
+    ])
+
+@tracing.traced()
 def perform_spotify_search(query: str):
-    try:
-        spotify_windows = gw.getWindowsWithTitle(SPOTIFY_APP_NAME)
-        if spotify_windows:
-            spotify_windows[0].activate()
-        time.sleep(1.5)
-    except:
-        pass
-    pyautogui.hotkey('ctrl', 'k')
-    time.sleep(0.5)
-    pyautogui.write(query, interval=0.05)
-    time.sleep(1)
-    pyautogui.hotkey('shift', 'enter')
-    time.sleep(3)
-    pyautogui.press('escape')
-
+    run_plan("spotify_search", [
+        plan.focus(SPOTIFY_APP_NAME, timeout=1.5),
+        plan.hotkey('ctrl', 'k'),
+        plan.sleep(0.5),
+        plan.write(query, interval=0.05),
+        plan.sleep(1),
+        plan.hotkey('shift', 'enter'),
+        plan.sleep(3),
+        plan.press('escape'),
+    ])
+
+@tracing.traced()
 def open_spotify_song(song_name: str):
     open_app_windows_search(SPOTIFY_APP_NAME)
     perform_spotify_search(song_name)
 
+@tracing.traced()
 def open_youtube_video(video_query: str):
     open_brave_website("https://www.youtube.com")
-    time.sleep(2)
-    pyautogui.press('/')
-    time.sleep(0.5)
-    pyautogui.write(video_query, interval=0.02)
-    pyautogui.press('enter')
-    time.sleep(2)
-    pyautogui.click(*YOUTUBE_TOP_VIDEO_COORDS)
-    time.sleep(1)
-
+    run_plan("youtube_play", [
+        plan.sleep(2),
+        plan.press('/'),
+        plan.sleep(0.5),
+        plan.write(video_query, interval=0.02),
+        plan.press('enter'),
+        plan.sleep(2),
+        plan.click(*YOUTUBE_TOP_VIDEO_COORDS),
+        plan.sleep(1),
+    ])
+
+@tracing.traced()
 def send_whatsapp_message(recipient: str, message: str):
     open_app_windows_search("WhatsApp")
-    time.sleep(2)
-    pyautogui.hotkey('ctrl', 'f')
-    time.sleep(0.5)
-    pyautogui.write(recipient)
-    time.sleep(1)
-    pyautogui.press('down')
-    pyautogui.press('enter')
-    time.sleep(1)
-    pyautogui.write(message)
-    pyautogui.press('enter')
+    wait_for_focus("WhatsApp", timeout=5, fallback=2)
+    run_plan("whatsapp_send", [
+        plan.hotkey('ctrl', 'f'),
+        plan.sleep(0.5),
+        plan.write(recipient),
+        plan.sleep(1),
+        plan.press('down'),
+        plan.press('enter'),
+        plan.sleep(1),
+        plan.write(message),
+        plan.press('enter'),
+    ])
     speak(f"Message sent to {recipient} on WhatsApp.")
 
+@tracing.traced()
 def send_discord_message(recipient: str, message: str):
     open_app_windows_search("Discord")
-    time.sleep(5)
-    pyautogui.hotkey('ctrl', 'k')
-    time.sleep(0.5)
-    pyautogui.write(recipient)
-    time.sleep(1)
-    pyautogui.press('enter')
-    time.sleep(0.5)
-    pyautogui.write(message)
-    pyautogui.press('enter')
+    wait_for_focus("Discord", timeout=8, fallback=5)
+    run_plan("discord_send", [
+        plan.hotkey('ctrl', 'k'),
+        plan.sleep(0.5),
+        plan.write(recipient),
+        plan.sleep(1),
+        plan.press('enter'),
+        plan.sleep(0.5),
+        plan.write(message),
+        plan.press('enter'),
+    ])
     speak(f"Message sent to {recipient} on Discord.")
 
 # ------------------ Helpers ------------------
@@ -292,33 +494,30 @@ def parse_message_command(command):
         pass
     return message_app, None, None
 
-def determine_app_or_website(command, gemini_response, mode="voice_continuous"):
+APP_OR_WEBSITE_QUESTION = "Do you want the app or the website?"
+ANSWER_TIMEOUT = 8       # seconds to wait for the app/website answer
+ACK_AFTER = 0.4          # seconds; say "On it." if resolving the command takes longer than this
+
+def explicit_app_or_website(command):
+    """"app"/"website" if the user said which they want, else None (no LLM result needed)."""
     cmd_lower = command.lower()
-    
-    # If user explicitly said website or app
     if "website" in cmd_lower:
-        speak("Detected: website")
         return "website"
     if "app" in cmd_lower:
-        speak("Detected: app")
         return "app"
+    return None
 
-    # Skip for Spotify, YouTube, Messaging, Folders
-    action = (gemini_response.get("action") or "").lower()
-    if action in ["play_song", "play_youtube", "send_message", "open_folder"]:
-        return None
-
-    # Ask user if ambiguous
+def ask_app_or_website(mode):
+    """Asks and blocks for the answer (push-to-talk and typing modes)."""
     if mode in ["voice_continuous", "voice_button"]:
-        speak("Do you want the app or the website?")
-        time.sleep(0.5)  # allow TTS to finish before listening
-        r = sr.Recognizer()
-        mic = sr.Microphone(device_index=2)
+        speak(APP_OR_WEBSITE_QUESTION, wait=True)
+        mic = get_microphone()
+        r = mic.recognizer
         try:
-            with mic as source:
-                r.adjust_for_ambient_noise(source, duration=0.5)
-                audio = r.listen(source, timeout=8, phrase_time_limit=5)
-            answer = r.recognize_google(audio).lower()
+            with mic as source, tracing.span("listen"):
+                audio = r.listen(source, timeout=ANSWER_TIMEOUT, phrase_time_limit=5)
+            with tracing.span("recognize"):
+                answer = r.recognize_google(audio).lower()
             if "app" in answer:
                 speak("You chose app")
                 return "app"
@@ -347,12 +546,189 @@ def determine_app_or_website(command, gemini_response, mode="voice_continuous"):
             return "website"
     return None
 
+async def wait_for_answer(timeout):
+    """Next phrase without the wake word (or typed line), as routed by the main loop (see deliver_answer)."""
+    global answer_request
+    future = concurrent.futures.Future()
+    answer_request = (time.monotonic(), future)  # ignore anything that started before the question ended
+    if voice_pipeline is not None:
+        voice_pipeline.expect_follow_up(timeout)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        if answer_request is not None and answer_request[1] is future:
+            answer_request = None
+
+async def choose_app_or_website(cmd, command, mode, action=None):
+    # "open_website" is already an answer: a known site's exact name, or Gemini's reading of the command.
+    choice = "website" if action == "open_website" else explicit_app_or_website(command)
+    if choice == "website":
+        speak("Detected: website")
+        return choice
+    if choice == "app":
+        speak("Detected: app")
+        return choice
+    if (mode == "voice_continuous" and voice_pipeline is not None) or (mode == "typing" and typed_answers):
+        # The listener keeps running while commands execute; it passes the answer on to us.
+        await cmd.run(speak, APP_OR_WEBSITE_QUESTION, True)
+        answer = (await wait_for_answer(ANSWER_TIMEOUT) or "").lower()
+        if "app" in answer:
+            speak("You chose app")
+            return "app"
+        elif "website" in answer:
+            speak("You chose website")
+            return "website"
+        speak("No response detected. Skipping app/website selection.")
+        return None
+    return await cmd.run(ask_app_or_website, mode)
+
+# ------------------ Speculative Warm-up ------------------
+# Cue words that give the app away before the intent is resolved (first match wins).
+WARM_UP_CUES = [
+    (("youtube", "यूट्यूब"), BRAVE_APP_NAME),
+    (("whatsapp", "व्हाट्सएप"), "WhatsApp"),
+    (("discord",), "Discord"),
+    (("spotify", "स्पॉटिफाई", "play", "चलाओ"), SPOTIFY_APP_NAME),
+]
+speculator = Speculator(WARM_UP_CUES)
+
+def app_for_intent(action, target, message_app):
+    """The app the resolved command will bring up, for judging the warm-up guess."""
+    if action == "play_song":
+        return SPOTIFY_APP_NAME
+    if action in ("play_youtube", "open_website"):
+        return BRAVE_APP_NAME
+    if action == "send_message":
+        return {"whatsapp": "WhatsApp", "discord": "Discord"}.get(message_app.lower())
+    if action == "open_app":
+        return target
+    return None
+
+# ------------------ Several Actions at Once ------------------
+def launch_in_background(app_name: str):
+    """The part of opening an app that needs no focus: starts it and waits for its window."""
+    try:
+        if find_window(app_name, refresh=True) is None and app_launcher.launch(app_name):
+            wait_for_window(app_name, timeout=15, fallback=2)
+    except Exception as e:  # the GUI step still finds (or starts) the app itself
+        print(f"[Launch] Could not start {app_name} early: {e}")
+
+def opens_as_website(intent) -> bool:
+    """A batch can't stop to ask "app or website?": only sites that aren't installed apps open in Brave."""
+    if intent["action"] == "open_website":
+        return True
+    target = (intent["target"] or "").lower()
+    return (intent["action"] == "open_app" and bool(intent["url"]) and target not in KNOWN_APPS
+            and app_launcher.get_index().lookup(target) is None)
+
+def carry_out(intent, url=None):
+    """The GUI part of one action of a batch (its app has been started already)."""
+    action, target = intent["action"], intent["target"] or ""
+    if action == "play_song":
+        speak(f"Playing song on Spotify: {target}")
+        open_spotify_song(target)
+    elif action == "play_youtube":
+        speak(f"Playing video on YouTube: {target}")
+        open_youtube_video(target)
+    elif action == "send_message":
+        message_app = (intent["message_app"] or "").lower()
+        if message_app not in ("whatsapp", "discord") or not intent["recipient"] or not intent["message"]:
+            speak(f"Unknown messaging app: {message_app}" if message_app else "Could not process the message.")
+        elif message_app == "whatsapp":
+            send_whatsapp_message(intent["recipient"], intent["message"])
+        else:
+            send_discord_message(intent["recipient"], intent["message"])
+    elif action == "open_folder":
+        open_folder(target)
+    elif opens_as_website(intent):
+        url = url or intent["url"] or target
+        speak(f"Opening website: {url}")
+        open_brave_website(url)
+    elif action == "open_app":
+        speak(f"Opening app: {target}")
+        open_app_windows_search(target)
+
+def build_action_graph(cmd, actions):
+    """Task graph for a batch of actions.
+
+    App launches, URL lookups and system folders run side by side; every step that
+    types, clicks or focuses a window takes the focus lock, so those run one at a time.
+    """
+    tasks, launches, urls = [], {}, {}
+    runnable = {i for i, intent in enumerate(actions) if intent["action"] not in (None, "exit")}
+
+    def with_focus(i, intent):
+        def step():
+            cmd.call_gui(carry_out, intent, urls.get(i))
+        return step
+
+    for i in sorted(runnable):
+        intent = actions[i]
+        deps = [f"action_{d}" for d in intent.get("depends_on", ()) if d in runnable]
+        folder = SYSTEM_FOLDERS.get((intent["target"] or "").lower())
+        if intent["action"] == "open_folder" and not intent.get("needs_focus", True) and folder and os.path.exists(folder):
+            tasks.append(Task(f"action_{i}", lambda target=intent["target"]: open_folder(target), deps=deps))
+            continue
+        app = BRAVE_APP_NAME if opens_as_website(intent) else app_for_intent(
+            intent["action"], intent["target"], intent["message_app"] or "")
+        if app:
+            if app not in launches:
+                launches[app] = f"launch_{len(launches)}_{app}"
+                tasks.append(Task(launches[app], lambda app=app: launch_in_background(app)))
+            deps.append(launches[app])
+        if opens_as_website(intent) and not intent["url"]:
+            tasks.append(Task(f"url_{i}", lambda i=i, target=intent["target"]: urls.__setitem__(
+                i, ask_gemini_for_url(target))))
+            deps.append(f"url_{i}")
+        tasks.append(Task(f"action_{i}", with_focus(i, intent), deps=deps, needs_focus=True))
+    return tasks
+
+async def dispatch_actions(cmd, actions):
+    tracing.annotate(action="+".join(intent["action"] or "none" for intent in actions))
+    report = await cmd.run(run_graph, build_action_graph(cmd, actions), cmd.runner.focus_lock)
+    print("\n" + format_summary(report))
+    if any(intent["action"] == "exit" for intent in actions):
+        await cmd.run(speak, "Goodbye!", True)
+        exit_requested.set()
+
 # ------------------ Main Command Execution ------------------
-def execute_command(command: str, mode="voice_continuous"):
-    if not command:
+async def ask_with_ack(cmd, fn, command):
+    """Runs a Gemini lookup, saying "On it." if it takes longer than ACK_AFTER."""
+    request = asyncio.ensure_future(cmd.run(fn, command))
+    done, _ = await asyncio.wait({request}, timeout=ACK_AFTER)
+    if not done:
+        speak("On it.")
+    return await request
+
+async def run_command(cmd, command, mode):
+    actions = resolve_actions_locally(command)
+    gemini_response = None if actions else resolve_locally(command)
+    if actions is None and gemini_response is None and is_compound(command):
+        # Possibly several requests: one Gemini call returns all of them.
+        actions = await ask_with_ack(cmd, ask_gemini_for_plan, command)
+        if actions and len(actions) == 1:
+            gemini_response, actions = actions[0], None
+    if actions:
+        with tracing.span("dispatch"):
+            await dispatch_actions(cmd, actions)
         return
-
-    gemini_response = ask_gemini_for_command(command)
+    speculation = None
+    if gemini_response is None:
+        # Gemini has to be asked: start the likely app meanwhile, and acknowledge if the answer is slow.
+        speculation = speculator.start(command)
+        try:
+            gemini_response = await ask_with_ack(cmd, ask_gemini_for_command, command)
+        except BaseException:
+            if speculation is not None:
+                speculation.abandon()
+            raise
+    tracing.annotate(action=gemini_response.get("action"))
+    with tracing.span("dispatch"):
+        await dispatch_intent(cmd, command, mode, gemini_response, speculation)
+
+async def dispatch_intent(cmd, command, mode, gemini_response, speculation):
     action = (gemini_response.get("action") or "").lower()
     target = gemini_response.get("target") or ""
     message_app = (gemini_response.get("message_app") or "")
@@ -366,58 +742,153 @@ def execute_command(command: str, mode="voice_continuous"):
             recipient = recipient_manual
             message = message_manual
 
-    app_or_website = determine_app_or_website(command, gemini_response, mode)
+    if speculation is not None:
+        # Waits for the warmed-up window on a hit, so the GUI helper doesn't launch the app a second time.
+        await cmd.run(speculator.resolve, speculation, app_for_intent(action, target, message_app))
 
     # -------- Spotify --------
     if action == "play_song":
         speak(f"Playing song on Spotify: {target}")
-        open_spotify_song(target)
+        await cmd.gui(open_spotify_song, target)
         return
 
     # -------- YouTube --------
     if action == "play_youtube":
         speak(f"Playing video on YouTube: {target}")
-        open_youtube_video(target)
+        await cmd.gui(open_youtube_video, target)
         return
 
     # -------- Messaging --------
     if action == "send_message":
         if message_app.lower() == "whatsapp":
-            send_whatsapp_message(recipient, message)
+            await cmd.gui(send_whatsapp_message, recipient, message)
         elif message_app.lower() == "discord":
-            send_discord_message(recipient, message)
+            await cmd.gui(send_discord_message, recipient, message)
         else:
             speak(f"Unknown messaging app: {message_app}")
         return
 
     # -------- Folders --------
     if action == "open_folder":
-        open_folder(target)
-        return
-
-    # -------- Normal app or website (ambiguous) --------
-    if app_or_website == "app":
-        speak(f"Opening app: {target}")
-        open_app_windows_search(target)
-        return
-    elif app_or_website == "website":
-        url = ask_gemini_for_url(target) or target
-        speak(f"Opening website: {url}")
-        open_brave_website(url)
+        await cmd.gui(open_folder, target)
         return
 
     # -------- Exit --------
     if action == "exit":
-        speak("Goodbye!")
-        sys.exit(0)
+        await cmd.run(speak, "Goodbye!", True)
+        exit_requested.set()
+        return
+
+    # -------- Normal app or website (ambiguous) --------
+    if action in ("open_app", "open_website") and target:
+        url = gemini_response.get("url")
+        url_lookup = None
+        if not url and (action == "open_website" or explicit_app_or_website(command) != "app"):
+            # Look the URL up while the user is still answering the question; it's only learned if used.
+            url_lookup = asyncio.ensure_future(cmd.run(look_up_url, target))
+        app_or_website = await choose_app_or_website(cmd, command, mode, action)
+        if url_lookup is not None and app_or_website != "website":
+            url_lookup.cancel()
+        if app_or_website == "app":
+            speak(f"Opening app: {target}")
+            await cmd.gui(open_app_windows_search, target)
+            return
+        elif app_or_website == "website":
+            if url_lookup is not None:
+                url = use_url(target, *await url_lookup)
+            url = url or target
+            speak(f"Opening website: {url}")
+            await cmd.gui(open_brave_website, url)
+            return
 
     # -------- Fallback --------
     speak(f"Could not process command: {command}. Searching on Google.")
-    open_brave_website(f"https://www.google.com/search?q={command.replace(' ','+')}")
+    await cmd.gui(open_brave_website, f"https://www.google.com/search?q={command.replace(' ','+')}")
+
+async def run_command_safely(cmd, command, mode, carried=()):
+    with tracing.command(command, carried, mode=mode):
+        try:
+            await run_command(cmd, command, mode)
+        except asyncio.CancelledError:
+            print(f"⏭ Superseded: {command}")
+            raise
+        except Superseded:
+            print(f"⏭ Superseded: {command}")
+            tracing.annotate(superseded=True)
+        except Exception as e:
+            tracing.annotate(error=type(e).__name__)
+            speak(f"An error occurred: {e}")
+
+commands = CommandRunner()  # GUI stages move to an automation worker process in __main__
+
+STOP_COMMANDS = ("stop", "stop it", "cancel", "cancel it", "cancel that", "never mind", "nevermind",
+                 "ruko", "ruk jao", "bas", "रुको", "रुक जाओ", "बस")
+
+def is_stop_command(command: str) -> bool:
+    return command.lower().strip(" .!?।") in STOP_COMMANDS
+
+def is_exit_command(command: str) -> bool:
+    intents, _ = parse_compound(command)  # "play believer and exit" ends with one
+    intent = intents[-1] if intents else parse_command(command)[0]
+    return intent is not None and intent["action"] == "exit"
+
+def stop_current_command():
+    """"stop"/"cancel": preempts the running command, including a GUI step in progress."""
+    voice.interrupt()
+    commands.cancel_current()
+    if commands.automation is not None:
+        commands.automation.cancel()
+    speak("Cancelled.")
+
+def init_automation_process(notify):
+    """Runs in each automation worker process: its speech is played by the listener."""
+    global speech_relay
+    speech_relay = notify
+    folder_index.warm_in_background()  # open_folder runs here
+
+def on_worker_event(kind, payload):
+    if kind == "speak":
+        speak(payload)
+
+def execute_command(command: str, mode="voice_continuous", wait=True):
+    """Runs `command`, cancelling any command still in progress.
+
+    With `wait=False` it returns the command's future right away, so the caller
+    can keep listening (and a newer command can supersede this one).
+    """
+    if not command:
+        return None
+    if is_stop_command(command):
+        stop_current_command()
+        return None
+    # Recognition spans were recorded on this thread before the command existed.
+    future = commands.submit(run_command_safely, command, mode, tracing.take_pending(), name=command)
+    if not wait:
+        return future
+    try:
+        return future.result()
+    except concurrent.futures.CancelledError:
+        return None
 
 # ------------------ Main Loop ------------------
 # ------------------ Main Loop ------------------
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="FRIDAY desktop voice assistant.")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print an import/initialization timing breakdown once ready for the first command")
+    parser.add_argument("--trace", action="store_true",
+                        help="write per-command spans to ~/.friday/traces.jsonl (same as FRIDAY_TRACE=1)")
+    parser.add_argument("--no-worker", action="store_true",
+                        help="run keyboard/mouse automation in this process instead of a supervised worker")
+    parser.add_argument("--job-timeout", type=float, default=JOB_TIMEOUT,
+                        help="seconds a GUI step may run before the worker is restarted (default: %(default)s)")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable()
+
+    gemini_client.prewarm()  # connects while the user picks a mode / the mic calibrates
+    app_launcher.warm_in_background()
     speak("Friday assistant ready!")
 
     # -------- Mode Selection --------
@@ -433,26 +904,60 @@ if __name__ == "__main__":
     else:
         mode = "typing"
     speak(f"Mode selected: {mode.replace('_',' ')}")
+    # Load what this mode needs off the main thread; typing mode never loads the audio stack.
+    if mode == "typing":
+        preloading = startup_profile.preload(pyautogui)
+    else:
+        preloading = startup_profile.preload(sr, keyboard, pyautogui)
+    if not args.no_worker:
+        # Starts importing in its own process now; a hung GUI step then costs a worker restart, not the assistant.
+        commands.automation = AutomationWorker(initializer=init_automation_process, on_event=on_worker_event,
+                                               job_timeout=args.job_timeout).start()
+    folder_index.warm_in_background()  # for telling folder names from app names
+    typed_answers = mode == "typing"
+
+    def shut_down():
+        if commands.automation is not None:
+            commands.automation.shutdown()
+        sys.exit(0)
+
+    if args.startup_profile:
+        if mode == "voice_continuous":
+            get_voice_pipeline()
+        elif mode == "voice_button":
+            with startup_profile.step("microphone"):
+                get_microphone().ensure_calibrated()
+        preloading.join(timeout=30)
+        print(startup_profile.report())
 
     # -------- Main loop --------
     while True:
         try:
             if mode == "typing":
-                command = input("Command: ")
+                command = get_typed_input()
+                if deliver_answer(command):
+                    continue  # it answered a question from the running command
+                voice.interrupt()  # a new command supersedes anything still being said
             elif mode == "voice_continuous":
                 command = get_voice_input_continuous()
             elif mode == "voice_button":
                 command = get_voice_input_button()
 
+            if exit_requested.is_set():
+                shut_down()
             if not command or command.strip() == "":
                 speak("I didn’t catch that, please try again.")
                 continue  # keeps listening instead of stopping
 
-            execute_command(command, mode=mode)
+            # The listener (or prompt) keeps going while the command runs, so a new command,
+            # "stop" or the answer to a question can arrive; push-to-talk waits for it.
+            execute_command(command, mode=mode, wait=mode == "voice_button" or is_exit_command(command))
+            if exit_requested.is_set():
+                shut_down()
 
         except KeyboardInterrupt:
-            speak("Stopping assistant. Goodbye!")
-            sys.exit(0)
+            speak("Stopping assistant. Goodbye!", wait=True)
+            shut_down()
         except Exception as e:
             speak(f"An error occurred: {e}")
             time.sleep(1)